@@ -0,0 +1,100 @@
+"""
+解析器的微基准（asv 风格：类中以 time_ 开头的方法为基准，params 为参数组合）。
+运行：python benchmarks/run.py
+"""
+from rtf_parser import RTFParser, tableType
+from text_normalize import normalize_cell, normalize_table
+
+from .synthetic import TABLE_TYPES, make_paragraphs, make_table, make_tables
+
+SIZES = [1, 10, 100]
+
+class JudgeTableType:
+    """识别一份报告中全部表格的类型"""
+    params = SIZES
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.parser = RTFParser(None, None)
+        self.tables = make_tables(size)
+        self.parser.table_classifier()  # 规则编译不计入
+
+    def time_judge_table_type(self, size):
+        for table in self.tables:
+            self.parser.judge_table_type(table)
+
+
+class NormalizeTables:
+    """一份报告中全部表格的单元格规范化"""
+    params = (SIZES, [True, False])
+    param_names = ["size", "cached"]
+
+    def setup(self, size, cached):
+        self.tables = make_tables(size)
+        self.cached = cached
+
+    def time_normalize_tables(self, size, cached):
+        # cached=True 为稳定状态（表头、行标签在各报告中重复），False 为每份报告都是新内容
+        if not self.cached:
+            normalize_cell.cache_clear()
+        for table in self.tables:
+            normalize_table(table)
+
+
+class TableHandlers:
+    """各类型表格的提取器（TableTypes.yml 中的规则编译后）"""
+    params = (SIZES, TABLE_TYPES)
+    param_names = ["size", "table_type"]
+
+    def setup(self, size, table_type):
+        self.table = normalize_table(make_table(table_type, size))  # 提取前已规范化
+        self.handler = RTFParser(None, None).table_handler(tableType[table_type])  # 规则编译不计入
+
+    def time_process_table(self, size, table_type):
+        self.handler(self.table)
+
+
+class ProcessTableData:
+    """按类型分派并处理一份报告中的全部表格"""
+    params = SIZES
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.parser = RTFParser(None, None)
+        self.tables = [(normalize_table(table), tableType[name])
+                       for name, table in zip(TABLE_TYPES, make_tables(size))]
+
+    def time_process_table_data(self, size):
+        for table, table_type in self.tables:
+            self.parser.process_table_data(table, table_type)
+
+
+class ExtractData:
+    """从正文段落中提取结论、诊断等字段"""
+    params = SIZES
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.parser = RTFParser(None, None)
+        self.paragraphs = make_paragraphs(size)
+
+    def time_extract_data(self, size):
+        self.parser.extract_data(self.paragraphs)
+
+
+class ExtractDocumentRow:
+    """一份报告从段落、表格到输出行的完整提取（不含文件读取）"""
+    params = SIZES
+    param_names = ["size"]
+
+    def setup(self, size):
+        from output_schema import OutputSchema
+
+        self.parser = RTFParser(None, None)
+        self.schema = OutputSchema(self.parser.load_config(self.parser.config_path))
+        self.paragraphs = make_paragraphs(size)
+        self.tables = make_tables(size)
+        self.parser.table_classifier()
+
+    def time_extract_document_row(self, size):
+        self.parser.extract_document_row(self.paragraphs, self.tables, self.schema)
@@ -0,0 +1,69 @@
+"""
+单元格数值转换：cell_values 与原先各处的转换函数（legacy，按原样保留在此作对照）。
+语料为多份合成报告中的取值单元格；cold 每轮先清空缓存（只有同一批报告内的重复命中），warm 为缓存已满的稳定状态。
+"""
+import re
+
+import cell_values
+
+from .synthetic import make_value_cells
+
+
+def legacy_number(s):
+    match = re.search(r'(\d+\.?\d*)', s)
+    return float(match.group(1)) if match and '.' in match.group(1) else int(match.group(1)) if match else None
+
+
+def legacy_percent(value):
+    try:
+        cleaned = str(value).replace('%', '').strip()
+        return float(cleaned)
+    except:
+        return None
+
+
+def legacy_duration(time_str):
+    try:
+        if ":" in time_str:
+            parts = list(map(float, time_str.split(":")))
+            return round(parts[0] * 60 + parts[1] + parts[2] / 60, 2)
+        return float(time_str)
+    except:
+        return None
+
+
+def legacy_float(value, default="/"):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+FUNCTIONS = {
+    "number": (legacy_number, cell_values.first_number),
+    "percent": (legacy_percent, cell_values.percent_number),
+    "duration": (legacy_duration, cell_values.duration_minutes),
+    "float": (legacy_float, lambda value: cell_values.to_float(value, "/")),
+}
+
+
+class CellValues:
+    """100 份报告的取值单元格逐个转换"""
+    params = (list(FUNCTIONS), ["legacy", "cold", "warm"])
+    param_names = ["function", "impl"]
+
+    def setup(self, function, impl):
+        self.cells = make_value_cells(100)
+        legacy, compiled = FUNCTIONS[function]
+        self.func = legacy if impl == "legacy" else compiled
+        self.clear = impl == "cold"
+        if impl == "warm":
+            for cell in self.cells:
+                self.func(cell)
+
+    def time_convert(self, function, impl):
+        if self.clear:
+            cell_values.cache_clear()
+        func = self.func
+        for cell in self.cells:
+            func(cell)
@@ -0,0 +1,105 @@
+"""
+启动耗时基准：用 `python -X importtime` 测量各入口模块的导入时间。
+
+    python benchmarks/importtime.py                  # 测量并输出导入耗时
+    python benchmarks/importtime.py --against main   # 在本机同一次运行中与 main 分支的代码比较，变慢时退出码为1
+    python benchmarks/importtime.py --top 15         # 同时列出最耗时的模块
+
+每个模块在新的解释器中导入 --repeat 次，取累计耗时的中位数。
+--against 时把该版本的代码导出到临时目录（与 run.py 相同），两份代码交替导入，
+不保存跨机器的绝对耗时。
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from run import export_revision
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 入口模块：图形界面、命令行，以及解析器本身（命令行开始解析时导入）
+TARGETS = ["main", "cli", "rtf_parser"]
+
+
+def import_profile(module, code_root=ROOT):
+    """在新的解释器中导入 code_root 下的模块，返回 {模块名: (自身耗时us, 累计耗时us)}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=code_root, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败：\n{result.stderr.strip().splitlines()[-1]}")
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # 表头
+        # 同名模块只保留第一次（最外层）的记录
+        profile.setdefault(name.strip(), (int(self_us), int(cumulative)))
+    return profile
+
+
+def measure(module, repeat, roots=(ROOT,)):
+    """
+    各 code_root 下的模块交替导入 repeat 次，
+    返回 [(累计耗时中位数us, 最后一次的导入记录)]，与 roots 一一对应
+    """
+    for root in roots:
+        import_profile(module, root)  # 预热，生成 .pyc
+    times = [[] for _ in roots]
+    profiles = [{} for _ in roots]
+    for _ in range(repeat):
+        for idx, root in enumerate(roots):
+            profiles[idx] = import_profile(module, root)
+            times[idx].append(profiles[idx][module][1])
+    return [(statistics.median(t), profile) for t, profile in zip(times, profiles)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=TARGETS)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--against", metavar="REV", help="与该 git 版本的代码在同一次运行中比较")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许比对比版本慢的比例")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="允许的绝对误差（毫秒）")
+    parser.add_argument("--top", type=int, default=0, help="列出累计耗时最多的N个模块")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="rtfparser_import_") as tmp:
+        roots = (ROOT,)
+        if args.against:
+            export_revision(args.against, tmp)
+            roots = (ROOT, tmp)
+        regressions = []
+        for module in args.modules:
+            try:
+                measured = measure(module, args.repeat, roots)
+            except RuntimeError as e:
+                print(e)
+                continue
+            median, profile = measured[0]
+            line = f"{module:<12} {median / 1000:8.1f} ms"
+            if args.against:
+                base = measured[1][0]
+                line += f"   {args.against} {base / 1000:8.1f} ms  ({(median - base) / base:+.0%})"
+                if median > base * (1 + args.tolerance) + args.slack_ms * 1000:
+                    regressions.append(module)
+                    line += "  变慢"
+            print(line)
+            if args.top:
+                heavy = sorted(profile.items(), key=lambda item: item[1][1], reverse=True)
+                for name, (self_us, cumulative) in heavy[1:args.top + 1]:
+                    print(f"    {name:<40} {cumulative / 1000:8.1f} ms  (自身 {self_us / 1000:.1f} ms)")
+
+    if regressions:
+        print(f"导入耗时比 {args.against} 慢超过阈值：{regressions}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
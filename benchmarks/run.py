@@ -0,0 +1,202 @@
+"""
+微基准运行器：执行 benchmarks/bench_*.py 中的 asv 风格基准。
+
+    python benchmarks/run.py                      # 运行全部基准，输出耗时
+    python benchmarks/run.py -k Apnea             # 只运行名称中包含 Apnea 的基准
+    python benchmarks/run.py --against main       # 在本机同一次运行中与 main 分支的代码比较，变慢超过阈值时退出码为1
+
+每个基准先用 timeit 的 autorange 确定循环次数，重复 --repeat 次，取单次耗时的最小值（受系统负载干扰最小）。
+--against 时把该版本的代码导出到临时目录，用当前的基准分别测量两份代码：
+两边在各自的子进程中交替运行 --rounds 轮，每个基准取各轮的最小值后比较，
+不保存跨机器、跨时间的绝对耗时，机器负载的变化同时作用于两边。
+基准模块在对比版本中无法运行（如依赖新增的模块）时，该基准不参与比较。
+"""
+import argparse
+import importlib
+import importlib.util
+import inspect
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+
+def _param_grid(cls):
+    params = getattr(cls, "params", None)
+    if params is None:
+        return [()]
+    # 单个参数时 params 为列表，多个参数时为列表的元组
+    if not isinstance(params, tuple):
+        params = (params,)
+    return list(itertools.product(*params))
+
+
+def _bench_name(module, cls, method, args):
+    name = f"{module}.{cls.__name__}.{method}"
+    if args:
+        names = getattr(cls, "param_names", [f"p{i}" for i in range(len(args))])
+        name += "(" + ", ".join(f"{k}={v}" for k, v in zip(names, args)) + ")"
+    return name
+
+
+def _use_code_root(code_root):
+    """被测代码从 code_root 导入；基准模块始终取当前目录下的 benchmarks 包"""
+    sys.path.insert(0, code_root)
+    spec = importlib.util.spec_from_file_location(
+        "benchmarks", os.path.join(BENCH_DIR, "__init__.py"), submodule_search_locations=[BENCH_DIR])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules["benchmarks"] = package
+    spec.loader.exec_module(package)
+
+
+def discover(skipped=None):
+    """返回 [(基准名, 类, 方法名, 参数)]；无法导入的基准模块记入 skipped {模块名: 错误}"""
+    benchmarks = []
+    for filename in sorted(os.listdir(BENCH_DIR)):
+        if not (filename.startswith("bench_") and filename.endswith(".py")):
+            continue
+        module_name = filename[:-3]
+        try:
+            module = importlib.import_module(f"benchmarks.{module_name}")
+        except Exception as e:
+            if skipped is None:
+                raise
+            skipped[module_name] = f"{type(e).__name__}: {e}"
+            continue
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            methods = [name for name in dir(cls) if name.startswith("time_")]
+            for method, args in itertools.product(methods, _param_grid(cls)):
+                benchmarks.append((_bench_name(module_name, cls, method, args), cls, method, args))
+    return benchmarks
+
+
+def run_one(cls, method, args, repeat):
+    """返回单次调用耗时（秒）"""
+    instance = cls()
+    if hasattr(instance, "setup"):
+        instance.setup(*args)
+    func = getattr(instance, method)
+    try:
+        timer = timeit.Timer(lambda: func(*args))
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat, number)) / number
+    finally:
+        if hasattr(instance, "teardown"):
+            instance.teardown(*args)
+
+
+def _format_time(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.2f} us"
+    return f"{seconds * 1e3:8.2f} ms"
+
+
+def _measure(code_root, name_filter, repeat):
+    """子进程中执行：测量 code_root 下的代码，结果以 JSON 输出到标准输出"""
+    _use_code_root(code_root)
+    os.chdir(code_root)  # 字段配置等按当前目录查找
+    skipped = {}
+    results = {}
+    for name, cls, method, params in discover(skipped):
+        if name_filter not in name:
+            continue
+        try:
+            results[name] = run_one(cls, method, params, repeat)
+        except Exception as e:
+            skipped[name] = f"{type(e).__name__}: {e}"
+    json.dump({"results": results, "skipped": skipped}, sys.stdout)
+
+
+def export_revision(rev, dest):
+    """把 git 版本 rev 的文件导出到 dest（不改动当前工作区）"""
+    archive = subprocess.run(["git", "-C", ROOT, "archive", "--format=tar", rev],
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dest)
+
+
+def _measure_in_subprocess(code_root, name_filter, repeat):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure", code_root,
+         "-k", name_filter, "--repeat", str(repeat)],
+        check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def compare(rev, name_filter, repeat, rounds, tolerance):
+    """与 rev 的代码交替测量 rounds 轮，返回变慢超过阈值的基准"""
+    current, baseline, skipped = {}, {}, {}
+    with tempfile.TemporaryDirectory(prefix="rtfparser_bench_") as tmp:
+        export_revision(rev, tmp)
+        for round_idx in range(rounds):
+            print(f"第 {round_idx + 1}/{rounds} 轮......", flush=True)
+            for code_root, best in ((tmp, baseline), (ROOT, current)):
+                measured = _measure_in_subprocess(code_root, name_filter, repeat)
+                for name, elapsed in measured["results"].items():
+                    best[name] = min(elapsed, best.get(name, elapsed))
+                if code_root == tmp:
+                    skipped.update(measured["skipped"])
+
+    regressions = []
+    for name, elapsed in current.items():
+        line = f"{name:<84} {_format_time(elapsed)}"
+        base = baseline.get(name)
+        if base:
+            line += f"  {rev}: {_format_time(base)}  ({(elapsed - base) / base:+.0%})"
+            if elapsed > base * (1 + tolerance):
+                regressions.append(name)
+                line += "  变慢"
+        else:
+            line += f"  （{rev} 中无法运行）"
+        print(line)
+    if skipped:
+        print(f"{rev} 中无法运行的基准：")
+        for name, error in skipped.items():
+            print(f"  {name}: {error}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", default="", help="只运行名称中包含该字符串的基准")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--against", metavar="REV", help="与该 git 版本的代码在同一次运行中比较")
+    parser.add_argument("--rounds", type=int, default=3, help="--against 时两份代码交替测量的轮数")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="允许比对比版本慢的比例")
+    parser.add_argument("--measure", metavar="CODE_ROOT", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        _measure(args.measure, args.filter, args.repeat)
+        return 0
+
+    if args.against:
+        regressions = compare(args.against, args.filter, args.repeat, args.rounds, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} 个基准比 {args.against} 慢超过 {args.tolerance:.0%}：")
+            for name in regressions:
+                print(f"  {name}")
+            return 1
+        return 0
+
+    _use_code_root(ROOT)
+    os.chdir(ROOT)  # 字段配置等按当前目录查找
+    for name, cls, method, params in discover():
+        if args.filter not in name:
+            continue
+        print(f"{name:<84} {_format_time(run_one(cls, method, params, args.repeat))}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
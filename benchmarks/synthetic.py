@@ -0,0 +1,153 @@
+"""
+合成的PSG报告表格和段落，结构与读取器（docx_reader / rtf_reader）输出的一致：
+表格为 [[单元格文本, ...], ...]，段落为 (章节, 文本)。
+size 控制表格行数（模拟不同模板/设备输出的长表），数值由 seed 决定，结果可复现。
+"""
+import random
+
+TABLE_TYPES = ["Info", "FirstOrder", "SleepStage", "Arousal", "Apnea1", "Apnea2",
+               "LimbMovements", "BreathingEvent", "Snoring", "OxygenSaturation"]
+
+
+def _num(rnd, low, high, digits=1):
+    return f"{rnd.uniform(low, high):.{digits}f}"
+
+
+def info_table(rnd, size=1):
+    rows = [["姓名：张三", "性别：Male", "年龄：45 岁"],
+            [f"身高：{_num(rnd, 150, 190)} 厘米", f"体重：{_num(rnd, 45, 110)} kg",
+             f"体重指数(BMI)：{_num(rnd, 18, 35)} kg/m2"],
+            ["出生日期：1980-01-01", f"颈围：{_num(rnd, 32, 45, 0)} cm", f"腹围：{_num(rnd, 70, 110, 0)} cm"],
+            ["监测日期：2024-03-01", "监测医/技师：李四", "转诊医师：王五"]]
+    # 部分模板附加的备注行
+    rows += [[f"备注{i}：-", f"床号：{i}", "科室：睡眠中心"] for i in range(size - 1)]
+    return rows
+
+
+def firstorder_table(rnd, size=1):
+    rows = [["熄灯时间", "22:30:00", "开灯时间", "06:30:00"],
+            ["总记录时间(TRT)", _num(rnd, 400, 500), "总睡眠时间(TST)", _num(rnd, 300, 450)],
+            ["总卧床时间TIB", _num(rnd, 400, 500), "睡眠期平均心率（次/分钟）", _num(rnd, 50, 80, 0)],
+            ["睡眠效率(TST/TRT)", _num(rnd, 60, 95), "入睡后清醒次数", _num(rnd, 0, 30, 0)]]
+    rows += [[f"参数{i}（次）", _num(rnd, 0, 100), f"指标{i} (min)", _num(rnd, 0, 100)] for i in range(size - 1)]
+    return rows
+
+
+def sleepstage_table(rnd, size=1):
+    rows = [["睡眠分期", "睡眠时间(min)", "%TST"]]
+    stages = ["N1 期", "N2期", "N3期", "REM期"]
+    stages += [f"S{i}期" for i in range(size - 1)]
+    rows += [[stage, _num(rnd, 10, 200), _num(rnd, 1, 60)] for stage in stages]
+    return rows
+
+
+def arousal_table(rnd, size=1):
+    rows = [["微觉醒类型", "REM", "NREM", "次数", "指数(/TST)"]]
+    kinds = ["呼吸相关", "MVT相关", "自发性"] + [f"类型{i}" for i in range(size - 1)] + ["Total"]
+    rows += [[kind, _num(rnd, 0, 20, 0), _num(rnd, 0, 50, 0), _num(rnd, 0, 70, 0), _num(rnd, 0, 10)]
+             for kind in kinds]
+    rows[2][4] = "-"
+    return rows
+
+
+def apnea1_table(rnd, size=1):
+    rows = [["", "REM", "NREM", "指数 (/TST)", "总睡眠期"]]
+    kinds = ["呼吸暂停", "低通气", "呼吸暂停+低通气"] + [f"事件 {i}" for i in range(size - 1)] + ["AHI(/hr)"]
+    rows += [[kind, _num(rnd, 0, 50, 0), _num(rnd, 0, 200, 0), _num(rnd, 0, 30), _num(rnd, 0, 250, 0)]
+             for kind in kinds]
+    rows[-1][3] = ""
+    return rows
+
+
+def apnea2_table(rnd, size=1):
+    rows = [["", "阻塞性", "混合性", "中枢性", "所有暂停", "低通气"]]
+    params = ["次数", "平均时长（sec）", "最长时长（sec）"] + [f"参数{i}" for i in range(size - 1)]
+    rows += [[param] + [_num(rnd, 0, 60) for _ in range(5)] for param in params]
+    rows[2][2] = "-"
+    rows[2][3] = ""
+    return rows
+
+
+def limbmovements_table(rnd, size=1):
+    rows = [["", "睡眠期次数", "睡眠期指数"], ["PLM", _num(rnd, 0, 100, 0), _num(rnd, 0, 20)], ["LM", "-", ""]]
+    rows += [[f"LM {i}", _num(rnd, 0, 100, 0), _num(rnd, 0, 20)] for i in range(size - 1)]
+    return rows
+
+
+def breathingevent_table(rnd, size=1):
+    rows = [["体位", "阻塞性\n（次）", "混合性", "中枢性", "低通气", "AHI", "睡眠时间（%）", "持续时间（min）"]]
+    positions = ["仰卧", "左 侧", "右侧", "俯卧", "坐位"] + [f"体位{i}" for i in range(size - 1)]
+    for position in positions:
+        rows.append([position, _num(rnd, 0, 50, 0), _num(rnd, 0, 5, 0), _num(rnd, 0, 5, 0),
+                     _num(rnd, 0, 50, 0), _num(rnd, 0, 30), _num(rnd, 0, 60), _num(rnd, 0, 300)])
+    rows[4][1] = "NA"
+    return rows
+
+
+def snoring_table(rnd, size=1):
+    rows = [["打鼾概要", "", "", ""],
+            ["鼾声次数（睡眠期）", _num(rnd, 0, 500, 0), "鼾声指数（睡眠期）", _num(rnd, 0, 60)]]
+    rows[1] += [x for i in range(size - 1) for x in (f"鼾声参数{i}", _num(rnd, 0, 100))]
+    return rows
+
+
+def oxygensaturation_table(rnd, size=1):
+    rows = [["睡眠期平均血氧 (%)", _num(rnd, 90, 98, 0), "清醒期平均SpO2 (%)", f"{_num(rnd, 92, 99, 0)}%"],
+            ["睡眠期最低血氧 (%)", _num(rnd, 70, 90, 0), "氧减≥3%指数(/h)", _num(rnd, 0, 30)]]
+    for level in ["95%", "90%", "85%", "80%"]:
+        rows.append([f"低于{level} 时间（min）", f"0:{rnd.randint(0, 59)}:{_num(rnd, 0, 59)}", "x",
+                     f"{_num(rnd, 0, 30)}%"])
+    rows += [[f"血氧参数{i}", _num(rnd, 0, 100), "x", _num(rnd, 0, 100)] for i in range(size - 1)]
+    return rows
+
+
+_BUILDERS = {
+    "Info": info_table,
+    "FirstOrder": firstorder_table,
+    "SleepStage": sleepstage_table,
+    "Arousal": arousal_table,
+    "Apnea1": apnea1_table,
+    "Apnea2": apnea2_table,
+    "LimbMovements": limbmovements_table,
+    "BreathingEvent": breathingevent_table,
+    "Snoring": snoring_table,
+    "OxygenSaturation": oxygensaturation_table,
+}
+
+
+def make_table(table_type, size=1, seed=0):
+    return _BUILDERS[table_type](random.Random(seed), size)
+
+
+def make_tables(size=1, seed=0):
+    """一份报告中的全部表格，按报告中的顺序排列"""
+    rnd = random.Random(seed)
+    return [_BUILDERS[name](rnd, size) for name in TABLE_TYPES]
+
+
+def make_paragraphs(size=1, seed=0):
+    """报告正文段落（已按"#"标题划分章节），size 控制结论和诊断的段落数"""
+    rnd = random.Random(seed)
+    texts = ["XX医院", "睡眠监测报告", "多导睡眠监测(PSG)", "", "# 总结",
+             f"AHI={_num(rnd, 1, 60)}次/h，OAHI={_num(rnd, 1, 50)}，OAI={_num(rnd, 0, 30)}",
+             f"睡眠期间血氧<90%的累计时间{_num(rnd, 0, 60)}min；占比{_num(rnd, 0, 20)}%", ""]
+    texts.append("结论：轻度阻塞性睡眠呼吸暂停")
+    texts += [f"伴低氧血症，第{i}条说明" for i in range(size)]
+    texts += ["", "诊断：OSA"]
+    texts += [f"建议{i}：复查" for i in range(size)]
+    texts += ["", "# 附录"] + [f"附录内容 {i}" for i in range(size)]
+
+    paragraphs = []
+    section = ""
+    for text in texts:
+        if text.startswith("#"):
+            section = text[1:].strip()
+        else:
+            paragraphs.append((section, text))
+    return paragraphs
+
+
+def make_value_cells(reports=50, size=1):
+    """多份报告中全部表格的取值单元格（每行第一列之外），按报告顺序排列"""
+    return [cell for seed in range(reports) for table in make_tables(size, seed)
+            for row in table for cell in row[1:]]
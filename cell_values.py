@@ -0,0 +1,110 @@
+"""
+单元格取值的数值转换：整数、小数、百分数、H:M:S 时长。
+正则在导入时编译一次；纯整数、纯小数先走字符串判断，不经过正则和异常；
+"0"、"-"、"/"、常见百分比等取值在各报告中大量重复，字符串输入的结果按 LRU 缓存（转换失败的结果 None 也缓存）。
+转换失败时返回 None（或调用方给出的默认值），不抛出异常。
+"""
+import re
+from functools import lru_cache
+
+# 各转换函数缓存的不同字符串个数
+VALUE_CACHE_SIZE = 8192
+
+_NUMBER = re.compile(r'(\d+\.?\d*)')
+
+
+def _is_decimal(text):
+    """ASCII 的 "123"、"12.5"、"12." 形式"""
+    head, dot, tail = text.partition(".")
+    return head.isdigit() and (not tail or tail.isdigit()) and head.isascii() and tail.isascii()
+
+
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def first_number(text):
+    """字符串中第一个数字（如 "45 岁" -> 45，"23.5 kg/m2" -> 23.5），带小数点为 float，否则为 int，没有数字时为 None"""
+    if _is_decimal(text):
+        return float(text) if "." in text else int(text)
+    match = _NUMBER.search(text)
+    if match is None:
+        return None
+    number = match.group(1)
+    return float(number) if "." in number else int(number)
+
+
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def _float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def to_float(value, default=None):
+    """float(value)，失败时返回 default"""
+    if type(value) is str:
+        result = _float(value)
+    else:
+        try:
+            result = float(value)
+        except (TypeError, ValueError):
+            result = None
+    return default if result is None else result
+
+
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def _int_or_float(text):
+    try:
+        return float(text) if "." in text else int(text)
+    except ValueError:
+        return None
+
+
+def to_int_or_float(value, default=None):
+    """带小数点的为 float，否则为 int；失败（包括非字符串）时返回 default"""
+    if type(value) is not str:
+        return default
+    result = _int_or_float(value)
+    return default if result is None else result
+
+
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def _percent(text):
+    try:
+        return float(text.replace('%', '').strip())
+    except ValueError:
+        return None
+
+
+def percent_number(value):
+    """去掉百分号后的 float（"93%" -> 93.0），失败时为 None"""
+    return _percent(value if type(value) is str else str(value))
+
+
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def _minutes(text):
+    if ":" not in text:
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    # H:M:S（如 "0:12:2.0"），换算为分钟，保留两位小数
+    parts = text.split(":")
+    if len(parts) != 3:
+        return None
+    try:
+        hours, minutes, seconds = map(float, parts)
+    except ValueError:
+        return None
+    return round(hours * 60 + minutes + seconds / 60, 2)
+
+
+def duration_minutes(value):
+    """时长（分钟数或 H:M:S）换算为分钟，失败（包括非字符串）时为 None"""
+    if type(value) is not str:
+        return None
+    return _minutes(value)
+
+
+def cache_clear():
+    for func in (first_number, _float, _int_or_float, _percent, _minutes):
+        func.cache_clear()
@@ -0,0 +1,177 @@
+"""
+命令行入口，不依赖图形界面，可在无显示环境的批处理节点上运行：
+
+    python cli.py 报告目录1 报告目录2 -o 结果目录 -f parquet -j 4
+
+退出码：0 全部成功；1 有文件或文件夹处理失败；2 参数错误；130 被中断。
+收到 Ctrl+C 或 SIGTERM 时终止正在进行的转换，保存已完成的结果并列出未处理的文件后退出；
+再次按 Ctrl+C 立即退出。
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+
+from log_processor import LogManager
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+FORMATS = ["xlsx", "csv", "parquet", "arrow"]
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="rtf_parser",
+        description="从PSG报告（RTF）中提取数据并汇总到一个结果文件")
+    parser.add_argument("folders", nargs="+", help="RTF报告所在的文件夹")
+    parser.add_argument("-o", "--output",
+                        help="结果文件路径（只有一个文件夹时）或结果目录；"
+                             "默认写入 <文件夹>/<文件夹名>.<格式>")
+    parser.add_argument("-f", "--format", choices=FORMATS,
+                        help="输出格式，默认取 --output 的扩展名，否则为 xlsx")
+    parser.add_argument("-c", "--config", help="字段配置文件，默认为当前目录下的 MedicalReportParameters.yml")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="并行处理的进程数")
+    parser.add_argument("--pipeline", type=int, default=0, metavar="N",
+                        help="使用流水线处理：N 个线程并发转换，同时解析已转换好的文件")
+    parser.add_argument("--parse-workers", type=int, default=1, help="流水线中的解析线程数")
+    parser.add_argument("--reader", choices=["docx", "rtf"], default="docx",
+                        help="docx：经 LibreOffice 转换后读取；rtf：直接解析RTF")
+    parser.add_argument("--cache", help="解析结果缓存（SQLite）文件路径")
+    parser.add_argument("--incremental", action="store_true",
+                        help="只处理新增或变化的文件，更新到已有的结果表（xlsx）")
+    parser.add_argument("--perf-report", action="store_true",
+                        help="记录各阶段耗时并写出JSON报告，默认为 <结果文件>.perf.json")
+    parser.add_argument("--perf-report-path", metavar="PATH",
+                        help="耗时报告的路径（指定时即开启 --perf-report）")
+    parser.add_argument("--dump-tables", action="append", default=[], metavar="PATTERN",
+                        help="输出文件名匹配该模式（如 *张三*.rtf）的报告的原始表格，可重复指定")
+    parser.add_argument("--dump-sample", type=float, default=0.0, metavar="RATE",
+                        help="按比例（0~1）抽样输出报告的原始表格")
+    parser.add_argument("--json-log", metavar="PATH",
+                        help="同时把日志以 JSON Lines 格式写入该文件（按大小轮转），"
+                             "每个文件的文件名、阶段、耗时和结果为独立字段")
+    parser.add_argument("--log-level", default="INFO",
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
+    return parser
+
+
+def resolve_outputs(folders, output, output_format):
+    """
+    确定每个文件夹的结果文件路径，返回 {文件夹: 路径}，路径为None时使用默认位置。
+    output 带有输出格式的扩展名时为结果文件；没有扩展名或是已存在的目录时为结果目录，
+    其他扩展名（如拼错的 out.xls）视为参数错误，不创建目录。
+    """
+    if not output:
+        return {folder: None for folder in folders}
+    ext = os.path.splitext(output)[1].lower().lstrip(".")
+    if ext in FORMATS or ext == "feather":
+        if len(folders) > 1:
+            raise ValueError("处理多个文件夹时 --output 应为目录")
+        return {folders[0]: output}
+    if ext and not os.path.isdir(output):
+        raise ValueError(f"不支持的输出格式：.{ext}（可用：{', '.join(FORMATS + ['feather'])}）；"
+                         f"结果目录应不带扩展名或已经存在")
+    os.makedirs(output, exist_ok=True)
+    return {folder: os.path.join(output, f"{os.path.basename(os.path.normpath(folder))}.{output_format}")
+            for folder in folders}
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+
+    log_manager = LogManager()
+    log_manager.set_log_level(args.log_level)
+    if args.json_log:
+        log_manager.enable_json_log(args.json_log)
+    logger = log_manager.get_logger()
+
+    missing = [folder for folder in args.folders if not os.path.isdir(folder)]
+    if missing:
+        logger.error(f"文件夹不存在：{missing}")
+        return EXIT_USAGE
+    if args.config and not os.path.isfile(args.config):
+        logger.error(f"配置文件不存在：{args.config}")
+        return EXIT_USAGE
+    if args.workers > 1 and args.pipeline > 0:
+        logger.error("-j/--workers 与 --pipeline 不能同时使用")
+        return EXIT_USAGE
+    if args.incremental and (args.output or args.format not in (None, "xlsx")):
+        logger.error("增量模式只更新各文件夹中的 xlsx 结果表，不支持 --output/--format")
+        return EXIT_USAGE
+
+    output_format = args.format
+    if args.output:
+        ext = os.path.splitext(args.output)[1].lower().lstrip(".")
+        ext = "arrow" if ext == "feather" else ext
+        if ext in FORMATS:
+            if output_format not in (None, ext):
+                logger.error(f"--output 的扩展名（{ext}）与 --format {output_format} 不一致")
+                return EXIT_USAGE
+            output_format = ext
+    output_format = output_format or "xlsx"
+    try:
+        outputs = resolve_outputs(args.folders, args.output, output_format)
+    except ValueError as e:
+        logger.error(str(e))
+        return EXIT_USAGE
+
+    # 图形界面以外的入口只在这里导入解析器，避免参数错误时也加载全部依赖
+    from rtf_parser import RTFParser
+
+    stop_event = threading.Event()
+    parser = RTFParser(log_queue=log_manager.get_log_queue(), stop_event=stop_event,
+                       reader=args.reader, workers=args.workers, cache_path=args.cache,
+                       pipeline_workers=args.pipeline, parse_workers=args.parse_workers,
+                       instrument=args.perf_report or args.perf_report_path is not None,
+                       report_path=args.perf_report_path,
+                       dump_tables=args.dump_tables, dump_sample=args.dump_sample,
+                       output_format=output_format,
+                       config_path=os.path.abspath(args.config) if args.config else None)
+    def request_stop(signum, frame):
+        logger.warning("收到停止信号，正在终止......")
+        stop_event.set()
+        # 再次按 Ctrl+C 时直接中断
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, request_stop)
+
+    status = EXIT_OK
+    try:
+        for folder, output in outputs.items():
+            if stop_event.is_set():
+                logger.warning(f"任务已停止，未处理的文件夹：{folder}")
+                return EXIT_INTERRUPTED
+            try:
+                if args.incremental:
+                    parser.update_files(folder)
+                    if stop_event.is_set():
+                        logger.warning(f"任务已停止，{folder} 的更新未完成")
+                        return EXIT_INTERRUPTED
+                    if parser.unprocessed_files:
+                        # 仍在写入的文件留到下一次运行，退出码提示调度方
+                        status = EXIT_FAILED
+                elif parser.process_files(folder, output) is False:
+                    logger.warning("任务已停止")
+                    return EXIT_INTERRUPTED
+            except Exception as e:
+                logger.error(f"处理文件夹失败 {folder}: {str(e)}")
+                status = EXIT_FAILED
+                continue
+            if parser.failed_files:
+                logger.warning(f"{folder} 中有 {len(parser.failed_files)} 个文件处理失败：{parser.failed_files}")
+                status = EXIT_FAILED
+    except KeyboardInterrupt:
+        parser.stop()
+        logger.warning("已中断")
+        return EXIT_INTERRUPTED
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,505 @@
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from queue import Queue
+
+from log_processor import LogManager
+
+# LibreOffice 导出 docx 使用的过滤器名称
+DOCX_FILTER = "MS Word 2007 XML"
+
+# soffice 启动器会再派生 soffice.bin，放在独立的进程组中以便整体终止
+if os.name == "nt":
+    _NEW_PROCESS_GROUP = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _NEW_PROCESS_GROUP = {"start_new_session": True}
+
+
+class ConversionCancelled(RuntimeError):
+    """转换因停止请求被终止"""
+
+
+def _kill_tree(process):
+    """终止 soffice 进程及其子进程"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+class _ProcessSet:
+    """正在运行的 soffice 进程，cancel() 时全部终止"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = set()
+        self._cancelled = set()
+
+    def run(self, cmd):
+        """运行命令；退出码非0时抛出 CalledProcessError，被 cancel() 终止时抛出 ConversionCancelled"""
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                   **_NEW_PROCESS_GROUP)
+        with self._lock:
+            self._running.add(process)
+        try:
+            _, stderr = process.communicate()
+        except BaseException:
+            # 等待时被中断（如 Ctrl+C），不留下孤儿进程
+            _kill_tree(process)
+            raise
+        finally:
+            with self._lock:
+                self._running.discard(process)
+                cancelled = process in self._cancelled
+                self._cancelled.discard(process)
+        if cancelled:
+            raise ConversionCancelled("转换已取消")
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+
+    def cancel(self):
+        with self._lock:
+            processes = list(self._running)
+            self._cancelled.update(processes)
+        for process in processes:
+            _kill_tree(process)
+
+
+class ConversionCanceller:
+    """
+    监视停止事件：置位后每隔 interval 秒终止一次已登记转换器中正在运行的转换，直到 close()，
+    这样停止请求发出后才启动的转换也会被终止。
+    """
+
+    def __init__(self, stop_event, converters=(), interval=0.2):
+        self.stop_event = stop_event
+        self.converters = []
+        self.interval = interval
+        self._done = threading.Event()
+        self._thread = None
+        for converter in converters:
+            self.add(converter)
+
+    def add(self, converter):
+        """登记转换器（没有 cancel() 的转换器被忽略），返回该转换器"""
+        if converter is not None and hasattr(converter, "cancel"):
+            self.converters.append(converter)
+        return converter
+
+    def cancel_all(self):
+        for converter in list(self.converters):
+            converter.cancel()
+
+    def _watch(self):
+        while not self._done.wait(self.interval):
+            if self.stop_event.is_set():
+                self.cancel_all()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._watch, name="ConversionCanceller", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, *exc):
+        self.close()
+        # 异常退出（如 Ctrl+C）时不留下仍在运行的转换
+        if exc_type is not None:
+            self.cancel_all()
+
+
+def profile_url(profile_dir):
+    """将用户配置目录转换为 -env:UserInstallation 需要的 file URL"""
+    path = os.path.abspath(profile_dir).replace("\\", "/")
+    if not path.startswith("/"):
+        path = "/" + path  # Windows 盘符路径
+    return "file://" + path
+
+
+def _free_port():
+    """向系统申请一个空闲端口"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _process_rss_mb(pid):
+    """读取进程常驻内存(MB)，无法获取时返回None"""
+    try:
+        import psutil
+        proc = psutil.Process(pid)
+        rss = proc.memory_info().rss
+        for child in proc.children(recursive=True):
+            rss += child.memory_info().rss
+        return rss / (1024 * 1024)
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class SubprocessConverter:
+    """每个文件启动一次 soffice 的转换器（无 UNO 环境时的回退方案）"""
+
+    # 同一用户配置目录不能同时运行多个 soffice，多线程使用时每个线程需要各自的实例
+    thread_safe = False
+
+    def __init__(self, soffice="soffice", profile_dir=None):
+        self.soffice = soffice
+        # 指定独立的用户配置目录后，多个进程可以同时调用 soffice
+        self.profile_dir = profile_dir
+        self._processes = _ProcessSet()
+
+    def convert(self, rtf_path, outdir=None):
+        outdir = outdir or os.path.dirname(rtf_path)
+        profile = [f'-env:UserInstallation={profile_url(self.profile_dir)}'] if self.profile_dir else []
+        name = os.path.splitext(os.path.basename(rtf_path))[0] + ".docx"
+        docx_path = os.path.join(outdir, name)
+        try:
+            self._processes.run([
+                self.soffice, '--headless', *profile, '--convert-to', 'docx',
+                '--outdir', outdir, rtf_path
+            ])
+        except ConversionCancelled:
+            # 删除可能写了一半的输出
+            if os.path.exists(docx_path):
+                os.remove(docx_path)
+            raise
+        return docx_path
+
+    def cancel(self):
+        """终止正在运行的转换（可在任意线程调用）"""
+        self._processes.cancel()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _OfficeInstance:
+    """一个常驻的 headless LibreOffice 进程，使用独立的用户配置目录"""
+
+    def __init__(self, soffice, startup_timeout):
+        self.soffice = soffice
+        self.startup_timeout = startup_timeout
+        self.logger = LogManager().get_logger()
+        self.process = None
+        self.desktop = None
+        self.profile_dir = None
+        self.port = None
+        self.conversions = 0
+
+    def start(self):
+        import uno
+
+        self.profile_dir = tempfile.mkdtemp(prefix="rtfparser_lo_")
+        self.port = _free_port()
+        accept = f"socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"
+        self.process = subprocess.Popen([
+            self.soffice, '--headless', '--invisible', '--nologo',
+            '--nodefault', '--norestore', '--nolockcheck',
+            f'--accept={accept}',
+            f'-env:UserInstallation={profile_url(self.profile_dir)}'
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **_NEW_PROCESS_GROUP)
+
+        local_ctx = uno.getComponentContext()
+        resolver = local_ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_ctx)
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                ctx = resolver.resolve(f"uno:{accept}")
+                break
+            except Exception:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError(f"LibreOffice 实例启动失败(port={self.port})")
+                time.sleep(0.2)
+        self.desktop = ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", ctx)
+        self.conversions = 0
+        self.logger.debug(f"LibreOffice 实例已启动 pid={self.process.pid} port={self.port}")
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def kill(self):
+        if self.alive():
+            _kill_tree(self.process)
+
+    def rss_mb(self):
+        return _process_rss_mb(self.process.pid) if self.alive() else None
+
+    def convert(self, rtf_path, docx_path):
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def prop(name, value):
+            p = PropertyValue()
+            p.Name = name
+            p.Value = value
+            return p
+
+        doc = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(rtf_path)), "_blank", 0,
+            (prop("Hidden", True),))
+        if doc is None:
+            raise RuntimeError(f"LibreOffice 无法打开 {rtf_path}")
+        try:
+            doc.storeToURL(uno.systemPathToFileUrl(os.path.abspath(docx_path)),
+                           (prop("FilterName", DOCX_FILTER),))
+        finally:
+            doc.close(True)
+        self.conversions += 1
+        return docx_path
+
+    def stop(self):
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+            self.desktop = None
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+
+class OfficeServerPool:
+    """
+    常驻 LibreOffice 转换池。
+    维护 size 个 headless 实例（各自独立的用户配置），转换请求分派到空闲实例；
+    实例在转换次数达到 max_conversions 或内存超过 max_memory_mb 时回收重启，
+    崩溃的实例会在下次使用前自动重启。
+    cancel() 终止所有实例，之后的转换请求直接抛出 ConversionCancelled。
+    """
+
+    # 多个线程可以同时提交转换，由空闲实例队列分派
+    thread_safe = True
+
+    def __init__(self, size=1, max_conversions=200, max_memory_mb=1024,
+                 soffice="soffice", startup_timeout=30):
+        self.size = max(1, size)
+        self.max_conversions = max_conversions
+        self.max_memory_mb = max_memory_mb
+        self.soffice = soffice
+        self.startup_timeout = startup_timeout
+        self.logger = LogManager().get_logger()
+        self._idle = Queue()
+        self._instances = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._cancelled = False
+        for _ in range(self.size):
+            instance = _OfficeInstance(soffice, startup_timeout)
+            self._instances.append(instance)
+            self._idle.put(instance)
+
+    @staticmethod
+    def available():
+        """当前 Python 环境是否可以使用 UNO"""
+        try:
+            import uno  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _restart(self, instance, reason):
+        self.logger.info(f"重启 LibreOffice 实例：{reason}")
+        instance.stop()
+        instance.start()
+
+    def _ensure_ready(self, instance):
+        if instance.process is None:
+            instance.start()
+        elif not instance.alive():
+            self._restart(instance, "进程已退出")
+
+    def _maybe_recycle(self, instance):
+        if self.max_conversions and instance.conversions >= self.max_conversions:
+            self._restart(instance, f"已完成 {instance.conversions} 次转换")
+            return
+        if self.max_memory_mb:
+            rss = instance.rss_mb()
+            if rss is not None and rss > self.max_memory_mb:
+                self._restart(instance, f"内存占用 {rss:.0f}MB")
+
+    def convert(self, rtf_path, outdir=None):
+        """转换RTF为DOCX，返回DOCX路径"""
+        if self._closed:
+            raise RuntimeError("转换池已关闭")
+        if self._cancelled:
+            raise ConversionCancelled("转换已取消")
+        outdir = outdir or os.path.dirname(rtf_path)
+        docx_path = os.path.join(
+            outdir, os.path.splitext(os.path.basename(rtf_path))[0] + ".docx")
+
+        instance = self._idle.get()
+        try:
+            self._ensure_ready(instance)
+            try:
+                instance.convert(rtf_path, docx_path)
+            except Exception as e:
+                if self._cancelled:
+                    if os.path.exists(docx_path):
+                        os.remove(docx_path)
+                    raise ConversionCancelled("转换已取消") from e
+                if instance.alive():
+                    raise
+                # 实例在转换过程中崩溃，重启后重试一次
+                self._restart(instance, f"转换时崩溃: {e}")
+                instance.convert(rtf_path, docx_path)
+            self._maybe_recycle(instance)
+            return docx_path
+        finally:
+            self._idle.put(instance)
+
+    def cancel(self):
+        """终止所有实例中正在进行的转换（可在任意线程调用）"""
+        self._cancelled = True
+        for instance in self._instances:
+            instance.kill()
+
+    def close(self):
+        """关闭所有实例"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for instance in self._instances:
+            instance.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _convert_chunk(rtf_paths, outdir, soffice, processes):
+    """
+    在独立的用户配置下，用一次 soffice 调用转换一组文件，返回 {rtf路径: docx路径}。
+    先转换到 outdir 下新建的临时目录，再把本次生成的文件移到 outdir：
+    调用失败时不移动任何文件，outdir 中以前留下的同名 docx 不会被当作本次的结果。
+    """
+    profile_dir = tempfile.mkdtemp(prefix="rtfparser_lo_")
+    staging_dir = None
+    try:
+        staging_dir = tempfile.mkdtemp(prefix=".rtfparser_out_", dir=outdir)
+        processes.run([
+            soffice, '--headless', '--norestore',
+            f'-env:UserInstallation={profile_url(profile_dir)}',
+            '--convert-to', 'docx', '--outdir', staging_dir, *rtf_paths
+        ])
+        converted = {}
+        for path in rtf_paths:
+            name = os.path.splitext(os.path.basename(path))[0] + ".docx"
+            staged = os.path.join(staging_dir, name)
+            if os.path.exists(staged):
+                docx_path = os.path.join(outdir, name)
+                os.replace(staged, docx_path)
+                converted[path] = docx_path
+        return converted
+    finally:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        if staging_dir is not None:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def convert_batch(rtf_paths, outdir=None, workers=4, chunk_size=None, soffice="soffice", stop_event=None):
+    """
+    批量转换RTF为DOCX。
+    文件被切分为若干组，每组一次 soffice 调用，各组在独立的用户配置目录下并行执行，
+    避免共享默认配置时互相加锁。
+    stop_event 置位后终止正在运行的 soffice，不再启动新的组。
+    返回 {rtf路径: docx路径}，只包含本次调用实际生成的文件；调用失败或被终止的组中的文件都不在结果中。
+    """
+    logger = LogManager().get_logger()
+    rtf_paths = list(rtf_paths)
+    if not rtf_paths:
+        return {}
+    workers = max(1, workers)
+    if not chunk_size:
+        chunk_size = max(1, min(50, -(-len(rtf_paths) // workers)))
+
+    # 按输出目录分组，保证同一次调用的 --outdir 一致
+    groups = {}
+    for path in rtf_paths:
+        groups.setdefault(outdir or os.path.dirname(path), []).append(path)
+    chunks = [(target, paths[i:i + chunk_size])
+              for target, paths in groups.items()
+              for i in range(0, len(paths), chunk_size)]
+
+    processes = _ProcessSet()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [(executor.submit(_convert_chunk, chunk, target, soffice, processes), chunk)
+                   for target, chunk in chunks]
+        result = {}
+        for future, chunk in futures:
+            try:
+                while True:
+                    try:
+                        result.update(future.result(timeout=0.2))
+                        break
+                    except FutureTimeoutError:
+                        if stop_event is not None and stop_event.is_set():
+                            for pending, _ in futures:
+                                pending.cancel()
+                            processes.cancel()
+            except (CancelledError, ConversionCancelled):
+                pass
+            except Exception as e:
+                logger.error(f"批量转换失败({len(chunk)}个文件): {e}")
+    return result
+
+
+def create_converter(pool_size=1, **kwargs):
+    """优先使用常驻转换池，UNO 不可用时回退为逐文件调用 soffice"""
+    if OfficeServerPool.available():
+        return OfficeServerPool(size=pool_size, **kwargs)
+    LogManager().get_logger().debug("未找到 UNO 模块，使用逐文件 soffice 转换")
+    return SubprocessConverter(soffice=kwargs.get("soffice", "soffice"))
@@ -0,0 +1,130 @@
+"""
+基于 lxml 的 DOCX 段落/表格读取器。
+用 iterparse 流式遍历 document.xml，只处理 w:body 下的直接子元素，
+处理完即清理，不构建 python-docx 的代理对象。
+结果与 python-docx 的 doc.paragraphs / row.cells 一致（包括合并单元格的重复）。
+"""
+import posixpath
+import zipfile
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_OFFICE_DOCUMENT = "/officeDocument"
+
+_P, _TBL, _TR, _TC, _R = W + "p", W + "tbl", W + "tr", W + "tc", W + "r"
+_T, _TAB, _PTAB, _BR, _CR = W + "t", W + "tab", W + "ptab", W + "br", W + "cr"
+_HYPERLINK, _NO_BREAK_HYPHEN = W + "hyperlink", W + "noBreakHyphen"
+_BODY, _VAL = W + "body", W + "val"
+
+
+def _run_text(r):
+    parts = []
+    for child in r:
+        tag = child.tag
+        if tag == _T:
+            parts.append(child.text or "")
+        elif tag == _TAB or tag == _PTAB:
+            parts.append("\t")
+        elif tag == _BR:
+            # 只有换行符转为"\n"，分页/分栏符没有文本
+            if child.get(W + "type", "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == _CR:
+            parts.append("\n")
+        elif tag == _NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(p):
+    """段落文本，与 python-docx 的 Paragraph.text 一致"""
+    parts = []
+    for child in p:
+        if child.tag == _R:
+            parts.append(_run_text(child))
+        elif child.tag == _HYPERLINK:
+            parts.extend(_run_text(r) for r in child.iterchildren(_R))
+    return "".join(parts)
+
+
+def _grid_before(tr):
+    trPr = tr.find(W + "trPr")
+    if trPr is not None:
+        node = trPr.find(W + "gridBefore")
+        if node is not None:
+            return int(node.get(_VAL, 0))
+    return 0
+
+
+def table_rows(tbl):
+    """
+    表格各行单元格文本（已strip）。
+    与 python-docx 的 row.cells 相同：横向合并(gridSpan)的单元格重复出现，
+    纵向合并(vMerge="continue")的单元格取上一行同一网格位置的内容。
+    """
+    rows = []
+    above = {}  # 上一行：网格位置 -> (文本, 跨列数)
+    for tr in tbl.iterchildren(_TR):
+        grid = _grid_before(tr)
+        current = {}
+        row = []
+        for tc in tr.iterchildren(_TC):
+            span, vmerge = 1, None
+            tcPr = tc.find(W + "tcPr")
+            if tcPr is not None:
+                node = tcPr.find(W + "gridSpan")
+                if node is not None:
+                    span = int(node.get(_VAL, 1))
+                node = tcPr.find(W + "vMerge")
+                if node is not None:
+                    vmerge = node.get(_VAL, "continue")
+
+            if vmerge == "continue" and grid in above:
+                text, repeat = above[grid]
+            else:
+                text = "\n".join(paragraph_text(p) for p in tc.iterchildren(_P)).strip()
+                repeat = span
+            current[grid] = (text, repeat)
+            row.extend([text] * repeat)
+            grid += span
+        rows.append(row)
+        above = current
+    return rows
+
+
+def _document_part(archive):
+    """从包关系中找到主文档部件，默认 word/document.xml"""
+    from lxml import etree
+
+    try:
+        rels = etree.fromstring(archive.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels.iter(_REL + "Relationship"):
+        if rel.get("Type", "").endswith(_OFFICE_DOCUMENT):
+            return posixpath.normpath(rel.get("Target").lstrip("/"))
+    return "word/document.xml"
+
+
+def read_docx(docx_path):
+    """读取DOCX，返回 (正文段落文本列表, 表格列表)"""
+    # lxml 在第一次读取时才导入，直接解析RTF时不需要
+    from lxml import etree
+
+    paragraphs = []
+    tables = []
+    with zipfile.ZipFile(docx_path) as archive:
+        with archive.open(_document_part(archive)) as xml:
+            for _, elem in etree.iterparse(xml, events=("end",), tag=(_P, _TBL)):
+                parent = elem.getparent()
+                if parent is None or parent.tag != _BODY:
+                    continue  # 表格内的段落随表格一起处理
+                if elem.tag == _P:
+                    paragraphs.append(paragraph_text(elem))
+                else:
+                    tables.append(table_rows(elem))
+                # 释放已处理的元素
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del parent[0]
+    return paragraphs, tables
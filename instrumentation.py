@@ -0,0 +1,164 @@
+"""
+分阶段计时：记录每个文件在转换、读取、表格识别、各类表格处理、写出等阶段的耗时，
+运行结束后汇总为各阶段的 p50/p95/max，写出 JSON 报告并给出简短摘要。
+未启用时使用 NULL_TIMER，各处的计时调用都是空操作。
+"""
+import json
+import os
+import time
+
+
+def percentile(sorted_values, q):
+    """已排序数据的分位数（线性插值），q 取 0~100"""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
+
+
+class _Span:
+    __slots__ = ("samples", "start")
+
+    def __init__(self, samples):
+        self.samples = samples
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.start)
+        return False
+
+
+class RunTimer:
+    """一次运行的计时数据；各阶段的样本列表在多个线程中追加是安全的"""
+
+    enabled = True
+
+    def __init__(self):
+        self.samples = {}
+        self.counters = {}
+        self.files = []  # (文件名, 耗时, 结果)
+        self.started = time.perf_counter()
+        self.elapsed = None
+
+    def stage(self, name):
+        """计时上下文：with timer.stage("convert"): ..."""
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples.setdefault(name, [])
+        return _Span(samples)
+
+    def add(self, name, seconds):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def file_done(self, filename, seconds, outcome="ok"):
+        self.files.append((filename, seconds, outcome))
+        self.add("file", seconds)
+
+    def merge(self, samples, counters=None):
+        """合并其他进程中记录的阶段样本和计数"""
+        for name, values in samples.items():
+            self.samples.setdefault(name, []).extend(values)
+        for name, n in (counters or {}).items():
+            self.count(name, n)
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    def summary(self):
+        """{阶段: {count, total, p50, p95, max}}，时间单位为秒"""
+        result = {}
+        for name, values in sorted(self.samples.items()):
+            if not values:
+                continue
+            ordered = sorted(values)
+            result[name] = {
+                "count": len(ordered),
+                "total": round(sum(ordered), 6),
+                "p50": round(percentile(ordered, 50), 6),
+                "p95": round(percentile(ordered, 95), 6),
+                "max": round(ordered[-1], 6),
+            }
+        return result
+
+    def report(self, **extra):
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        outcomes = {}
+        for _, _, outcome in self.files:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        slowest = sorted(self.files, key=lambda item: item[1], reverse=True)[:10]
+        return {
+            "elapsed": round(elapsed, 3),
+            "files": len(self.files),
+            "outcomes": outcomes,
+            "stages": self.summary(),
+            "counters": dict(self.counters),
+            "slowest_files": [{"file": name, "seconds": round(seconds, 4), "outcome": outcome}
+                              for name, seconds, outcome in slowest],
+            **extra,
+        }
+
+    def write_report(self, path, **extra):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.report(**extra), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+        return path
+
+    def summary_lines(self, top=6):
+        """日志中显示的简短摘要：总耗时和累计耗时最多的几个阶段"""
+        report = self.report()
+        lines = [f"共 {report['files']} 个文件，用时 {report['elapsed']:.1f}s"]
+        stages = sorted(((name, stat) for name, stat in report["stages"].items() if name != "file"),
+                        key=lambda item: item[1]["total"], reverse=True)
+        for name, stat in stages[:top]:
+            lines.append(f"  {name}: 合计 {stat['total']:.2f}s，p50 {stat['p50'] * 1000:.1f}ms，"
+                         f"p95 {stat['p95'] * 1000:.1f}ms，max {stat['max'] * 1000:.1f}ms（{stat['count']} 次）")
+        return lines
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTimer:
+    """未启用计时时使用，所有操作均为空"""
+
+    enabled = False
+
+    def stage(self, name):
+        return _NULL_SPAN
+
+    def add(self, name, seconds):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def file_done(self, filename, seconds, outcome="ok"):
+        pass
+
+    def merge(self, samples, counters=None):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TIMER = NullTimer()
@@ -1,19 +1,37 @@
+import atexit
+import json
 import logging
+import os
 import queue
+import threading
+from collections import deque
 from logging import Handler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import datetime
 
 
 class UILogHandler(Handler):
-    """专用于UI的日志处理器"""
+    """
+    专用于UI的日志处理器。
+    emit 只把格式化后的日志放入环形缓冲区（可在任意线程调用），
+    由 Tk 主循环每隔 flush_interval 毫秒批量写入文本框；文本框最多保留 max_lines 行，
+    更早的日志被裁掉（完整日志见文件日志）。
+    """
 
-    def __init__(self, text_widget=None):
+    def __init__(self, text_widget=None, flush_interval=100, max_lines=5000, buffer_size=10000):
         super().__init__()
-        self.text_widget = text_widget
+        self.text_widget = None
+        self.flush_interval = flush_interval
+        self.max_lines = max_lines
+        # 两次刷新之间最多缓存 buffer_size 条，超出时丢弃最早的
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
         self.formatter = logging.Formatter(
             "%(asctime)s - %(levelname)s - %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S"
         )
+        if text_widget is not None:
+            self.attach_ui(text_widget)
 
     def attach_ui(self, text_widget):
         """绑定UI组件"""
@@ -24,26 +42,134 @@ class UILogHandler(Handler):
         self.text_widget.tag_config("WARNING", foreground="orange")
         self.text_widget.tag_config("ERROR", foreground="red")
         self.text_widget.tag_config("CRITICAL", foreground="white", background="red")
+        self.text_widget.after(self.flush_interval, self._flush)
 
     def emit(self, record):
-        """输出日志到UI"""
-        if self.text_widget:
+        """放入缓冲区，不直接操作控件"""
+        if self.text_widget is None:
+            return
+        try:
             msg = self.format(record)
-            self.text_widget.configure(state="normal")
-            self.text_widget.insert("end", msg + "\n", record.levelname)
-            self.text_widget.configure(state="disabled")
-            self.text_widget.see("end")
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append((msg, record.levelname))
+
+    def _drain(self):
+        """取出缓冲区中的日志，相邻同级别的合并为一段"""
+        chunks = []
+        buffer = self.buffer
+        while buffer:
+            try:
+                msg, level = buffer.popleft()
+            except IndexError:
+                break
+            if chunks and chunks[-1][1] == level:
+                chunks[-1][0].append(msg)
+            else:
+                chunks.append(([msg], level))
+        return chunks
+
+    def _flush(self):
+        """在 Tk 主循环中执行：批量写入文本框并裁剪过多的行"""
+        from tkinter import TclError
+
+        widget = self.text_widget
+        if widget is None:
+            return
+        try:
+            chunks = self._drain()
+            if chunks or self.dropped:
+                widget.configure(state="normal")
+                if self.dropped:
+                    widget.insert("end", f"…… 日志过多，省略 {self.dropped} 条（完整日志见日志文件）\n", "WARNING")
+                    self.dropped = 0
+                for lines, level in chunks:
+                    widget.insert("end", "\n".join(lines) + "\n", level)
+                line_count = int(widget.index("end-1c").split(".")[0])
+                if line_count > self.max_lines:
+                    widget.delete("1.0", f"{line_count - self.max_lines + 1}.0")
+                widget.configure(state="disabled")
+                widget.see("end")
+            widget.after(self.flush_interval, self._flush)
+        except TclError:
+            # 窗口已关闭
+            self.text_widget = None
+
+
+class FileLogHandler(RotatingFileHandler):
+    """完整日志文件，按大小轮转"""
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backup_count=3):
+        super().__init__(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.setFormatter(logging.Formatter(
+            "%(asctime)s - %(threadName)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        ))
+
+
+# JSON Lines 日志中作为独立字段输出的结构化信息，通过 logger.info(..., extra={...}) 传入
+STRUCTURED_FIELDS = ("file", "stage", "duration", "outcome")
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志格式化为一行JSON"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+            "process": record.process,
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class JsonLogHandler(RotatingFileHandler):
+    """JSON Lines 日志文件，按大小轮转；文件名、阶段、耗时、结果为独立字段，便于监控系统采集"""
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backup_count=5):
+        super().__init__(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.setFormatter(JsonFormatter())
+
+
+# 日志文件处理器：处理器级别保持 DEBUG，不随 set_log_level 变化
+_LOG_FILE_HANDLERS = (FileLogHandler, JsonLogHandler)
+
+
+def use_log_queue(log_queue, level=logging.INFO):
+    """
+    工作进程中调用：AppLogger 的日志全部放入 log_queue，由主进程的监听线程输出。
+    log_queue 由主进程的 LogManager().worker_queue() 创建。
+    """
+    logger = logging.getLogger("AppLogger")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
 
 
 class LogManager:
-    """日志管理器（单例模式）"""
+    """
+    日志管理器（单例模式）：无论创建多少次，日志处理器在每个进程中只安装一次。
+    AppLogger 上只有一个 QueueHandler，记录日志只是入队（不会阻塞）；
+    控制台、界面、文件等处理器都在 QueueListener 的后台线程中执行。
+    """
     _instance = None
-
+    _lock = threading.Lock()
 
     def __init__(self):
-        # 添加日志队列
-        self.log_queue = queue.Queue()
-        self._init_logger()
+        # 单例的初始化已在 __new__ 中完成，重复调用 LogManager() 不再添加处理器
+        pass
 
     def get_log_queue(self):
         return self.log_queue
@@ -54,37 +180,115 @@ class LogManager:
         self.log_queue.put((level, message))
 
     def __new__(cls):
-        if not cls._instance:
-            cls._instance = super().__new__(cls)
-            cls._instance._init_logger()
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    # 添加日志队列
+                    instance.log_queue = queue.Queue()
+                    instance._init_logger()
+                    cls._instance = instance
         return cls._instance
 
     def _init_logger(self):
         """初始化日志系统"""
         self.logger = logging.getLogger("AppLogger")
-        self.logger.setLevel(logging.DEBUG)
+        self._worker_queue = None
+        self._worker_listener = None
 
-        # 添加控制台处理器
+        # 模块被重新加载或在工作进程中（已调用 use_log_queue）时，沿用已经安装的处理器
+        for handler in self.logger.handlers:
+            if isinstance(handler, QueueHandler):
+                self.listener = getattr(handler, "listener", None)
+                handlers = self.listener.handlers if self.listener is not None else ()
+                self.ui_handler = next((h for h in handlers if isinstance(h, UILogHandler)), UILogHandler())
+                return
+
+        # 默认INFO：调试日志及其参数格式化都被跳过
+        self.logger.setLevel(logging.INFO)
+
+        # 控制台处理器
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
-        self.logger.addHandler(console_handler)
 
         # UI处理器延迟绑定
         self.ui_handler = UILogHandler()
-        self.logger.addHandler(self.ui_handler)
+
+        # SimpleQueue 没有容量上限，记录日志的线程不会等待
+        record_queue = queue.SimpleQueue()
+        self.listener = QueueListener(record_queue, console_handler, self.ui_handler,
+                                      respect_handler_level=True)
+        queue_handler = QueueHandler(record_queue)
+        queue_handler.listener = self.listener
+        self.logger.addHandler(queue_handler)
+        self.listener.start()
+        # 退出前输出队列中剩余的日志
+        atexit.register(self.shutdown)
+
+    @property
+    def handlers(self):
+        """实际输出日志的处理器"""
+        return self.listener.handlers if self.listener is not None else ()
+
+    def _add_handler(self, handler):
+        with self._lock:
+            for listener in (self.listener, self._worker_listener):
+                if listener is not None:
+                    # 监听线程每条记录读取一次 handlers，整体替换元组即可
+                    listener.handlers = listener.handlers + (handler,)
+
+    def worker_queue(self):
+        """多进程处理时，工作进程的日志经此队列回到主进程输出（见 use_log_queue）"""
+        with self._lock:
+            if self._worker_queue is None:
+                import multiprocessing
+
+                self._worker_queue = multiprocessing.Queue()
+                self._worker_listener = QueueListener(self._worker_queue, *self.handlers,
+                                                      respect_handler_level=True)
+                self._worker_listener.start()
+            return self._worker_queue
+
+    def shutdown(self):
+        """停止监听线程，队列中已有的日志先全部输出"""
+        for listener in (self._worker_listener, self.listener):
+            if listener is not None and listener._thread is not None:
+                listener.stop()
 
     def bind_ui(self, text_widget):
         """绑定UI组件"""
         self.ui_handler.attach_ui(text_widget)
 
+    def _enable_log_file(self, handler_class, path):
+        path = os.path.abspath(path)
+        for handler in self.handlers:
+            if isinstance(handler, handler_class) and handler.baseFilename == path:
+                return handler
+        handler = handler_class(path)
+        handler.setLevel(logging.DEBUG)
+        self._add_handler(handler)
+        return handler
+
+    def enable_file_log(self, path):
+        """把完整日志写入文件（按大小轮转），重复调用只添加一次"""
+        return self._enable_log_file(FileLogHandler, path)
+
+    def enable_json_log(self, path):
+        """把日志以 JSON Lines 格式写入文件（按大小轮转），重复调用只添加一次"""
+        return self._enable_log_file(JsonLogHandler, path)
+
     def get_logger(self):
         """获取日志记录器"""
         return self.logger
 
     def set_log_level(self, level):
-        """设置日志级别"""
+        """
+        设置日志级别：AppLogger 及控制台、界面的处理器使用该级别，低于该级别的日志（及其参数格式化）直接跳过；
+        日志文件的处理器保持 DEBUG，记录 AppLogger 放行的全部日志，不因界面级别调高而缺失。
+        """
         level = getattr(logging, level.upper(), logging.INFO)
         self.logger.setLevel(level)
-        for handler in self.logger.handlers:
-            handler.setLevel(level)
-        self.get_logger().debug(f"日志级别设置为：{logging.getLevelName(level)}")
\ No newline at end of file
+        for handler in self.handlers:
+            if not isinstance(handler, _LOG_FILE_HANDLERS):
+                handler.setLevel(level)
+        self.get_logger().debug(f"日志级别设置为：{logging.getLevelName(level)}")
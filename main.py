@@ -3,7 +3,9 @@ import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from log_processor import LogManager
-from rtf_parser import RTFParser
+
+# 完整日志文件
+LOG_FILE = "rtf_parser.log"
 
 
 class AppUI:
@@ -53,6 +55,16 @@ class AppUI:
         )
         self.parse_btn.pack(side="left", padx=5)
 
+        # 停止按钮：终止正在进行的转换，保存已完成的结果
+        self.stop_btn = ttk.Button(
+            btn_group,
+            text="停止",
+            command=self.force_stop,
+            width=10,
+            state="disabled"
+        )
+        self.stop_btn.pack(side="left", padx=2)
+
         # 第二行：控制面板
         control_frame = ttk.Frame(self.root)
         control_frame.grid(row=2, column=0, padx=10, pady=5, sticky="w")
@@ -104,18 +116,24 @@ class AppUI:
 
         # 禁用按钮防止重复点击
         self.parse_btn.configure(state="disabled")
+        self.stop_btn.configure(state="normal")
         self.root.title("RTF解析工具 - 运行中...")
 
+        # 每次解析使用新的停止事件
+        self.stop_event = threading.Event()
+
         # 创建后台任务线程
         threading.Thread(
             target=self.run_parsing_task,
-            args=(directory,),
+            args=(directory, self.stop_event),
             daemon=True
         ).start()
 
     def setup_logging(self):
         """绑定日志到UI"""
         self.logger.bind_ui(self.log_text)
+        # 界面只保留最近的日志，完整日志写入文件
+        self.logger.enable_file_log(LOG_FILE)
         self.logger.set_log_level(self.log_level.get())
 
     def update_log_level(self, event=None):
@@ -147,14 +165,17 @@ class AppUI:
             self.root.after(100, self.process_log_queue)
 
 
-    def run_parsing_task(self, directory):
-        """后台任务线程执行的方法"""
+    def run_parsing_task(self, directory, stop_event):
         """后台任务线程执行的方法"""
         try:
+            # 解析器及其依赖在第一次解析时才导入，窗口可以更快显示
+            from rtf_parser import RTFParser
+
             # 初始化解析器时传递停止事件
             self.parser = RTFParser(
                 log_queue=self.logger.get_log_queue(),
-                stop_event=threading.Event()
+                stop_event=stop_event,
+                instrument=True
             )
             self.parser.process_files(directory)
         except Exception as e:
@@ -170,6 +191,7 @@ class AppUI:
             # 确保按钮存在且未被销毁
             if self.parse_btn.winfo_exists():
                 self.parse_btn.configure(state="normal")
+                self.stop_btn.configure(state="disabled")
             else:
                 print("按钮组件已销毁，无法恢复状态")
 
@@ -183,10 +205,12 @@ class AppUI:
             print(f"Critical Error: {str(e)}")
 
     def force_stop(self):
-        """强制停止任务"""
-        if hasattr(self, 'parser'):
-            self.parser._stop_event.set()  # 使用传入的事件对象
-        self.on_task_done(None)
+        """强制停止任务：解析线程保存已完成的结果后发出 <<TaskDone>>，界面随后恢复"""
+        if hasattr(self, 'stop_event'):
+            self.stop_event.set()  # 解析器持有同一个事件对象
+            self.stop_btn.configure(state="disabled")
+            self.root.title("RTF解析工具 - 正在停止...")
+            self.logger.get_logger().info("正在停止，等待正在进行的转换终止......")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,86 @@
+from log_processor import LogManager
+
+# 文件名列，始终位于第一列
+FILENAME_FIELD = '文件名'
+
+# 字段类型：列式输出（Parquet/Arrow）中文本字段为字符串，数值字段为 float64
+TEXT = 'text'
+NUMBER = 'number'
+FIELD_TYPES = (TEXT, NUMBER)
+
+
+def parse_fields(param):
+    """
+    解析字段配置的 Param 列表，返回 (字段名列表, {字段名: 类型})。
+    每项为字段名，或 {name: 字段名, type: number|text}；未声明类型的字段为文本
+    """
+    fields, types = [], {}
+    for item in param:
+        if isinstance(item, dict):
+            name, field_type = item.get('name'), item.get('type', TEXT)
+            if name is None:
+                raise ValueError(f"字段配置缺少 name：{item}")
+            if field_type not in FIELD_TYPES:
+                raise ValueError(f"字段 {name} 的类型 {field_type!r} 无效（可用：{', '.join(FIELD_TYPES)}）")
+        else:
+            name, field_type = item, TEXT
+        name = str(name)
+        fields.append(name)
+        types[name] = field_type
+    return fields, types
+
+
+class OutputSchema:
+    """
+    输出列结构：由字段配置编译出 字段 -> 列号 的映射。
+    解析结果直接写入按列号预分配的行（list），合并代价与结果键数成正比，
+    行本身也是进程间传递和缓存时的紧凑格式。
+    """
+
+    def __init__(self, fields, types=None):
+        self.fields = list(fields)
+        # 字段 -> 类型，未声明的字段为文本
+        self.types = dict(types or {})
+        self.index = {}
+        # 配置中重复出现的字段：额外的列号
+        self._duplicates = {}
+        for idx, field in enumerate(self.fields):
+            if field in self.index:
+                self._duplicates.setdefault(field, []).append(idx)
+            else:
+                self.index[field] = idx
+        if self._duplicates:
+            LogManager().get_logger().warning(f"字段配置中存在重复字段：{list(self._duplicates)}")
+
+    def __len__(self):
+        return len(self.fields)
+
+    def new_row(self):
+        """空行，未解析到的字段为空字符串"""
+        return [""] * len(self.fields)
+
+    def merge(self, row, data, unmapped=None):
+        """把解析结果写入行中对应的列，配置中没有的键记入 unmapped"""
+        index = self.index
+        for key, value in data.items():
+            idx = index.get(key)
+            if idx is None:
+                if unmapped is not None:
+                    unmapped.add(key)
+                continue
+            row[idx] = value
+            if self._duplicates and key in self._duplicates:
+                for extra in self._duplicates[key]:
+                    row[extra] = value
+        return row
+
+    def set(self, row, field, value):
+        idx = self.index.get(field)
+        if idx is not None:
+            row[idx] = value
+
+    def to_dict(self, row):
+        return dict(zip(self.fields, row))
+
+    def from_dict(self, data):
+        return self.merge(self.new_row(), data)
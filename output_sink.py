@@ -0,0 +1,294 @@
+import csv
+import os
+import shutil
+import zipfile
+
+from log_processor import LogManager
+from output_schema import NUMBER
+
+# 写入模式下工作表在包中的位置（只创建一个工作表）
+_SHEET_PART = "xl/worksheets/sheet1.xml"
+
+
+def column_width(max_length):
+    """列宽：最长内容加2个字符的余量"""
+    return (max_length + 2) * 1.2
+
+
+def _insert_cols(path, widths):
+    """
+    在已保存的xlsx中为工作表补写列宽（<cols>）。
+    写入模式下 openpyxl 在第一行之前就输出列定义，此时列宽尚未确定，
+    因此保存后再流式复制一遍压缩包，把列宽插入到 <sheetData> 之前。
+    """
+    cols = "".join(
+        f'<col min="{idx}" max="{idx}" width="{column_width(length):.2f}" customWidth="1"/>'
+        for idx, length in enumerate(widths, 1))
+    cols = f"<cols>{cols}</cols>".encode("utf-8")
+    marker = b"<sheetData"
+    keep = len(marker) - 1
+
+    tmp_path = path + ".cols"
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            info = zipfile.ZipInfo(item.filename, item.date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with src.open(item) as fin, dst.open(info, "w") as fout:
+                if item.filename != _SHEET_PART:
+                    shutil.copyfileobj(fin, fout, 1 << 16)
+                    continue
+                inserted = False
+                carry = b""
+                while chunk := fin.read(1 << 16):
+                    if inserted:
+                        fout.write(chunk)
+                        continue
+                    data = carry + chunk
+                    idx = data.find(marker)
+                    if idx >= 0:
+                        fout.write(data[:idx] + cols + data[idx:])
+                        inserted = True
+                        carry = b""
+                    else:
+                        fout.write(data[:-keep])
+                        carry = data[-keep:]
+                fout.write(carry)
+    os.replace(tmp_path, path)
+
+
+class ExcelSink:
+    """
+    Excel 输出。
+    streaming=True 时使用 openpyxl 的 write_only 模式逐行写出，不在内存中保留整张表；
+    写入时同步记录各列最长内容，保存时一次性写入列宽，不再对整张表做第二遍扫描。
+    """
+
+    def __init__(self, path, fields, title="合并数据", streaming=True):
+        from openpyxl import Workbook
+
+        self.path = path
+        self.fields = list(fields)
+        self.streaming = streaming
+        self.rows = 0
+        self.widths = [len(str(field)) for field in self.fields]
+        self._partial = path + ".partial"
+
+        self.wb = Workbook(write_only=streaming)
+        if streaming:
+            self.ws = self.wb.create_sheet(title)
+        else:
+            self.ws = self.wb.active
+            self.ws.title = title
+        self.ws.append(self.fields)
+
+    def write(self, row):
+        """追加一行数据，row 按字段配置的顺序排列"""
+        widths = self.widths
+        for idx, value in enumerate(row):
+            length = len(str(value))
+            if length > widths[idx]:
+                widths[idx] = length
+        self.ws.append(row)
+        self.rows += 1
+
+    def close(self):
+        """保存输出文件"""
+        if not self.streaming:
+            from openpyxl.utils import get_column_letter
+            for idx, length in enumerate(self.widths, 1):
+                self.ws.column_dimensions[get_column_letter(idx)].width = column_width(length)
+        # 先写入临时文件，完整保存后再替换，避免留下半个文件
+        self.wb.save(self._partial)
+        if self.streaming:
+            _insert_cols(self._partial, self.widths)
+        os.replace(self._partial, self.path)
+        return self.path
+
+    def abort(self):
+        """放弃输出"""
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+
+
+class CsvSink:
+    """CSV 输出，逐行写出；使用带BOM的UTF-8，Excel可直接打开"""
+
+    def __init__(self, path, fields, encoding="utf-8-sig"):
+        self.path = path
+        self.fields = list(fields)
+        self.rows = 0
+        self._partial = path + ".partial"
+        self._file = open(self._partial, "w", encoding=encoding, newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.fields)
+
+    def write(self, row):
+        self._writer.writerow("" if value is None else value for value in row)
+        self.rows += 1
+
+    def close(self):
+        self._file.close()
+        os.replace(self._partial, self.path)
+        return self.path
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+
+
+# 报告中表示"无数据"的占位符，数值列中写为空值
+_EMPTY_VALUES = frozenset(["", "/", "-", "--"])
+
+
+# 时长列的单位（列名结尾）-> 每个单位的秒数；这些列中 H:M:S 形式的取值按单位换算
+_DURATION_UNITS = (("(min)", 60), ("(s)", 1))
+
+
+def _to_float(value):
+    """数值列的取值：空值为None，无法转换时返回NotImplemented"""
+    if value is None or (isinstance(value, str) and value.strip() in _EMPTY_VALUES):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NotImplemented
+
+
+def _duration(seconds_per_unit):
+    """时长列的取值：数值照常转换，H:M:S（如 "0:12:30"）换算为列的单位，保留两位小数"""
+    def convert(value):
+        number = _to_float(value)
+        if number is NotImplemented and isinstance(value, str):
+            parts = value.strip().split(":")
+            if len(parts) == 3:
+                try:
+                    hours, minutes, seconds = map(float, parts)
+                except ValueError:
+                    return number
+                return round((hours * 3600 + minutes * 60 + seconds) / seconds_per_unit, 2)
+        return number
+    return convert
+
+
+def _number_converter(field):
+    """数值字段的转换函数：时长字段另外接受 H:M:S"""
+    for unit, seconds_per_unit in _DURATION_UNITS:
+        if "时间" in field and field.endswith(unit):
+            return _duration(seconds_per_unit)
+    return _to_float
+
+
+class ArrowSink:
+    """
+    列式输出（Arrow IPC 文件）。
+    按列缓存 batch_size 行后写出一个批次；types（字段 -> 类型）中的数值字段为 float64，
+    其余字段使用字典编码的字符串列，列类型由字段配置确定，不随数据变化；
+    以 (min)、(s) 结尾的时间字段中 H:M:S 形式的取值换算为对应单位的数值。
+    """
+
+    def __init__(self, path, fields, types=None, batch_size=4096):
+        import pyarrow as pa
+
+        self._pa = pa
+        self.path = path
+        self.fields = list(fields)
+        self.batch_size = batch_size
+        self.rows = 0
+        self.logger = LogManager().get_logger()
+        self._partial = path + ".partial"
+        types = types or {}
+        self._text = [types.get(field) != NUMBER for field in self.fields]
+        self._convert = [None if is_text else _number_converter(field)
+                         for field, is_text in zip(self.fields, self._text)]
+        text_type = pa.dictionary(pa.int32(), pa.string())
+        self.schema = pa.schema([
+            pa.field(field, text_type if is_text else pa.float64())
+            for field, is_text in zip(self.fields, self._text)])
+        self._columns = [[] for _ in self.fields]
+        self._pending = 0
+        # 数值列中出现的非数值内容：字段 -> 示例
+        self._invalid = {}
+        self._writer = self._open_writer()
+
+    def _open_writer(self):
+        return self._pa.ipc.new_file(self._partial, self.schema)
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch)
+
+    def write(self, row):
+        for idx, value in enumerate(row):
+            if self._text[idx]:
+                value = None if value is None else str(value)
+            else:
+                number = self._convert[idx](value)
+                if number is NotImplemented:
+                    self._invalid.setdefault(self.fields[idx], value)
+                    number = None
+                value = number
+            self._columns[idx].append(value)
+        self._pending += 1
+        self.rows += 1
+        if self._pending >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pa = self._pa
+        arrays = [pa.array(values, type=pa.string()).dictionary_encode() if is_text
+                  else pa.array(values, type=pa.float64())
+                  for values, is_text in zip(self._columns, self._text)]
+        self._write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self._columns = [[] for _ in self.fields]
+        self._pending = 0
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+        if self._invalid:
+            self.logger.warning(f"以下数值字段中存在非数值内容，已写为空值：{self._invalid}")
+        os.replace(self._partial, self.path)
+        return self.path
+
+    def abort(self):
+        self._writer.close()
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+
+
+class ParquetSink(ArrowSink):
+    """Parquet 输出，每个批次写为一个行组，文本列使用字典编码"""
+
+    def __init__(self, path, fields, types=None, batch_size=4096, compression="zstd"):
+        self.compression = compression
+        super().__init__(path, fields, types, batch_size)
+
+    def _open_writer(self):
+        import pyarrow.parquet as pq
+
+        text_columns = [field for field, is_text in zip(self.fields, self._text) if is_text]
+        return pq.ParquetWriter(self._partial, self.schema, compression=self.compression,
+                                use_dictionary=text_columns)
+
+
+# 输出文件扩展名 -> 输出类
+SINKS = {
+    ".xlsx": ExcelSink,
+    ".csv": CsvSink,
+    ".parquet": ParquetSink,
+    ".arrow": ArrowSink,
+    ".feather": ArrowSink,
+}
+
+
+def open_sink(path, fields, streaming=True, types=None):
+    """按输出文件的扩展名选择输出格式；types 为字段 -> 类型，决定列式输出的列类型"""
+    ext = os.path.splitext(path)[1].lower()
+    sink_class = SINKS.get(ext)
+    if sink_class is None:
+        raise ValueError(f"不支持的输出格式：{ext}（可用：{', '.join(SINKS)}）")
+    if sink_class is ExcelSink:
+        return ExcelSink(path, fields, streaming=streaming)
+    return sink_class(path, fields, types)
@@ -0,0 +1,116 @@
+"""
+正文段落的字段提取：监测类型、AHI/OAHI/OAI、血氧<90%的累计时间及占比、结论和诊断。
+段落只扫描一遍：先用关键字判断段落中可能有哪些字段，只对命中且需要的字段执行预编译的正则。
+报告中重复出现的指标以最后一次为准，后面的结论/诊断段依次拼接，因此始终扫描到最后一个段落
+（不在需要的字段都已取得后提前结束：附录中复核的指标、补充的结论会被漏掉）。
+监测类型按内容识别：报告抬头（第一个空段落或章节标题之前的段落）中第一个含有监测类型关键字、
+且不是报告标题（以"报告"结尾）的段落；抬头中没有时为None，不再固定取第三个段落。
+"""
+import re
+
+from cell_values import duration_minutes
+
+MONITOR_TYPE = "监测类型"
+AHI = "AHI(次/h)"
+OAHI = "OAHI(次/h)"
+OAI = "OAI(次/h)"
+HYPOXIA_TIME = "睡眠期间血氧＜90%的累计时间(min)"
+HYPOXIA_RATIO = "睡眠期间血氧＜90%的累计时间占比"
+CONCLUSION = "结论"
+DIAGNOSIS = "诊断"
+
+FIELDS = (MONITOR_TYPE, AHI, OAHI, OAI, HYPOXIA_TIME, HYPOXIA_RATIO, CONCLUSION, DIAGNOSIS)
+
+# 报告抬头中监测类型段落的关键字，如"多导睡眠监测(PSG)"
+MONITOR_TYPE_KEYWORDS = ("监测", "PSG", "HST")
+
+# (关键字, 字段, 正则)：段落中有关键字时才执行正则，"OAHI" 中也含 "AHI"
+_METRICS = (
+    ("AHI", AHI, re.compile(r"AHI.*?=([\d.]+)")),
+    ("OAHI", OAHI, re.compile(r"OAHI.*?=([\d.]+)")),
+    ("OAI", OAI, re.compile(r"OAI.*?=([\d.]+)")),
+)
+_HYPOXIA_KEYWORDS = ("血氧<90%", "血氧＜90%")
+_CLAUSES = re.compile(r"[；;]")
+_TIME_VALUE = re.compile(r"([\d:\.]+)")
+_MINUTES = re.compile(r"([\d.]+)\s*min")
+_RATIO = re.compile(r"([\d.]+)%?")
+
+# 结论/诊断段的起始标记：该段落及其后直到空段落的文本都属于该字段
+_BLOCKS = (("结论：", CONCLUSION), ("诊断：", DIAGNOSIS))
+
+
+def _hypoxia(text, data):
+    for part in _CLAUSES.split(text):
+        if "时间" in part and "min" not in part:  # 不带单位的时间，如"0:12:30"
+            if match := _TIME_VALUE.search(part):
+                data[HYPOXIA_TIME] = duration_minutes(match.group(1))
+        elif "时间" in part:
+            if match := _MINUTES.search(part):
+                data[HYPOXIA_TIME] = float(match.group(1))
+        if "占比" in part:
+            if match := _RATIO.search(part):
+                data[HYPOXIA_RATIO] = float(match.group(1))
+
+
+class ParagraphExtractor:
+    """
+    fields 为需要的字段（默认全部），不需要的指标不执行正则；
+    结果中始终包含全部字段，未取得（或不需要）的为None。
+    """
+
+    def __init__(self, fields=None):
+        self.fields = frozenset(FIELDS if fields is None else (f for f in FIELDS if f in fields))
+        self.metrics = tuple(metric for metric in _METRICS if metric[1] in self.fields)
+        self.hypoxia = HYPOXIA_TIME in self.fields or HYPOXIA_RATIO in self.fields
+
+    def extract(self, paragraphs):
+        data = dict.fromkeys(FIELDS)
+        blocks = {CONCLUSION: [], DIAGNOSIS: []}
+        metrics, hypoxia = self.metrics, self.hypoxia
+        current = None  # 正在读取的结论/诊断段
+        in_header = True  # 报告抬头中，且尚未找到监测类型
+
+        for section, text in paragraphs:
+            text = text.strip()
+            if in_header:
+                if not text or section:
+                    in_header = False
+                elif any(k in text for k in MONITOR_TYPE_KEYWORDS) and not text.endswith("报告"):
+                    data[MONITOR_TYPE] = text
+                    in_header = False
+            if not text:
+                # 空段落结束结论/诊断段
+                current = None
+                continue
+            if metrics and ("AHI" in text or "OAI" in text):
+                for keyword, field, pattern in metrics:
+                    if keyword in text and (match := pattern.search(text)):
+                        data[field] = float(match.group(1))
+            if hypoxia and (_HYPOXIA_KEYWORDS[0] in text or _HYPOXIA_KEYWORDS[1] in text):
+                _hypoxia(text, data)
+
+            for marker, field in _BLOCKS:
+                if text.startswith(marker):
+                    current = field
+                    blocks[field].append(text.replace(marker, "").strip())
+                    break
+            else:
+                if current is not None:
+                    blocks[current].append(text)
+
+        for field, texts in blocks.items():
+            data[field] = " ".join(texts) if texts else None
+        return data
+
+
+_EXTRACTORS = {}
+
+
+def extractor_for(fields=None):
+    """需要的字段对应的提取器（按字段组合缓存）"""
+    key = None if fields is None else tuple(field in fields for field in FIELDS)
+    extractor = _EXTRACTORS.get(key)
+    if extractor is None:
+        extractor = _EXTRACTORS.setdefault(key, ParagraphExtractor(fields))
+    return extractor
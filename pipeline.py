@@ -0,0 +1,157 @@
+"""
+转换 → 解析 → 写出 三段流水线。
+
+各阶段之间用有界队列连接：多个转换线程并发调用 soffice（外部进程，不占用GIL），
+解析线程处理已转换好的文件，调用 run() 的线程按输入顺序写出结果。
+同时在途的文件数不超过 max_in_flight，慢文件不会导致后续结果无限堆积。
+被停止时各阶段不再接收新的文件，已经解析完成的结果仍会写出（按输入顺序，中间可能有缺口）。
+"""
+import queue
+import threading
+
+# 队列结束标记
+_DONE = object()
+
+
+class Pipeline:
+    """
+    convert(item) -> 中间结果（在 convert_workers 个线程中执行）
+    parse(item, 中间结果) -> 结果（在 parse_workers 个线程中执行）
+    write(item, 结果)（在调用 run() 的线程中按输入顺序执行）
+    on_error(item, 异常)：转换或解析失败时代替 write 调用
+    discard(item, 中间结果)：停止时丢弃已转换但未解析的中间结果（如删除临时文件）
+    """
+
+    def __init__(self, convert, parse, write, on_error=None, discard=None,
+                 convert_workers=2, parse_workers=1, queue_size=8, stop_event=None):
+        self.convert = convert
+        self.parse = parse
+        self.write = write
+        self.on_error = on_error
+        self.discard = discard
+        self.convert_workers = max(1, convert_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.queue_size = max(1, queue_size)
+        self.max_in_flight = self.queue_size * 2 + self.convert_workers + self.parse_workers
+        self.stop_event = stop_event
+        # 收到停止请求或写出出错时置位，各阶段不再处理新的文件
+        self._halt = threading.Event()
+
+    def _stopped(self):
+        if self.stop_event is not None and self.stop_event.is_set():
+            self._halt.set()
+        return self._halt.is_set()
+
+    def _feed(self, items, slots, convert_q):
+        try:
+            for idx, item in enumerate(items):
+                # 等待在途文件数降到上限以下
+                while not slots.acquire(timeout=0.1):
+                    if self._stopped():
+                        return
+                if self._stopped():
+                    return
+                convert_q.put((idx, item))
+        finally:
+            for _ in range(self.convert_workers):
+                convert_q.put(_DONE)
+
+    def _convert_worker(self, convert_q, parse_q, remaining):
+        while (task := convert_q.get()) is not _DONE:
+            if self._halt.is_set():
+                continue
+            idx, item = task
+            try:
+                parse_q.put((idx, item, self.convert(item), None))
+            except Exception as e:
+                parse_q.put((idx, item, None, e))
+        # 最后一个转换线程结束时通知解析阶段
+        with remaining[1]:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                for _ in range(self.parse_workers):
+                    parse_q.put(_DONE)
+
+    def _parse_worker(self, parse_q, out_q, remaining):
+        while (task := parse_q.get()) is not _DONE:
+            idx, item, value, error = task
+            if self._halt.is_set():
+                if error is None and self.discard is not None:
+                    self.discard(item, value)
+                continue
+            if error is None:
+                try:
+                    value = self.parse(item, value)
+                except Exception as e:
+                    error = e
+            out_q.put((idx, item, value, error))
+        with remaining[1]:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                out_q.put(_DONE)
+
+    def _flush(self, pending, out_q):
+        """停止后写出已经解析完成的结果"""
+        while True:
+            try:
+                task = out_q.get_nowait()
+            except queue.Empty:
+                break
+            if task is not _DONE:
+                pending[task[0]] = task
+        for idx in sorted(pending):
+            _, item, value, error = pending[idx]
+            if error is None:
+                self.write(item, value)
+
+    def run(self, items):
+        """处理全部输入，按输入顺序写出；被停止时写出已完成的结果并返回False"""
+        convert_q = queue.Queue(self.queue_size)
+        parse_q = queue.Queue(self.queue_size)
+        out_q = queue.Queue()
+        slots = threading.Semaphore(self.max_in_flight)
+        self._halt.clear()
+
+        threads = [threading.Thread(target=self._feed, args=(items, slots, convert_q), daemon=True)]
+        converting = [self.convert_workers, threading.Lock()]
+        threads += [threading.Thread(target=self._convert_worker, args=(convert_q, parse_q, converting),
+                                     daemon=True)
+                    for _ in range(self.convert_workers)]
+        parsing = [self.parse_workers, threading.Lock()]
+        threads += [threading.Thread(target=self._parse_worker, args=(parse_q, out_q, parsing), daemon=True)
+                    for _ in range(self.parse_workers)]
+        for thread in threads:
+            thread.start()
+
+        # 重排缓冲：先完成的后续文件在这里等待前面的文件
+        pending = {}
+        next_idx = 0
+        completed = False
+        try:
+            while True:
+                if self._stopped():
+                    break
+                try:
+                    task = out_q.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                if task is _DONE:
+                    completed = not self._stopped()
+                    break
+                pending[task[0]] = task
+                while next_idx in pending:
+                    _, item, value, error = pending.pop(next_idx)
+                    if error is None:
+                        self.write(item, value)
+                    elif self.on_error is not None:
+                        self.on_error(item, error)
+                    next_idx += 1
+                    slots.release()
+        finally:
+            self._halt.set()
+            # 正在运行的转换由调用方终止（见 converter.ConversionCanceller），这里等待各线程退出
+            for thread in threads:
+                thread.join()
+        if not completed:
+            self._flush(pending, out_q)
+        return completed
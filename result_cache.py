@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from log_processor import LogManager
+
+# 缓存格式版本，修改存储结构时递增
+CACHE_FORMAT = 2
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """计算文件内容的SHA-256"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def version_stamp(paths, *extra):
+    """
+    根据配置文件、解析代码等内容生成版本戳。
+    任何一个文件内容变化，旧的缓存条目都会失效。
+    """
+    h = hashlib.sha256(f"format={CACHE_FORMAT}".encode())
+    for path in paths:
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    for item in extra:
+        h.update(repr(item).encode())
+    return h.hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    基于 SQLite 的解析结果缓存。
+    键为RTF内容的SHA-256加版本戳，值为按字段配置排列的解析结果行；
+    总大小超过 max_bytes 时按最近访问时间淘汰。
+    """
+
+    def __init__(self, db_path, version, max_bytes=256 * 1024 * 1024):
+        import sqlite3
+
+        self.db_path = db_path
+        self.version = version
+        self.max_bytes = max_bytes
+        self.logger = LogManager().get_logger()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                digest TEXT NOT NULL,
+                version TEXT NOT NULL,
+                data TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (digest, version)
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_access ON results(last_access)")
+        # 版本戳不同的条目已失效，直接清理
+        removed = self._conn.execute("DELETE FROM results WHERE version != ?", (version,)).rowcount
+        self._conn.commit()
+        if removed:
+            self.logger.info(f"配置或解析代码已变化，清除 {removed} 条缓存")
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def get(self, digest):
+        """查询缓存，未命中返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM results WHERE digest = ? AND version = ?",
+                (digest, self.version)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE results SET last_access = ? WHERE digest = ? AND version = ?",
+                (time.time(), digest, self.version))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, digest, data):
+        """写入缓存"""
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM results WHERE digest = ? AND version = ?",
+                (digest, self.version)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (digest, self.version, payload, size, time.time()))
+            self._total += size - (old[0] if old else 0)
+            if self.max_bytes and self._total > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """按最近访问时间淘汰，直到总大小降到上限的90%以下"""
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(
+            "SELECT digest, version, size FROM results ORDER BY last_access").fetchall()
+        removed = 0
+        for digest, version, size in rows:
+            if self._total <= target:
+                break
+            self._conn.execute("DELETE FROM results WHERE digest = ? AND version = ?", (digest, version))
+            self._total -= size
+            removed += 1
+        self.logger.debug(f"缓存超出上限，淘汰 {removed} 条")
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
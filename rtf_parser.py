@@ -1,17 +1,37 @@
 import os
-import yaml
-import subprocess
-from docx import Document
-from openpyxl import Workbook
-from docx.oxml import OxmlElement
 import enum
-import re
-from collections import OrderedDict
-
-from log_processor import LogManager
+import fnmatch
+import logging
+import zlib
+
+from log_processor import LogManager, use_log_queue
+from rtf_reader import read_rtf
+from docx_reader import read_docx
+from output_schema import FILENAME_FIELD, TEXT, OutputSchema, parse_fields
+from output_sink import open_sink
+from instrumentation import NULL_TIMER, RunTimer
+from pipeline import Pipeline
+from result_cache import ResultCache, file_digest, version_stamp
+import rtf_reader
+import docx_reader
+import output_schema
+from table_classifier import TABLE_TYPES_CONFIG, TableClassifier
+import table_classifier
+# extract_number_from_string、process_gender 原先定义在本模块，保留导入以兼容
+from table_extractor import PLAN_CACHE, extract_number_from_string, load_extractors, process_gender
+import table_extractor
+from cell_values import duration_minutes, percent_number
+import cell_values
+from paragraph_extractor import extractor_for
+import paragraph_extractor
+from text_normalize import normalize_table
+import text_normalize
+from watcher import FileStateStore, FolderWatcher, IncrementalWorkbook, scan_folder
 import time
+import tempfile
 import threading
-from queue import Queue
+from concurrent.futures import wait as wait_futures
+from contextlib import contextmanager
 
 # 配置文件路径
 YAML_CONFIG = "MedicalReportParameters.yml"
@@ -30,476 +50,169 @@ class tableType(enum.Enum):
     OxygenSaturation = enum.auto()
     Snoring = enum.auto()
 
-def convert_time(time_str):
-    try:
-        if ":" in time_str:  # 处理类似"0:12:2.0"的格式
-            parts = list(map(float, time_str.split(":")))
-            return round(parts[0] * 60 + parts[1] + parts[2] / 60, 2)
-        return float(time_str)
-    except:
-        return None
-
-def extract_number(value):
-    try:
-        # 移除可能存在的百分号
-        cleaned = str(value).replace('%', '').strip()
-        return float(cleaned)
-    except:
-        return None
-
-
-def extract_number_from_string(s):
-    match = re.search(r'(\d+\.?\d*)', s)
-    return float(match.group(1)) if match and '.' in match.group(1) else int(match.group(1)) if match else None
-
-def process_gender(s):
-    return 'M' if s.strip().lower() == 'male' else 'F' if s.strip().lower() == 'female' else s
+# 各类型表格处理的计时阶段名
+_TABLE_STAGES = {t: f"table.{t.name}" for t in tableType}
+
+# 原先定义在本模块的数值转换，保留名称以兼容
+convert_time = duration_minutes  # 分钟数或"0:12:2.0"格式
+extract_number = percent_number  # 可能带百分号
+
+
+def _no_table_data(table):
+    return {}
+
+# 进程池中每个工作进程各自持有一个解析器
+_worker_parser = None
+
+def _init_worker(reader, profile_root, instrument=False, dump_tables=(), dump_sample=0.0,
+                 log_queue=None, log_level=logging.INFO, stop_event=None):
+    """
+    工作进程初始化：使用独立的 LibreOffice 用户配置，避免进程间互相加锁；日志经 log_queue 交给主进程输出。
+    stop_event（multiprocessing.Event）置位后终止本进程中正在运行的 soffice。
+    """
+    global _worker_parser
+    from converter import ConversionCanceller, SubprocessConverter
+
+    if log_queue is not None:
+        use_log_queue(log_queue, log_level)
+
+    converter = SubprocessConverter(profile_dir=tempfile.mkdtemp(dir=profile_root))
+    _worker_parser = RTFParser(None, stop_event, converter=converter, reader=reader, instrument=instrument,
+                               dump_tables=dump_tables, dump_sample=dump_sample)
+    if stop_event is not None:
+        ConversionCanceller(stop_event, [converter]).start()
+
+def _parse_file_worker(filepath, schema):
+    """返回 (数据行, 不在配置中的键, (各阶段计时, 计数), 耗时)"""
+    _worker_parser.unmapped_keys.clear()
+    if _worker_parser.instrument:
+        _worker_parser.timer = RunTimer()
+        plan_counts = PLAN_CACHE.counts()
+    start = time.perf_counter()
+    row = _worker_parser.parse_file(filepath, schema)
+    elapsed = time.perf_counter() - start
+    stats = None
+    if _worker_parser.instrument:
+        _worker_parser._count_plan_cache(plan_counts)
+        stats = (_worker_parser.timer.samples, _worker_parser.timer.counters)
+    return row, tuple(_worker_parser.unmapped_keys), stats, elapsed
 
 class RTFParser:
-    def __init__(self,log_queue,stop_event):
+    def __init__(self,log_queue,stop_event,converter=None,pool_size=1,batch_workers=0,reader="docx",
+                 workers=1,cache_path=None,cache_max_bytes=256 * 1024 * 1024,streaming=True,
+                 output_format="xlsx",config_path=None,pipeline_workers=0,parse_workers=1,queue_size=8,
+                 instrument=False,report_path=None,dump_tables=(),dump_sample=0.0):
         self.logger = LogManager().get_logger()
         self.log_queue = log_queue
-        self._stop_event = stop_event
-        self._stop_event = threading.Event()
+        # 调用方（界面、命令行）持有同一个事件，置位即请求停止
+        self._stop_event = stop_event if stop_event is not None else threading.Event()
+        # 运行期间终止正在进行的转换，见 _run_resources
+        self._canceller = None
+        # 外部传入的转换器由调用方负责关闭
+        self.converter = converter
+        self.pool_size = pool_size
+        # 大于0时启用批量转换：先并行转换整个文件夹，再逐个解析
+        self.batch_workers = batch_workers
+        # "docx": 经 LibreOffice 转换后读取；"rtf": 直接解析RTF
+        self.reader = reader
+        # 大于1时在进程池中并行转换和解析
+        self.workers = workers
+        # 解析结果缓存（SQLite），为None时不使用缓存
+        self.cache_path = cache_path
+        self.cache_max_bytes = cache_max_bytes
+        self.cache = None
+        # 流式写出Excel，内存占用与文件数量无关
+        self.streaming = streaming
+        # 默认输出格式：xlsx、csv、parquet 或 arrow
+        self.output_format = output_format
+        # 大于0时启用流水线：pipeline_workers 个线程转换，parse_workers 个线程解析，
+        # 各阶段之间的队列长度为 queue_size
+        self.pipeline_workers = pipeline_workers
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        # 分阶段计时：运行结束后写出JSON报告（默认为 <结果文件>.perf.json）并在日志中给出摘要
+        self.instrument = instrument
+        self.report_path = report_path
+        self.timer = NULL_TIMER
+        # 诊断：文件名匹配 dump_tables 中任一模式（fnmatch），或按 dump_sample 的比例抽样的文件，
+        # 以INFO级别输出原始表格和解析结果
+        self.dump_tables = list(dump_tables or ())
+        self.dump_sample = dump_sample
+        # 字段配置文件，默认为当前目录下的 MedicalReportParameters.yml
+        self.config_path = config_path or os.path.join(os.getcwd(), YAML_CONFIG)
+        # 解析出但不在字段配置中的键
+        self.unmapped_keys = set()
+        # 本次运行中处理失败的文件
+        self.failed_files = []
+        # 被停止时尚未处理的文件
+        self.unprocessed_files = []
+        self._finished_files = set()
+
+    # 表格类型识别器，首次使用时按配置编译，所有实例共享
+    _classifier = None
+
+    @classmethod
+    def table_classifier(cls):
+        if cls._classifier is None:
+            cls._classifier = TableClassifier.from_config()
+        return cls._classifier
+
+    # 各类型表格的提取器，首次使用时按配置编译，所有实例共享
+    _extractors = None
+
+    @classmethod
+    def table_extractors(cls):
+        if cls._extractors is None:
+            cls._extractors = {tableType[name]: extractor for name, extractor in load_extractors().items()}
+        return cls._extractors
 
     def judge_table_type(self,table):
-        keyword_info = ["姓名"]
-        keyword_firstorder = ["熄灯时间", "睡眠期平均心率"]
-        # 睡眠分期
-        keyword_sleepStage = ["睡眠时间"]
-        # 微觉醒类型
-        keyword_arousal = ["微觉醒类型"]
-        # 呼吸暂停
-        keyword_apnea1 = ["呼吸暂停+低通气"]
-        keyword_apnea2 = ["所有.*暂停"]
-        keyword_limboMovenments = ["睡眠期次数"]
-        # 呼吸事件
-        keyword_breathingEvent = ["AHI"]
-        # 打鼾
-        keyword_snoring = ["打鼾概要"]
-        # 血氧
-        keyword_oxygenSaturation = ["睡眠期平均血氧"]
-
-        patterns = {
-            tableType.Info: re.compile(
-                r'\b(?:' + '|'.join([re.escape(kw).replace('\\', '\\\\') for kw in keyword_info]) + r')\b',
-                re.IGNORECASE),
-            tableType.FirstOrder: re.compile(
-                r'\b(?:' + '|'.join([re.escape(kw).replace('\\', '\\\\') for kw in keyword_firstorder]) + r')\b',
-                re.IGNORECASE),
-            tableType.SleepStage: re.compile(
-                r'\b(?:' + '|'.join([re.escape(kw).replace('\\', '\\\\') for kw in keyword_sleepStage]) + r')\b',
-                re.IGNORECASE),
-            tableType.Arousal: re.compile(
-                r'\b(?:' + '|'.join([re.escape(kw).replace('\\', '\\\\') for kw in keyword_arousal]) + r')\b',
-                re.IGNORECASE),
-            tableType.Apnea1: re.compile(
-                r'(?:{})'.format('|'.join(
-                    [r'{}'.format(kw.replace('+', r'\+')) for kw in keyword_apnea1]
-                )),
-                re.IGNORECASE
-            ),
-            tableType.Apnea2: re.compile(
-                r'(?:{})'.format('|'.join(keyword_apnea2)),
-                re.IGNORECASE
-            ),
-            tableType.LimbMovements: re.compile(
-                r'\b(?:' + '|'.join([re.escape(kw).replace('\\', '\\\\') for kw in keyword_limboMovenments]) + r')\b',
-                re.IGNORECASE),
-            tableType.BreathingEvent: re.compile(
-                r'\b(?:' + '|'.join([re.escape(kw).replace('\\', '\\\\') for kw in keyword_breathingEvent]) + r')\b',
-                re.IGNORECASE),
-            tableType.Snoring: re.compile(
-                r'\b(?:' + '|'.join([re.escape(kw).replace('\\', '\\\\') for kw in keyword_snoring]) + r')\b',
-                re.IGNORECASE),
-            tableType.OxygenSaturation: re.compile(
-                r'\b(?:' + '|'.join([re.escape(kw).replace('\\', '\\\\') for kw in keyword_oxygenSaturation]) + r')\b',
-                re.IGNORECASE),
-        }
-        table_type = tableType.Null
-        for row in table:
-            for cell in row:
-                clean_cell = re.sub(r'\s+', '', str(cell))
-                for table_type, pattern in patterns.items():
-                    if pattern.search(clean_cell):
-                        return table_type
-        return tableType.Null
-
-    def process_info_table(self,table, scan_mode=False):
-        key_map = {
-            '姓名': '姓名',
-            '身高': '身高(cm)',
-            '体重': '体重(kg)',
-            '性别': '性别',
-            '年龄': '年龄',
-            '体重指数(BMI)': '体重指数(BMI)(kg/m2)',
-            '出生日期': '出生日期',
-            '颈围': '颈围(cm)',
-            '腹围': '腹围(cm)',
-            '监测日期': '监测日期',
-            '监测医/技师': '监测医/技师',
-            '转诊医师': '转诊医师'
-        }
-        result = {
-            '姓名': None,
-            '身高(cm)': None,
-            '体重(kg)': None,
-            '性别': None,
-            '年龄': None,
-            '体重指数(BMI)(kg/m2)': None,
-            '出生日期': None,
-            '颈围(cm)': None,
-            '腹围(cm)': None,
-            '监测日期': None,
-            '监测医/技师': None,
-            '转诊医师': None
-        }
-
-        for row in table:
-            for item in row:
-                key, value = item.split('：', 1)
-                key = key.strip()
-                value = value.strip()
-                if key in key_map:
-                    target_key = key_map[key]
-                    if key in ['身高', '体重', '年龄', '颈围', '腹围', '体重指数(BMI)']:
-                        result[target_key] = extract_number_from_string(value)
-                    elif key == '性别':
-                        result[target_key] = process_gender(value)
-                    else:
-                        result[target_key] = value
-
-        return result
-
-    def process_firstorder_table(self,table, scan_mode=False):
-        table_data = {}
-        for sublist in table:
-            # 步长2遍历键值对
-            for i in range(0, len(sublist), 2):
-                key = sublist[i]
-                value = sublist[i + 1]
-
-                # 统一键名格式（可选）
-                key = key.replace(" ", "").replace("（", "(").replace("）", ")").replace("\t",'')
-                key = key.replace("总卧床时间TIB", "卧床时间(TIB)")
-                key = key.replace("(次/分钟)","")
-                value = extract_number_from_string(value)
-
-                # 转换数值类型（可选）
-                table_data[key] = value
-
-        return table_data
-
-
-    def process_sleepstage_table(self,table, scan_mode = False):
-        """处理睡眠分期表格"""
-        # 创建结果字典
-        result = {}
-
-        # 处理每一行数据
-        for row in table[1:]:
-            # 清理分期名称
-            stage = re.sub(r'\s+', '', row[0].strip())
-            duration = float(row[1])
-            percent = float(row[2])
-
-            # 生成列名
-            duration_col = f"{stage}持续时间(min)"
-            percent_col = f"{stage}%睡眠时间(/TST)"
-
-            # 存储数据
-            result[duration_col] = duration
-            result[percent_col] = percent
-        return result
-
-    def process_arousal_table(self,table, scan_mode=False):
-        """处理微觉醒相关表格"""
-        result = {}
-        # 标准化表头
-        headers = [re.sub(r'\(/TST\)', '', h).strip() for h in table[0]]
-
-        # 确定数值列位置
-        value_columns = []
-        for idx, h in enumerate(headers):
-            if h in ['REM', 'NREM', '次数', '指数']:
-                value_columns.append((idx, h))
-
-        # 处理数据行
-        for row in table[1:]:
-            arousal_type = row[0].strip()
-            # 标准化类型名称
-            arousal_type = re.sub(r'\s+', '', arousal_type)
-            if arousal_type == 'Total':
-                arousal_type = '微觉醒总数'
-
-            for col_idx, col_name in value_columns:
-                # 生成标准列名
-                combined_col = f"{arousal_type}{col_name}"
-                try:
-                    value = float(row[col_idx])
-                except (ValueError, IndexError):
-                    value = 0.0
-
-                result[combined_col] = value
-
-        return result
-
-    def process_apnea1_table(self,table, scan_mode=False):
-        result = {}
-        # 提取并标准化表头
-        headers = [re.sub('\s*','',h).strip() for h in table[0]]
-
-        # 处理数据行
-        for row in table[1:]:
-            apnea1_type = row[0].strip()
-            apnea1_type = re.sub(r'\s+', '', apnea1_type)
-            apnea1_type = re.sub(r'AHI\(/hr\)', r'AHI(/h)', apnea1_type)
-
-            for col_idx in range(1, len(row)):
-                # 生成标准化列名
-                raw_col = headers[col_idx]
-                std_col = f"{apnea1_type}{raw_col}"
-
-                # 数值处理（新增空值和-处理）
-                value = row[col_idx].strip()
-                result[std_col] = value
-        return result
-
-    def process_apnea2_table(self,table, scan_mode=False):
-        result = {}
-
-        """处理呼吸事件表格并整合数据"""
-        # 列名映射表（表二 -> 表一）
-        column_mapping = {
-            '阻塞性': '阻塞性呼吸暂停',
-            '混合性': '混合性呼吸暂停',
-            '中枢性': '中枢性呼吸暂停',
-            '所有暂停': '所有呼吸暂停',
-            '低通气': '所有低通气'
-        }
-
-        # 初始化结果容器
-        result = {}
-        key = '所有暂停'
-
-        headers = [re.sub(r'\n', '', cell) for cell in table[0]]
-        for row in table[1:]:
-            param = row[0]
-            for idx in range(1, len(row)):
-                # 转换列名
-                original_col = headers[idx]
-                col_name = f"{headers[idx]}{param}"
-                if key in table[0]:
-                    mapped_col = column_mapping.get(original_col, original_col).strip()
-                    col_name = f"{mapped_col}{param}"
-
-                col_name = col_name.replace(" ", "").replace("（", "(").replace("）", ")")
-                col_name = re.sub(r'\(sec\)', '(s)', col_name)  # 单位转换
-
-                # 数值处理
-                value = row[idx].strip()
-                result[col_name] = '/' if value in ['-', ''] else value
-
-        return result
-
-    def process_limbomovements_table(self,table, scan_mode=False):
-        result = {}
-
-        # 列名标准化映射
-        column_mapping = {
-            "睡眠期指数(/TST)": "睡眠期指数(/TST)",
-            "睡眠期指数": "睡眠期指数(/TST)"
-        }
-
-        # 结果容器（保持列顺序）
-
-        # 标准化表头
-        headers = [column_mapping.get(col.strip(), col.strip()) for col in table[0]]
-
-        # 处理数据行
-        for row in table[1:]:
-            # 清理类型名称
-            event_type = re.sub(r'\s+', '', row[0].strip())
-            # 动态生成列名
-            count_col = f"{event_type}睡眠期次数"
-            index_col = f"{event_type}睡眠期指数(/TST)"
-            # 数据清洗（空值和-转为/）
-            count_value = row[1] if row[1] not in ['', '-'] else '/'
-            index_value = row[2] if row[2] not in ['', '-'] else '/'
-
-            # 存储数据
-            result[count_col] = count_value
-            result[index_col] = index_value
-
-        return result
-
-    def process_breathingevent_table(self,table, scan_mode=False):
-        """处理呼吸事件表格（完整保留所有体位数据）"""
-        # 预定义标准体位和指标
-        POSITIONS = ['俯卧', '左侧', '右侧', '仰卧']
-        METRICS = [
-            '阻塞性呼吸暂停', '混合性呼吸暂停', '中枢性呼吸暂停',
-            '低通气', 'AHI', '睡眠时间%', '持续时间(min)'
-        ]
-
-        # 初始化结果容器（动态扩展列）
-        result = OrderedDict()
-
-        # === 列名映射规则 ===
-        column_mapping = {
-            r'阻塞性[\s（]*': '阻塞性呼吸暂停',
-            r'混合性[\s（]*': '混合性呼吸暂停',
-            r'中枢性[\s（]*': '中枢性呼吸暂停',
-            r'低通气[\s（]*': '低通气',
-            r'^AHI$': 'AHI',
-            r'睡眠时间': '睡眠时间%',
-            r'持续时间[\s（]*min': '持续时间(min)'
-        }
-
-        # === 表头处理 ===
-        header_map = {}
-        for orig_col in table[0]:
-            # 深度清洗列名
-            cleaned_col = re.sub(r'[\n（）()]', '', orig_col).strip()
-            # 动态匹配列名规则
-            for pattern, mapped in column_mapping.items():
-                if re.search(pattern, cleaned_col):
-                    header_map[orig_col] = mapped
-                    break
-        # === 数据处理 ===
-        for row in table[1:]:
-            position = re.sub(r'\s+', '', row[0])
-            if position not in POSITIONS:
-                continue
-
-            for idx in range(1, len(row)):
-                orig_col = table[0][idx]
-                metric = header_map.get(orig_col)
-
-                if metric:
-                    # 生成完整列名
-                    col_name = f"{position}{metric}"
-                    raw_value = row[idx].strip()
-
-                    # 数据清洗
-                    if raw_value in ['', '-', 'NA']:
-                        final_value = '/'
-                    else:
-                        try:
-                            final_value = float(raw_value) if '.' in raw_value else int(raw_value)
-                        except:
-                            final_value = '/'
-
-                    # 直接存储所有值（包括0）
-                    result[col_name] = final_value
-
-        # === 补全所有可能的列 ===
-        full_columns = [f"{pos}{metric}" for pos in POSITIONS for metric in METRICS]
-        for col in full_columns:
-            if col not in result:
-                result[col] = '/'
-
-        # 保持列顺序
-        result = OrderedDict((col, result.get(col, '/')) for col in full_columns)
-        return result
-
-
-    def process_snoring_table(self,table, scan_mode=False):
-        result = {}
-        for i in range(0, len(table[1]), 2):
-            key = table[1][i]
-            clean_key = re.sub(r'（睡眠期）', '', key)
-            value = table[1][i + 1]
-            result[clean_key] = value
-        return result
-
-
-    def process_oxygenSaturation_table(self,table, scan_mode=False):
-        result = {}
-
-        for row in table:
-            # 处理前四个参数
-            for i, cell in enumerate(row):
-                if "睡眠期平均血氧 (%)" in cell:
-                    result["睡眠期平均血氧"] = extract_number(row[i + 1]) if i + 1 < len(row) else None
-                if "清醒期平均SpO2 (%)" in cell:
-                    result["清醒期平均SpO2(%)"] = extract_number(row[i + 1]) if i + 1 < len(row) else None
-                if "睡眠期最低血氧 (%)" in cell:
-                    result["睡眠期最低血氧(%)"] = extract_number(row[i + 1]) if i + 1 < len(row) else None
-                if "氧减" in cell and "指数" in cell:
-                    result["氧减＞3%指数(/h)(ODI)"] = extract_number(row[i + 1]) if i + 1 < len(row) else None
-
-            # 处理血氧饱和度水平数据（优化定位逻辑）
-            if row[0].startswith('低于'):
-                key_type = row[0].split(' ')[0]  # 如"低于95%"
-
-                # 统一提取规则：时间取第2列，占比取最后一列
-                if "时间（min）" in row[0]:
-                    # 时间值处理
-                    time_val = row[1] if len(row) > 1 else None
-                    # 占比值处理
-                    percent_val = row[-1] if len(row) > 1 else None
-
-                    # 根据百分比级别存储数据
-                    if "95%" in key_type:
-                        result["血氧饱和度水平低于95%时间(min)"] = convert_time(time_val)
-                        result["血氧饱和度水平低于95%时间占比(%)"] = extract_number(percent_val)
-                    elif "90%" in key_type:
-                        result["血氧饱和度水平低于90%时间(min)"] = convert_time(time_val)
-                        result["血氧饱和度水平低于90%时间占比(%)"] = extract_number(percent_val)
-                    elif "85%" in key_type:
-                        result["血氧饱和度水平低于85%时间(min)"] = convert_time(time_val)
-                        result["血氧饱和度水平低于85%时间占比(%)"] = extract_number(percent_val)
-                    elif "80%" in key_type:
-                        result["血氧饱和度水平低于80%时间(min)"] = convert_time(time_val)
-                        result["血氧饱和度水平低于80%时间占比(%)"] = extract_number(percent_val)
-
-        return result
+        """识别表格类型，规则见 TableTypes.yml"""
+        name = self.table_classifier().classify(table)
+        return tableType[name] if name else tableType.Null
+
+    def table_handler(self, table_type):
+        """处理该类型表格的函数 f(table) -> {列名: 值}，提取规则见 TableTypes.yml"""
+        extractor = self.table_extractors().get(table_type)
+        if extractor is None:
+            return _no_table_data
+        if isinstance(extractor, str):
+            # 规则无法描述的表格由同名方法处理
+            return getattr(self, extractor)
+        return extractor.extract
 
     def process_table_data(self,table, table_type):
-        if table_type == tableType.Info:
-            return self.process_info_table(table)
-        elif table_type == tableType.FirstOrder:
-            return self.process_firstorder_table(table)
-        elif table_type == tableType.SleepStage:
-            return self.process_sleepstage_table(table)
-        elif table_type == tableType.Arousal:
-            return self.process_arousal_table(table)
-        elif table_type == tableType.Apnea1:
-            return self.process_apnea1_table(table)
-        elif table_type == tableType.Apnea2:
-            return self.process_apnea2_table(table)
-        elif table_type == tableType.LimbMovements:
-            return self.process_limbomovements_table(table)
-        elif table_type == tableType.BreathingEvent:
-            return self.process_breathingevent_table(table)
-        elif table_type == tableType.Snoring:
-            return self.process_snoring_table(table)
-        elif table_type == tableType.OxygenSaturation:
-            return self.process_oxygenSaturation_table(table)
-        else:
-            return {}
+        return self.table_handler(table_type)(table)
+
+    def load_field_config(self, yaml_path):
+        """加载YAML配置文件，返回 (字段名列表, {字段名: 类型})"""
+        import yaml
 
-    def load_config(self,yaml_path):
-        """加载YAML配置文件"""
         with open(yaml_path, 'r', encoding='utf-8') as f:
             config = yaml.safe_load(f)
-        return ['文件名'] + config['Param']  # 第一列为文件名
+        fields, types = parse_fields(config['Param'])
+        return [FILENAME_FIELD] + fields, {FILENAME_FIELD: TEXT, **types}  # 第一列为文件名
+
+    def load_config(self,yaml_path):
+        """加载YAML配置文件，返回字段名列表"""
+        return self.load_field_config(yaml_path)[0]
 
 
     def rtf_to_docx(self,rtf_path):
         """转换RTF为DOCX"""
-        temp_dir = os.path.dirname(rtf_path)
-        subprocess.run([
-            'soffice', '--headless', '--convert-to', 'docx',
-            '--outdir', temp_dir, rtf_path
-        ], check=True, capture_output=True)
-        return os.path.splitext(rtf_path)[0] + ".docx"
+        converter = self.converter
+        if converter is None:
+            from converter import SubprocessConverter
+            converter = SubprocessConverter()
+        with self.timer.stage("convert"):
+            return converter.convert(rtf_path, os.path.dirname(rtf_path))
 
     def iter_block_items(self,parent):
         """
         生成父元素中的每个段落和表格元素。
         """
+        from docx.oxml import OxmlElement
+
         for child in parent:
             if isinstance(child, OxmlElement):
                 if child.tag.endswith('p'):
@@ -507,203 +220,524 @@ class RTFParser:
                 elif child.tag.endswith('tbl'):
                     yield child
 
-    def extract_data(self,paragraphs):
-        """从段落数据中提取目标字段"""
-        data = {
-            "监测类型": None,
-            "AHI(次/h)": None,
-            "OAHI(次/h)": None,
-            "OAI(次/h)": None,
-            "睡眠期间血氧＜90%的累计时间(min)": None,
-            "睡眠期间血氧＜90%的累计时间占比": None,
-            "结论": [],
-            "诊断": []
-        }
-
-        # 状态标志
-        in_conclusion = False
-        in_diagnosis = False
-        text = paragraphs[2][1].strip()
-        data["监测类型"] = text
-
-        for _, text in paragraphs:
-            text = text.strip()
-            if not text:
-                in_conclusion = False
-                in_diagnosis = False
-                continue
-
-            # 提取数值型数据
-
-
-            if "AHI" in text:
-                if match := re.search(r"AHI.*?=([\d.]+)", text):
-                    data["AHI(次/h)"] = float(match.group(1))
-            if match := re.search(r"OAHI.*?=([\d.]+)", text):
-                data["OAHI(次/h)"] = float(match.group(1))
-            if match := re.search(r"OAI.*?=([\d.]+)", text):
-                data["OAI(次/h)"] = float(match.group(1))
-
-            # 血氧数据提取
-            if "血氧<90%" in text or "血氧＜90%" in text:
-                parts = re.split(r"[；;]", text)
-                for part in parts:
-                    if "时间" in part and "min" not in part:  # 处理第三个文档的特殊格式
-                        if match := re.search(r"([\d:\.]+)", part):
-                            data["睡眠期间血氧＜90%的累计时间(min)"] = convert_time(match.group(1))
-                    elif "时间" in part:
-                        if match := re.search(r"([\d.]+)\s*min", part):
-                            data["睡眠期间血氧＜90%的累计时间(min)"] = float(match.group(1))
-                    if "占比" in part:
-                        if match := re.search(r"([\d.]+)%?", part):
-                            data["睡眠期间血氧＜90%的累计时间占比"] = float(match.group(1))
-
-            # 结论和诊断处理
-            if text.startswith("结论："):
-                in_conclusion = True
-                in_diagnosis = False
-                data["结论"].append(text.replace("结论：", "").strip())
-                continue
-            if text.startswith("诊断："):
-                in_diagnosis = True
-                in_conclusion = False
-                data["诊断"].append(text.replace("诊断：", "").strip())
-                continue
-
-            if in_conclusion:
-                data["结论"].append(text)
-            if in_diagnosis:
-                data["诊断"].append(text)
-
-        # 合并文本字段
-        data["结论"] = " ".join(data["结论"]) if data["结论"] else None
-        data["诊断"] = " ".join(data["诊断"]) if data["诊断"] else None
-
-        return data
-
-
-    def extract_docx_data(self,docx_path, fields):
-        """从DOCX提取目标数据"""
-        doc = Document(docx_path)
-        data = {field: "" for field in fields}
+    def extract_data(self, paragraphs, fields=None):
+        """
+        从段落数据中提取目标字段（规则见 paragraph_extractor.py）。
+        fields 为需要的字段（如输出列结构的 index），全部取得后不再扫描其余段落；默认为全部字段。
+        """
+        return extractor_for(fields).extract(paragraphs)
 
-        # print_docx_content(doc)
 
-        # 提取所有段落文本
+    def split_sections(self, texts):
+        """按"#"开头的标题行划分段落，返回 (章节, 文本) 列表"""
         full_text = []
         current_section = ""
-        for para in doc.paragraphs:
-            text = para.text.strip()
+        for text in texts:
+            text = text.strip()
             if text.startswith("#"):
                 current_section = text[1:].strip()
             else:
                 full_text.append((current_section, text))
+        return full_text
 
-        doc_data = self.extract_data(full_text)
-        for field in fields:
-            for key_data in doc_data:
-                if field == key_data:
-                    data[field] = doc_data[key_data]
-
-        debug_msg = f"doc_data: {doc_data},\ndata: {data}"
-        self.logger.debug(debug_msg)
-        # 提取所有表格
-        tables = []
-        for table in doc.tables:
-            table_data = []
-            for row in table.rows:
-                table_data.append([cell.text.strip() for cell in row.cells])
-            tables.append(table_data)
+    def read_docx(self, docx_path):
+        """读取DOCX中的段落和表格（lxml 流式解析，结构与 python-docx 一致）"""
+        with self.timer.stage("read"):
+            texts, tables = read_docx(docx_path)
+        return self.split_sections(texts), tables
 
-        for table in tables:
-            table_type = self.judge_table_type(table)
-            table_data = self.process_table_data(table,table_type)
-            for field in fields:
-                for key_data in table_data:
-                    if field == key_data:
-                        data[field] = table_data[key_data]
-            if not table_type == table_type.Null:
-                debug_msg = f"{table_type}:\ntable_data:\n{table_data}\ntable:\n{table}"
-                self.logger.debug("%s", debug_msg)
-
-        self.logger.debug(data)
-        return data
+    def read_rtf(self, rtf_path):
+        """直接解析RTF中的段落和表格，不经过LibreOffice"""
+        with self.timer.stage("read"):
+            texts, tables = read_rtf(rtf_path)
+        return self.split_sections(texts), tables
 
-    def stop(self):
-        """停止解析"""
-        self._stop_event.set()
+    def extract_document_row(self, full_text, tables, schema, unmapped=None, dump=False):
+        """
+        从段落和表格中提取目标数据，直接写入按列号排列的行。
+        dump=True（--dump-tables/--dump-sample 选中的文件）时以INFO级别输出原始表格和各表格的解析结果；
+        与日志级别无关，未选中的文件即使在 DEBUG 级别下也不格式化任何表格内容。
+        """
+        row = schema.new_row()
+        timer = self.timer
 
-    def process_files(self,folder_path):
-        """处理文件夹中的所有RTF文件"""
-        # 初始化Excel
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "合并数据"
+        with timer.stage("paragraphs"):
+            doc_data = self.extract_data(full_text, schema.index)
+        schema.merge(row, doc_data, unmapped)
+        if dump:
+            self.logger.info("doc_data: %s", doc_data)
 
-        # 获取字段配置
-        config_path = os.path.join(os.getcwd(), YAML_CONFIG)
-        fields = self.load_config(config_path)
+        for table in tables:
+            # 单元格统一规范化一次（全角括号、首尾空白），各类表格的提取规则不再各自清洗
+            with timer.stage("normalize"):
+                table = normalize_table(table)
+            with timer.stage("classify"):
+                table_type = self.judge_table_type(table)
+            with timer.stage(_TABLE_STAGES[table_type]):
+                table_data = self.process_table_data(table,table_type)
+            schema.merge(row, table_data, unmapped)
+            if dump and table_type is not tableType.Null:
+                self.logger.info("%s:\ntable_data:\n%s\ntable:\n%s", table_type, table_data, table)
+
+        if dump:
+            self.logger.info("data: %s", schema.to_dict(row))
+        return row
+
+    def should_dump(self, filename):
+        """是否输出该文件的原始表格（按文件名匹配或按比例抽样，抽样结果对同一文件名固定）"""
+        name = os.path.basename(filename)
+        if any(fnmatch.fnmatch(name, pattern) for pattern in self.dump_tables):
+            return True
+        if self.dump_sample > 0:
+            return zlib.crc32(name.encode("utf-8")) % 10000 < self.dump_sample * 10000
+        return False
+
+    def extract_document_data(self, full_text, tables, fields):
+        """从段落和表格中提取目标数据，返回 {字段: 值}"""
+        schema = fields if isinstance(fields, OutputSchema) else OutputSchema(fields)
+        return schema.to_dict(self.extract_document_row(full_text, tables, schema))
 
-        # 创建表头
-        for col_idx, field in enumerate(fields, 1):
-            ws.cell(row=1, column=col_idx, value=field)
+    def extract_docx_data(self,docx_path, fields):
+        """从DOCX提取目标数据"""
+        full_text, tables = self.read_docx(docx_path)
+        return self.extract_document_data(full_text, tables, fields)
+
+    def extract_rtf_data(self, rtf_path, fields):
+        """从RTF直接提取目标数据"""
+        full_text, tables = self.read_rtf(rtf_path)
+        return self.extract_document_data(full_text, tables, fields)
+
+    def parse_file(self, filepath, schema, docx_path=None):
+        """解析单个RTF文件，返回数据行；docx_path 为已转换好的DOCX（可选）"""
+        if self.reader == "rtf":
+            full_text, tables = self.read_rtf(filepath)
+        else:
+            # 转换文件格式
+            if docx_path is None:
+                docx_path = self.rtf_to_docx(filepath)
+            try:
+                full_text, tables = self.read_docx(docx_path)
+            finally:
+                os.remove(docx_path)  # 清理临时文件
+        dump = (self.dump_tables or self.dump_sample) and self.should_dump(filepath)
+        if dump:
+            self.logger.info(f"输出 {os.path.basename(filepath)} 的原始表格（{len(tables)} 个）")
+        row = self.extract_document_row(full_text, tables, schema, self.unmapped_keys, bool(dump))
+        schema.set(row, FILENAME_FIELD, os.path.splitext(os.path.basename(filepath))[0])
+        return row
 
-        # 处理文件
-        row_idx = 2
-        for filename in os.listdir(folder_path):
-            if not filename.lower().endswith('.rtf'):
-                continue
+    def stop(self):
+        """停止解析"""
+        self._stop_event.set()
 
+    def _report_unmapped(self):
+        """每次运行结束时报告一次解析出但不在字段配置中的键（列名可能与配置不一致）"""
+        if self.unmapped_keys:
+            self.logger.warning(f"以下解析结果不在字段配置中，已忽略：{sorted(self.unmapped_keys)}")
+
+    def open_cache(self, config_path):
+        """打开结果缓存，版本戳包含字段配置和解析代码，任一变化缓存即失效"""
+        version = version_stamp([config_path, TABLE_TYPES_CONFIG, os.path.abspath(__file__),
+                                 rtf_reader.__file__, docx_reader.__file__, table_classifier.__file__,
+                                 table_extractor.__file__, text_normalize.__file__, cell_values.__file__,
+                                 paragraph_extractor.__file__, output_schema.__file__],
+                                self.reader)
+        self.cache = ResultCache(self.cache_path, version, self.cache_max_bytes)
+        return self.cache
+
+    def _lookup_cache(self, folder_path, filenames, schema):
+        """查询缓存，返回 (命中的结果, 各文件的内容摘要)"""
+        cached, digests = {}, {}
+        if self.cache is None:
+            return cached, digests
+        with self.timer.stage("cache_lookup"):
+            for filename in filenames:
+                try:
+                    digest = file_digest(os.path.join(folder_path, filename))
+                except OSError:
+                    continue
+                digests[filename] = digest
+                row = self.cache.get(digest)
+                if row is not None and len(row) == len(schema):
+                    schema.set(row, FILENAME_FIELD, os.path.splitext(filename)[0])
+                    cached[filename] = row
+        self.timer.count("cache_hits", len(cached))
+        self.timer.count("cache_misses", len(digests) - len(cached))
+        if cached:
+            self.logger.info(f"{len(cached)} 个文件未变化，直接使用缓存结果")
+        return cached, digests
+
+    def _store_cache(self, digest, row):
+        if self.cache is not None and digest:
+            self.cache.put(digest, row)
+
+    def _process_folder(self, sink, schema, folder_path):
+        """转换并解析文件夹中的RTF，写入输出；被停止时返回False，未处理的文件记录在 unprocessed_files"""
+        # 按文件名排序，保证输出行顺序稳定
+        filenames = sorted(f for f in os.listdir(folder_path) if f.lower().endswith('.rtf'))
+        cached, digests = self._lookup_cache(folder_path, filenames, schema)
+        if self.workers > 1:
+            process = self._process_folder_parallel
+        elif self.pipeline_workers > 0:
+            process = self._process_folder_pipeline
+        else:
+            process = self._process_folder_serial
+        completed = process(sink, schema, folder_path, filenames, cached, digests)
+        if not completed:
+            self.unprocessed_files = [f for f in filenames if f not in self._finished_files]
+        return completed
+
+    def _process_folder_serial(self, sink, schema, folder_path, filenames, cached, digests):
+        """逐个转换并解析"""
+        docx_map = None
+        if self.reader != "rtf" and self.batch_workers > 0:
+            pending = [f for f in filenames if f not in cached]
+            self.logger.info(f"批量转换 {len(pending)} 个文件（{self.batch_workers} 个进程）......")
+            from converter import convert_batch
+            with self.timer.stage("convert_batch"):
+                docx_map = convert_batch(
+                    [os.path.join(folder_path, f) for f in pending],
+                    workers=self.batch_workers, stop_event=self._stop_event)
+
+        for filename in filenames:
             self.logger.info(f"正在处理 {filename}......")
             if self._stop_event.is_set():
                 self.logger.info("接受到停止请求，任务已经终止")
+                for docx_path in (docx_map or {}).values():
+                    if os.path.exists(docx_path):
+                        os.remove(docx_path)
                 return False
 
             filepath = os.path.join(folder_path, filename)
+            start = time.perf_counter()
             try:
-                # 转换文件格式
-                docx_path = self.rtf_to_docx(filepath)
-
-                # 提取数据
-                file_data = self.extract_docx_data(docx_path, fields)
-                file_data['文件名'] = os.path.splitext(filename)[0]
+                if filename in cached:
+                    row = cached[filename]
+                else:
+                    if docx_map is not None and filepath not in docx_map:
+                        raise RuntimeError("批量转换未生成DOCX")
+                    row = self.parse_file(filepath, schema,
+                                          docx_map.get(filepath) if docx_map else None)
+                    self._store_cache(digests.get(filename), row)
 
                 # 写入Excel
-                for col_idx, field in enumerate(fields, 1):
-                    ws.cell(row=row_idx, column=col_idx, value=file_data.get(field, ""))
-
-                row_idx += 1
-                os.remove(docx_path)  # 清理临时文件
-                self.logger.info(f"文件{filename}处理结束")
+                with self.timer.stage("write"):
+                    sink.write(row)
+                self._file_done(filename, time.perf_counter() - start,
+                                "cached" if filename in cached else "ok")
 
             except Exception as e:
-                self.logger.error(f"处理失败 {filename}: {str(e)}")
+                self._file_done(filename, time.perf_counter() - start, "error", e)
                 continue
+        return True
+
+    def _file_done(self, filename, seconds, outcome="ok", error=None):
+        """记录单个文件的处理结果；文件名、耗时和结果同时作为结构化字段写入日志"""
+        if error is not None and self._stop_event.is_set():
+            # 停止时被终止的文件不算失败，计入未处理的文件
+            self.logger.debug(f"文件{filename}未完成: {str(error)}")
+            return
+        self._finished_files.add(filename)
+        self.timer.file_done(filename, seconds, outcome)
+        extra = {"file": filename, "stage": "file", "duration": round(seconds, 4), "outcome": outcome}
+        if error is None:
+            self.logger.info(f"文件{filename}处理结束", extra=extra)
+        else:
+            self.failed_files.append(filename)
+            self.logger.error(f"处理失败 {filename}: {str(error)}", extra=extra)
+
+    def _process_folder_parallel(self, sink, schema, folder_path, filenames, cached, digests):
+        """在进程池中转换并解析，主进程只按文件名顺序写入结果"""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.logger.info(f"使用 {self.workers} 个进程并行处理 {len(filenames)} 个文件......")
+        # 停止时通知工作进程终止正在运行的 soffice
+        worker_stop = multiprocessing.Event()
+
+        def collect(filename, future):
+            if filename in cached:
+                with self.timer.stage("write"):
+                    sink.write(cached[filename])
+                self._file_done(filename, 0.0, "cached")
+                return
+            try:
+                row, unmapped, stats, elapsed = future.result()
+            except Exception as e:
+                self._file_done(filename, 0.0, "error", e)
+                return
+            self.unmapped_keys.update(unmapped)
+            self._store_cache(digests.get(filename), row)
+            with self.timer.stage("write"):
+                sink.write(row)
+            if stats:
+                self.timer.merge(*stats)
+            self._file_done(filename, elapsed)
+
+        with tempfile.TemporaryDirectory(prefix="rtfparser_profiles_") as profile_root:
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                           initargs=(self.reader, profile_root, self.instrument,
+                                                     self.dump_tables, self.dump_sample,
+                                                     LogManager().worker_queue(), self.logger.level,
+                                                     worker_stop))
+            try:
+                futures = {f: executor.submit(_parse_file_worker, os.path.join(folder_path, f), schema)
+                           for f in filenames if f not in cached}
+                # 按文件名顺序收集结果，与完成先后无关
+                for i, filename in enumerate(filenames):
+                    future = futures.get(filename)
+                    while future is not None and not future.done() and not self._stop_event.is_set():
+                        wait_futures([future], timeout=0.2)
+                    if self._stop_event.is_set():
+                        self.logger.info("接受到停止请求，任务已经终止")
+                        worker_stop.set()
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        # 已经完成的文件照常写出
+                        for name in filenames[i:]:
+                            future = futures.get(name)
+                            if future is None or (future.done() and not future.cancelled()):
+                                collect(name, future)
+                        return False
+                    collect(filename, future)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+        return True
+
+    def _process_folder_pipeline(self, sink, schema, folder_path, filenames, cached, digests):
+        """转换、解析、写出分阶段并行：soffice 转换的同时解析前面已转换好的文件"""
+        self.logger.info(f"流水线处理 {len(filenames)} 个文件"
+                         f"（{self.pipeline_workers} 个转换线程，{self.parse_workers} 个解析线程）......")
+        local = threading.local()
+        # 各文件进入转换阶段的时间，用于统计单个文件的总耗时
+        started = {}
+
+        def converter():
+            # 不支持并发的转换器：每个线程使用独立用户配置的 soffice
+            if self.converter is not None and getattr(self.converter, "thread_safe", False):
+                return self.converter
+            if not hasattr(local, "converter"):
+                from converter import SubprocessConverter
+                local.converter = self._canceller.add(SubprocessConverter(
+                    soffice=getattr(self.converter, "soffice", "soffice"),
+                    profile_dir=tempfile.mkdtemp(dir=profile_root)))
+            return local.converter
+
+        def convert(filename):
+            started[filename] = time.perf_counter()
+            if filename in cached or self.reader == "rtf":
+                return None
+            filepath = os.path.join(folder_path, filename)
+            with self.timer.stage("convert"):
+                return converter().convert(filepath, os.path.dirname(filepath))
 
-        # 自动调整列宽
-        for col in ws.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
+        def parse(filename, docx_path):
+            if filename in cached:
+                return cached[filename]
+            self.logger.info(f"正在处理 {filename}......")
+            row = self.parse_file(os.path.join(folder_path, filename), schema, docx_path)
+            self._store_cache(digests.get(filename), row)
+            return row
+
+        def write(filename, row):
+            with self.timer.stage("write"):
+                sink.write(row)
+            self._file_done(filename, time.perf_counter() - started.pop(filename),
+                            "cached" if filename in cached else "ok")
+
+        def on_error(filename, error):
+            self._file_done(filename, time.perf_counter() - started.pop(filename), "error", error)
+
+        def discard(filename, docx_path):
+            if docx_path and os.path.exists(docx_path):
+                os.remove(docx_path)
+
+        with tempfile.TemporaryDirectory(prefix="rtfparser_profiles_") as profile_root:
+            completed = Pipeline(convert, parse, write, on_error, discard,
+                                 convert_workers=self.pipeline_workers, parse_workers=self.parse_workers,
+                                 queue_size=self.queue_size, stop_event=self._stop_event).run(filenames)
+        if not completed:
+            self.logger.info("接受到停止请求，任务已经终止")
+        return completed
+
+    def output_path(self, folder_path, output_format=None):
+        """结果文件路径：<文件夹>/<文件夹名>.<输出格式>"""
+        excel_name = f"{os.path.basename(os.path.normpath(folder_path))}.{output_format or 'xlsx'}"
+        return os.path.join(folder_path, excel_name)
+
+    @contextmanager
+    def _run_resources(self, config_path):
+        """一次运行期间使用的转换器、结果缓存，以及停止时终止转换的监视线程"""
+        from converter import ConversionCanceller, create_converter
+
+        # 未指定转换器时，本次运行使用常驻转换池
+        own_converter = (self.converter is None and self.batch_workers <= 0
+                         and self.workers <= 1 and self.reader != "rtf")
+        if own_converter:
+            self.converter = create_converter(max(self.pool_size, self.pipeline_workers))
+        if self.cache_path:
+            self.open_cache(config_path)
+        try:
+            with ConversionCanceller(self._stop_event, [self.converter]) as self._canceller:
+                yield
+        finally:
+            self._canceller = None
+            if own_converter:
+                self.converter.close()
+                self.converter = None
+            if self.cache is not None:
+                self.cache.close()
+                self.cache = None
+
+    def _update_changed(self, folder_path, schema, state, book):
+        """解析新增或变化的文件并更新到结果表，返回更新的文件数"""
+        entries = scan_folder(folder_path)
+        for name in state.forget_missing(entries):
+            self.logger.info(f"文件{name}已删除，结果表中保留原有数据")
+        updated = 0
+        changed = state.changed(folder_path, entries, written=book.rows)
+        if state.pending:
+            self.logger.info(f"{len(state.pending)} 个文件刚刚修改，可能仍在写入，稍后处理：{sorted(state.pending)}")
+        for filename, file_state in changed:
+            if self._stop_event.is_set():
+                break
+            self.logger.info(f"正在处理 {filename}......")
+            start = time.perf_counter()
+            try:
+                row = self.cache.get(file_state["sha256"]) if self.cache else None
+                if row is None or len(row) != len(schema):
+                    row = self.parse_file(os.path.join(folder_path, filename), schema)
+                    self._store_cache(file_state["sha256"], row)
+                schema.set(row, FILENAME_FIELD, os.path.splitext(filename)[0])
+                book.upsert(row)
+                state.update(filename, file_state)
+                updated += 1
+                self._file_done(filename, time.perf_counter() - start)
+            except Exception as e:
+                self._file_done(filename, time.perf_counter() - start, "error", e)
+        if updated:
+            book.save()
+            self.logger.info(f"已更新 {updated} 个文件至{book.path}")
+        if state.dirty:
+            state.save()
+        return updated
+
+    def update_files(self, folder_path, watch=False, interval=2.0):
+        """
+        增量模式：只处理新增或内容变化的RTF，更新（或追加）到已有结果表中。
+        watch=True 时持续监视文件夹，直到收到停止请求；
+        否则刚修改的文件等待写完后再处理一轮，仍在写入的文件记入 unprocessed_files。
+        """
+        config_path = self.config_path
+        schema = OutputSchema(*self.load_field_config(config_path))
+        self.failed_files = []
+        self.unprocessed_files = []
+        self._finished_files = set()
+        self.unmapped_keys = set()
+        excel_output = self.output_path(folder_path)
+        state = FileStateStore(os.path.splitext(excel_output)[0] + ".state.json")
+        book = IncrementalWorkbook(excel_output, schema.fields)
+
+        with self._run_resources(config_path):
+            updated = self._update_changed(folder_path, schema, state, book)
+            if not watch:
+                # 单次运行：等刚修改的文件写完后再处理一轮，仍未写完的文件列为未处理
+                if state.pending and not self._stop_event.wait(max(state.pending.values())):
+                    updated += self._update_changed(folder_path, schema, state, book)
+                if state.pending:
+                    self.unprocessed_files = sorted(state.pending)
+                    self.logger.warning(f"{len(state.pending)} 个文件仍在写入，本次未处理：{self.unprocessed_files}")
+                self._report_unmapped()
+                return updated
+            watcher = FolderWatcher(folder_path, interval, self._stop_event)
+            self.logger.info(f"正在监视 {folder_path} ......")
+            try:
+                while watcher.wait():
+                    updated += self._update_changed(folder_path, schema, state, book)
+            finally:
+                watcher.close()
+            self.logger.info("接受到停止请求，停止监视")
+            self._report_unmapped()
+            return updated
+
+    def process_files(self,folder_path,output=None):
+        """
+        处理文件夹中的所有RTF文件。
+        output 为结果文件路径，按扩展名选择输出格式（.xlsx/.csv/.parquet/.arrow）；
+        未指定时写入 <文件夹>/<文件夹名>.<output_format>。
+        """
+        # 获取字段配置
+        config_path = self.config_path
+        schema = OutputSchema(*self.load_field_config(config_path))
+        self.failed_files = []
+        self.unprocessed_files = []
+        self._finished_files = set()
+        self.unmapped_keys = set()
+
+        # 初始化输出（流式写入，Excel列宽在写入过程中统计）
+        excel_output = output or self.output_path(folder_path, self.output_format)
+        sink = open_sink(excel_output, schema.fields, streaming=self.streaming, types=schema.types)
+        self.timer = RunTimer() if self.instrument else NULL_TIMER
+        start = time.perf_counter()
+        plan_counts = PLAN_CACHE.counts()
+
+        try:
+            with self._run_resources(config_path):
                 try:
-                    cell_value = str(cell.value)
-                    if len(cell_value) > max_length:
-                        max_length = len(cell_value)
-                except:
-                    pass
-            adjusted_width = (max_length + 2) * 1.2
-            ws.column_dimensions[column].width = adjusted_width
-
-        excel_name = os.path.basename(folder_path)
-        excel_name = excel_name + ".xlsx"
-        excel_output = os.path.join(folder_path, excel_name)
-        wb.save(excel_output)
-        self.logger.info(f"处理完成！结果已保存至{excel_output}")
+                    completed = self._process_folder(sink, schema, folder_path)
+                except BaseException:
+                    sink.abort()
+                    raise
+            if not completed:
+                # 停止时保存已经完成的结果，并报告未处理的文件
+                with self.timer.stage("save"):
+                    sink.close()
+                self.logger.warning(f"任务已停止，已完成的结果已保存至{excel_output}；"
+                                    f"未处理 {len(self.unprocessed_files)} 个文件：{self.unprocessed_files}",
+                                    extra={"file": excel_output, "stage": "run",
+                                           "duration": round(time.perf_counter() - start, 3),
+                                           "outcome": "stopped"})
+                return False
+            self._report_unmapped()
+
+            with self.timer.stage("save"):
+                sink.close()
+            self.logger.info(f"处理完成！结果已保存至{excel_output}",
+                             extra={"file": excel_output, "stage": "run",
+                                    "duration": round(time.perf_counter() - start, 3),
+                                    "outcome": "failed_files" if self.failed_files else "ok"})
+            return True
+        finally:
+            if self.instrument:
+                self._count_plan_cache(plan_counts)
+                self._write_run_report(folder_path, excel_output)
+            self.timer = NULL_TIMER
+
+    def _count_plan_cache(self, since):
+        """把列计划缓存自 since=(命中, 未命中) 以来的计数记入本次运行"""
+        hits, misses = PLAN_CACHE.counts()
+        self.timer.count("plan_cache_hits", hits - since[0])
+        self.timer.count("plan_cache_misses", misses - since[1])
+
+    def _write_run_report(self, folder_path, output):
+        """写出本次运行的分阶段耗时报告，并在日志中显示摘要"""
+        timer = self.timer
+        timer.finish()
+        report_path = self.report_path or output + ".perf.json"
+        try:
+            timer.write_report(report_path, folder=folder_path, output=output, reader=self.reader,
+                               workers=self.workers, pipeline_workers=self.pipeline_workers,
+                               failed_files=list(self.failed_files),
+                               unprocessed_files=list(self.unprocessed_files))
+        except OSError as e:
+            self.logger.warning(f"耗时报告写入失败: {str(e)}")
+            return
+        for line in timer.summary_lines():
+            self.logger.info(line)
+        self.logger.info(f"耗时报告已保存至{report_path}")
 
 
 if __name__ == "__main__":
-    # 使用示例
-    rtf_parser = RTFParser()
-    folder_path =  r"D:\workshop\数据测试用PSG data\数据测试用PSG data"
-    rtf_parser.process_files(folder_path)
-    print(f"处理完成！结果已保存")
\ No newline at end of file
+    # 命令行入口，参数见 cli.py
+    import sys
+    from cli import main
+    sys.exit(main())
\ No newline at end of file
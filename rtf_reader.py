@@ -0,0 +1,288 @@
+"""
+纯 Python 的 RTF 段落/表格读取器。
+流式扫描控制字，直接得到正文段落文本和表格（行 -> 单元格文本），
+结果与 LibreOffice 转 DOCX 后用 python-docx 读取的结构一致，无需启动 soffice。
+"""
+import re
+
+# 控制字 / 十六进制转义 / 控制符号 / 分组 / 普通文本
+_TOKEN = re.compile(
+    rb"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?"
+    rb"|\\'([0-9a-fA-F]{2})"
+    rb"|\\([^a-zA-Z])"
+    rb"|([{}])"
+    rb"|([^\\{}\r\n]+)"
+    rb"|[\r\n]+"
+)
+
+# 内容不属于正文的目标组，整组跳过
+_SKIP_DESTINATIONS = frozenset((
+    "colortbl", "stylesheet", "info", "pict", "object", "objdata", "themedata",
+    "colorschememapping", "latentstyles", "datastore", "listtable",
+    "listoverridetable", "rsidtbl", "generator", "xmlnstbl", "filetbl", "revtbl",
+    "header", "headerl", "headerr", "headerf", "footer", "footerl", "footerr",
+    "footerf", "footnote", "annotation", "fldinst", "nonesttables", "pntext",
+    "pntxta", "pntxtb", "bkmkstart", "bkmkend", "shp", "shpinst", "sp",
+))
+
+# 字符集 -> Python 编码
+_CHARSET_CODECS = {
+    128: "cp932", 129: "cp949", 134: "gbk", 136: "big5", 161: "cp1253",
+    162: "cp1254", 163: "cp1258", 177: "cp1255", 178: "cp1256", 186: "cp1257",
+    204: "cp1251", 222: "cp874", 238: "cp1250",
+}
+
+# 输出固定字符的控制字 / 控制符号
+_SPECIAL_WORDS = {
+    "tab": "\t", "line": "\n", "emdash": "\u2014", "endash": "\u2013",
+    "bullet": "\u2022", "lquote": "\u2018", "rquote": "\u2019",
+    "ldblquote": "\u201c", "rdblquote": "\u201d", "emspace": "\u2003",
+    "enspace": "\u2002", "qmspace": "\u2005",
+}
+_SPECIAL_SYMBOLS = {"~": "\xa0", "_": "-", "-": "", "\\": "\\", "{": "{", "}": "}"}
+
+
+class _Group:
+    __slots__ = ("uc", "skip", "codec", "intbl", "fonttbl")
+
+    def __init__(self, uc=1, skip=False, codec="cp1252", intbl=False, fonttbl=False):
+        self.uc = uc
+        self.skip = skip
+        self.codec = codec
+        self.intbl = intbl
+        self.fonttbl = fonttbl
+
+    def copy(self):
+        return _Group(self.uc, self.skip, self.codec, self.intbl, self.fonttbl)
+
+
+class RtfTableReader:
+    """单次扫描RTF字节流，收集正文段落和表格"""
+
+    def __init__(self):
+        self.paragraphs = []
+        self.tables = []
+        self.ansi_codec = "cp1252"
+        self.font_codecs = {}
+        self._default_font = None
+        self._font_def = None
+
+        self._text = []       # 当前段落已解码文本
+        self._bytes = bytearray()  # 待解码字节（\'hh 与原始字节）
+        self._bytes_codec = "cp1252"
+        self._skip_chars = 0  # \uN 之后需要跳过的替代字符数
+
+        self._cell_paras = []
+        self._row_cells = []
+        self._cell_defs = []   # 当前行的单元格合并标志
+        self._cell_flags = None
+        self._table = None
+
+    # === 文本累积 ===
+    def _flush_bytes(self):
+        if self._bytes:
+            self._text.append(self._bytes.decode(self._bytes_codec, errors="replace"))
+            self._bytes.clear()
+
+    def _add_bytes(self, data, codec):
+        if self._bytes and codec != self._bytes_codec:
+            self._flush_bytes()
+        self._bytes_codec = codec
+        self._bytes.extend(data)
+
+    def _add_text(self, text):
+        self._flush_bytes()
+        self._text.append(text)
+
+    def _take_paragraph(self):
+        self._flush_bytes()
+        text = "".join(self._text)
+        self._text = []
+        if any("\ud800" <= ch <= "\udfff" for ch in text):
+            text = text.encode("utf-16", "surrogatepass").decode("utf-16", errors="replace")
+        return text
+
+    # === 结构事件 ===
+    def _end_paragraph(self, group):
+        text = self._take_paragraph()
+        if group.intbl:
+            self._cell_paras.append(text)
+            return
+        self._close_table()
+        self.paragraphs.append(text)
+
+    def _end_cell(self):
+        self._cell_paras.append(self._take_paragraph())
+        self._row_cells.append("\n".join(self._cell_paras).strip())
+        self._cell_paras = []
+
+    def _end_row(self):
+        if self._table is None:
+            self._table = []
+        previous = self._table[-1] if self._table else []
+        row = []
+        for idx, text in enumerate(self._row_cells):
+            flags = self._cell_defs[idx] if idx < len(self._cell_defs) else ()
+            # 与 python-docx 的 row.cells 一致：合并单元格重复显示首个单元格的文本
+            if "clmrg" in flags and row:
+                text = row[-1]
+            elif "clvmrg" in flags and idx < len(previous):
+                text = previous[idx]
+            row.append(text)
+        self._table.append(row)
+        self._row_cells = []
+        self._cell_paras = []
+
+    def _close_table(self):
+        if self._table:
+            self.tables.append(self._table)
+        self._table = None
+
+    def _font_codec(self, font):
+        return self.font_codecs.get(font) or self.ansi_codec
+
+    # === 主循环 ===
+    def feed(self, data):
+        group = _Group()
+        stack = []
+        pos = 0
+        end = len(data)
+        match = _TOKEN.match
+        while pos < end:
+            m = match(data, pos)
+            if m is None:
+                pos += 1
+                continue
+            pos = m.end()
+            word, hexbyte, symbol, brace, text = m.group(1, 3, 4, 5, 6)
+
+            if brace is not None:
+                self._flush_bytes()
+                if brace == b"{":
+                    stack.append(group)
+                    group = group.copy()
+                elif stack:
+                    group = stack.pop()
+                continue
+
+            if word is not None:
+                word = word.decode("ascii")
+                param = m.group(2)
+                param = int(param) if param is not None else None
+
+                if word == "bin" and param:
+                    pos += param  # 跳过二进制数据
+                    continue
+                if group.fonttbl:
+                    self._font_table_word(word, param)
+                    continue
+                if group.skip:
+                    continue
+                if word in _SKIP_DESTINATIONS:
+                    group.skip = True
+                elif word == "fonttbl":
+                    group.fonttbl = True
+                elif word == "ansicpg" and param:
+                    self.ansi_codec = f"cp{param}"
+                    group.codec = self._font_codec(self._default_font)
+                elif word == "deff":
+                    self._default_font = param
+                elif word == "f":
+                    group.codec = self._font_codec(param)
+                elif word == "plain":
+                    group.codec = self._font_codec(self._default_font)
+                elif word == "uc":
+                    group.uc = param or 0
+                elif word == "u" and param is not None:
+                    self._add_text(chr(param + 65536 if param < 0 else param))
+                    self._skip_chars = group.uc
+                elif word == "par":
+                    self._end_paragraph(group)
+                elif word == "pard":
+                    group.intbl = False
+                elif word == "intbl":
+                    group.intbl = True
+                elif word == "cell":
+                    self._end_cell()
+                elif word == "nestcell":
+                    # 嵌套表格的单元格并入外层单元格文本
+                    self._cell_paras.append(self._take_paragraph())
+                elif word == "row":
+                    self._end_row()
+                elif word == "trowd":
+                    self._cell_defs = []
+                    self._cell_flags = []
+                elif word in ("clmgf", "clmrg", "clvmgf", "clvmrg"):
+                    if self._cell_flags is None:
+                        self._cell_flags = []
+                    self._cell_flags.append(word)
+                elif word == "cellx":
+                    self._cell_defs.append(tuple(self._cell_flags or ()))
+                    self._cell_flags = []
+                elif word in _SPECIAL_WORDS:
+                    self._add_text(_SPECIAL_WORDS[word])
+                continue
+
+            if hexbyte is not None:
+                if group.skip or group.fonttbl:
+                    continue
+                if self._skip_chars:
+                    self._skip_chars -= 1
+                    continue
+                self._add_bytes(bytes((int(hexbyte, 16),)), group.codec)
+                continue
+
+            if symbol is not None:
+                if symbol == b"*":
+                    group.skip = True
+                    continue
+                if group.skip or group.fonttbl:
+                    continue
+                if self._skip_chars:
+                    self._skip_chars -= 1
+                    continue
+                if symbol in (b"\n", b"\r"):
+                    self._end_paragraph(group)  # "\<换行>" 等同于 \par
+                    continue
+                char = _SPECIAL_SYMBOLS.get(symbol.decode("latin-1"))
+                if char:
+                    self._add_text(char)
+                continue
+
+            if text is not None:
+                if group.skip or group.fonttbl:
+                    continue
+                if self._skip_chars:
+                    skip = min(self._skip_chars, len(text))
+                    self._skip_chars -= skip
+                    text = text[skip:]
+                    if not text:
+                        continue
+                self._add_bytes(text, group.codec)
+
+        # 文档末尾未以 \par 结束的段落
+        tail = self._take_paragraph()
+        if tail:
+            self._close_table()
+            self.paragraphs.append(tail)
+        self._close_table()
+        return self.paragraphs, self.tables
+
+    def _font_table_word(self, word, param):
+        if word == "f":
+            self._font_def = param
+        elif word == "fcharset" and self._font_def is not None:
+            codec = _CHARSET_CODECS.get(param)
+            if codec:
+                self.font_codecs[self._font_def] = codec
+
+
+def parse_rtf(data):
+    """解析RTF字节串，返回 (段落文本列表, 表格列表)"""
+    return RtfTableReader().feed(data)
+
+
+def read_rtf(rtf_path):
+    """读取RTF文件，返回 (段落文本列表, 表格列表)"""
+    with open(rtf_path, "rb") as f:
+        return parse_rtf(f.read())
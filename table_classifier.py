@@ -0,0 +1,74 @@
+import os
+import re
+
+# 表格类型识别规则
+TABLE_TYPES_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TableTypes.yml")
+
+_REGEX_META = set("\\.^$*+?{}[]|()")
+
+
+class TableClassifier:
+    """
+    表格类型识别器。
+    所有类型的关键字在加载配置时编译为一个带命名分组的正则，每个表格只扫描一遍：
+    第一个命中的单元格决定类型，同一单元格内同时命中多种类型时按配置中的优先级选择。
+    """
+
+    def __init__(self, rules):
+        self.names = []
+        self.rules = []
+        alternatives = []
+        first_chars = set()
+        for rule in rules:
+            name = rule["type"]
+            parts = [re.escape(kw) for kw in rule.get("keywords", [])]
+            parts += rule.get("patterns", [])
+            body = "(?:" + "|".join(parts) + ")"
+            if rule.get("boundary", True):
+                body = r"\b" + body + r"\b"
+            alternatives.append(f"(?P<{name}>{body})")
+            self.names.append(name)
+            self.rules.append(re.compile(body, re.IGNORECASE))
+
+            # 收集各关键字可能的首字符，用于快速跳过不可能命中的位置；
+            # 正则以元字符开头时无法确定首字符，不再使用前缀过滤
+            heads = [kw[:1] for kw in rule.get("keywords", [])]
+            heads += [pt[:1] if pt[:1] not in _REGEX_META else "" for pt in rule.get("patterns", [])]
+            if first_chars is not None:
+                if all(heads):
+                    first_chars.update(h for head in heads for h in (head.lower(), head.upper()))
+                else:
+                    first_chars = None
+
+        self.priority = {name: idx for idx, name in enumerate(self.names)}
+        combined = "|".join(alternatives)
+        if first_chars:
+            prefix = "[" + "".join(re.escape(ch) for ch in sorted(first_chars)) + "]"
+            combined = f"(?={prefix})(?:{combined})"
+        self.pattern = re.compile(combined, re.IGNORECASE)
+
+    @classmethod
+    def from_config(cls, path=TABLE_TYPES_CONFIG):
+        import yaml
+
+        with open(path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+        return cls(config["Types"])
+
+    def classify(self, table):
+        """返回表格类型名，无法识别时返回None"""
+        # 单元格去除空白后以换行拼接，换行不会被关键字或 "." 匹配，保证不跨单元格
+        text = "\n".join("".join(str(cell).split()) for row in table for cell in row)
+        match = self.pattern.search(text)
+        if match is None:
+            return None
+        best = self.priority[match.lastgroup]
+        if best:
+            # 同一单元格内可能还有优先级更高的类型
+            pos = match.start()
+            end = text.find("\n", pos)
+            cell = text[text.rfind("\n", 0, pos) + 1:end if end >= 0 else len(text)]
+            for idx in range(best):
+                if self.rules[idx].search(cell):
+                    return self.names[idx]
+        return self.names[best]
@@ -0,0 +1,420 @@
+"""
+表格数据提取。
+各类型表格的提取规则写在 TableTypes.yml 中各类型的 extract 下，加载时编译为提取器对象：
+文本规则（表头、行标签、键名的清洗）编译为带缓存的函数，取值方式编译为转换函数，
+处理表格时只剩查找和拼接。新的报告模板一般只需要修改配置。
+
+layout 决定表格的读取方式：
+    key_value  每个单元格为"键：值"（keys 为 原始键 -> 列名，values 为各键的取值方式）
+    pairs      每行依次为 键、值、键、值……（rows 指定只读取的行号）
+    rows       第一行为表头，其余每行第一列为行标签；
+               columns 给出按列号读取的固定列，否则由表头生成列计划，列名按 name 模板（{label}、{header}）组合
+    lookup     按单元格内容定位：cells 中单元格含有所列全部文本时取其右侧单元格；
+               rows 中第一列匹配 match 的行，在（label 规则处理后的）行标签中依次查找 keys，
+               第一个命中的键代入 columns 的列名模板（{key}），按列号取值（负数从行尾计，不含第一列）
+handler 指定由解析器中的同名方法处理（规则无法描述的表格）。
+rows 布局由表头得到的列计划按表头内容缓存（PLAN_CACHE），同一模板的报告只在第一次分析表头。
+
+表格在提取前已经过 text_normalize.normalize_cell 规范化（全角括号转为半角、去除首尾空白）。
+文本规则为按顺序执行的列表：strip、nospace（去除所有空白）、units（统一单位写法，如 (sec) -> (s)）、
+{replace: {原文: 替换}}（原文都是单个字符时用一张 str.translate 表完成）、{sub: [正则, 替换]}。
+取值方式为单个或按顺序执行的列表：raw、strip、number、float、gender、
+percent（去掉百分号的数值）、duration_minutes（分钟数或 H:M:S 换算为分钟）、{float: 默认值}、{int_or_float: 默认值}、
+{empty: [空值...], to: 结果}（命中时直接返回结果）。
+"""
+import re
+import threading
+from collections import OrderedDict
+
+from cell_values import duration_minutes, first_number, percent_number, to_float, to_int_or_float
+from table_classifier import TABLE_TYPES_CONFIG
+from text_normalize import normalize_units, remove_whitespace, translator
+
+# 文本规则对同一输入的结果缓存上限；表头、行标签的取值有限，命中后只是一次字典查找
+_MEMO_LIMIT = 4096
+
+# rows 布局中缺少单元格时跳过该列
+_SKIP = object()
+
+
+class PlanCache:
+    """
+    列计划的LRU缓存，键为 (提取器, 表头行)，最多保留 maxsize 个。
+    各解析线程共享；命中/未命中次数写入运行报告。
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """返回缓存的列计划，没有时调用 build() 生成并缓存"""
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+        plan = build()
+        with self._lock:
+            self._plans[key] = plan
+            if len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+        return plan
+
+    def counts(self):
+        """(命中次数, 未命中次数)"""
+        return self.hits, self.misses
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+    def __len__(self):
+        return len(self._plans)
+
+
+PLAN_CACHE = PlanCache()
+
+
+# 原先定义在本模块，保留名称以兼容
+extract_number_from_string = first_number
+
+def process_gender(s):
+    return 'M' if s.strip().lower() == 'male' else 'F' if s.strip().lower() == 'female' else s
+
+
+def _identity(value):
+    return value
+
+
+def _text_step(step):
+    if step == "strip":
+        return str.strip
+    if step == "nospace":
+        return remove_whitespace
+    if step == "units":
+        return normalize_units
+    if isinstance(step, dict) and len(step) == 1:
+        (kind, arg), = step.items()
+        if kind == "replace":
+            return translator(arg)
+        if kind == "sub":
+            pattern, repl = re.compile(arg[0]), arg[1]
+            return lambda text: pattern.sub(repl, text)
+    raise ValueError(f"无法识别的文本规则：{step!r}")
+
+
+def compile_text_rules(steps, mapping=None):
+    """按顺序执行的文本规则（最后按 mapping 替换整个结果）编译为带缓存的函数"""
+    funcs = [_text_step(step) for step in steps or ()]
+    mapping = dict(mapping or {})
+    if not funcs and not mapping:
+        return _identity
+    memo = {}
+
+    def normalize(text):
+        result = memo.get(text)
+        if result is None:
+            result = text
+            for func in funcs:
+                result = func(result)
+            result = mapping.get(result, result)
+            if len(memo) < _MEMO_LIMIT:
+                memo[text] = result
+        return result
+    return normalize
+
+
+def _float_or(default):
+    return lambda value: to_float(value, default)
+
+
+def _int_or_float(default):
+    return lambda value: to_int_or_float(value, default)
+
+
+_VALUE_STEPS = {
+    None: _identity,
+    "raw": _identity,
+    "strip": str.strip,
+    "number": first_number,
+    "float": float,
+    "gender": process_gender,
+    "percent": percent_number,
+    "duration_minutes": duration_minutes,
+}
+
+_VALUE_FACTORIES = {
+    "float": _float_or,
+    "int_or_float": _int_or_float,
+}
+
+
+def _value_step(step):
+    if isinstance(step, dict) and len(step) == 1:
+        (kind, default), = step.items()
+        if kind in _VALUE_FACTORIES:
+            return _VALUE_FACTORIES[kind](default)
+    elif step in _VALUE_STEPS:
+        return _VALUE_STEPS[step]
+    raise ValueError(f"无法识别的取值方式：{step!r}")
+
+
+def _chain(funcs):
+    funcs = [func for func in funcs if func is not _identity]
+    if not funcs:
+        return _identity
+    if len(funcs) == 1:
+        return funcs[0]
+
+    def convert(value):
+        for func in funcs:
+            value = func(value)
+        return value
+    return convert
+
+
+def compile_value(spec):
+    """取值方式编译为转换函数"""
+    steps = spec if isinstance(spec, list) else [spec]
+    before, after = [], []
+    empty = None
+    for step in steps:
+        if isinstance(step, dict) and "empty" in step:
+            if empty is not None:
+                raise ValueError("取值方式中只能有一个 empty")
+            empty = (frozenset(step["empty"]), step.get("to"))
+        else:
+            (after if empty is not None else before).append(_value_step(step))
+    before, after = _chain(before), _chain(after)
+    if empty is None:
+        return before
+    empty_values, placeholder = empty
+
+    def convert(value):
+        value = before(value)
+        if value in empty_values:
+            return placeholder
+        return after(value)
+    return convert
+
+
+def _split_template(template, header=""):
+    """name 模板代入表头后，在 {label} 处拆为前后两段"""
+    marker = "\x00"
+    parts = template.format(label=marker, header=header).split(marker)
+    if len(parts) != 2:
+        raise ValueError(f"列名模板中应有一个 {{label}}：{template!r}")
+    return parts[0], parts[1]
+
+
+class KeyValueExtractor:
+    """每个单元格为"键：值"的表格，未出现的列为None"""
+
+    def __init__(self, spec):
+        self.separator = spec.get("separator", "：")
+        values = spec.get("values") or {}
+        # 原始键 -> (列名, 取值函数)
+        self.columns = {key: (column, compile_value(values.get(key)))
+                        for key, column in spec["keys"].items()}
+        self.template = {column: None for column, _ in self.columns.values()}
+
+    def extract(self, table):
+        result = dict(self.template)
+        separator = self.separator
+        columns = self.columns
+        for row in table:
+            for cell in row:
+                key, value = cell.split(separator, 1)
+                target = columns.get(key.strip())
+                if target is not None:
+                    result[target[0]] = target[1](value.strip())
+        return result
+
+
+class PairExtractor:
+    """每行依次为 键、值、键、值…… 的表格"""
+
+    def __init__(self, spec):
+        self.rows = spec.get("rows")
+        self.key = compile_text_rules(spec.get("key"))
+        self.value = compile_value(spec.get("value"))
+
+    def extract(self, table):
+        rows = table if self.rows is None else [table[i] for i in self.rows]
+        key, value = self.key, self.value
+        result = {}
+        for row in rows:
+            for i in range(0, len(row), 2):
+                result[key(row[i])] = value(row[i + 1])
+        return result
+
+
+class RowExtractor:
+    """
+    第一行为表头、其余每行第一列为行标签的表格。
+    列计划 [(列号, 列名前段, 列名后段, 取值函数)] 由表头得到，每个单元格的列名为 前段 + 行标签 + 后段。
+    """
+
+    def __init__(self, spec):
+        self.label = compile_text_rules(spec.get("label"), spec.get("label_map"))
+        self.labels = frozenset(spec["labels"]) if spec.get("labels") else None
+        self.name_rules = compile_text_rules(spec["name_rules"]) if spec.get("name_rules") else None
+        self.name = spec.get("name", "{label}{header}")
+        self.value = compile_value(spec.get("value"))
+        self.missing = spec.get("missing", _SKIP)
+
+        # 固定列：与表头无关，列计划只需生成一次
+        self.fixed_plan = None
+        if spec.get("columns"):
+            self.fixed_plan = [(column["index"], *_split_template(column["name"]),
+                                compile_value(column.get("value", spec.get("value"))))
+                               for column in spec["columns"]]
+
+        self.header = compile_text_rules(spec.get("header"))
+        self.header_map = spec.get("header_map")
+        self.header_map_when = spec.get("header_map_when")
+        self.header_match = [(re.compile(pattern), name)
+                             for pattern, name in (spec.get("header_match") or {}).items()]
+        self.select = frozenset(spec["select"]) if spec.get("select") else None
+
+        self.fill = None
+        if spec.get("fill"):
+            fill = spec["fill"]
+            names = [self.name.format(label=label, header=header)
+                     for label in fill["labels"] for header in fill["headers"]]
+            self.fill = (names, fill.get("value"))
+
+    def _header_name(self, cell, mapped):
+        header = self.header(cell)
+        if mapped:
+            header = self.header_map.get(header, header).strip()
+        if self.header_match:
+            header = next((name for pattern, name in self.header_match if pattern.search(header)), None)
+        if header is None or (self.select is not None and header not in self.select):
+            return None
+        return header
+
+    def column_plan(self, header_row):
+        """表头对应的列计划；第一列为行标签，不在计划中"""
+        if self.fixed_plan is not None:
+            return self.fixed_plan
+        return PLAN_CACHE.get((self, tuple(header_row)), lambda: self._build_plan(header_row))
+
+    def _build_plan(self, header_row):
+        mapped = self.header_map is not None and (
+            self.header_map_when is None or self.header_map_when in header_row)
+        plan = []
+        for idx in range(1, len(header_row)):
+            header = self._header_name(header_row[idx], mapped)
+            if header is not None:
+                plan.append((idx, *_split_template(self.name, header), self.value))
+        return plan
+
+    def extract(self, table):
+        plan = self.column_plan(table[0])
+        label_of, labels, name_rules, missing = self.label, self.labels, self.name_rules, self.missing
+        result = {}
+        for row in table[1:]:
+            label = label_of(row[0])
+            if labels is not None and label not in labels:
+                continue
+            width = len(row)
+            for idx, prefix, suffix, convert in plan:
+                if idx < width:
+                    value = convert(row[idx])
+                elif missing is _SKIP:
+                    continue
+                else:
+                    value = missing
+                name = prefix + label + suffix
+                if name_rules is not None:
+                    name = name_rules(name)
+                result[name] = value
+        if self.fill is not None:
+            names, default = self.fill
+            result = {name: result.get(name, default) for name in names}
+        return result
+
+
+class LookupExtractor:
+    """
+    按单元格内容定位的表格：指标名和取值在同一行相邻的单元格中，位置随模板变化；
+    另有按行标签中的键（如"低于95%"中的 95%）命名的行。找不到取值单元格时为None。
+    """
+
+    def __init__(self, spec):
+        value = compile_value(spec.get("value"))
+        # [(列名, 需要同时含有的文本)]
+        self.cells = [(column, tuple(texts) if isinstance(texts, list) else (texts,))
+                      for column, texts in (spec.get("cells") or {}).items()]
+        self.cell_value = value
+        self.row_rule = None
+        if spec.get("rows"):
+            rows = spec["rows"]
+            self.row_rule = (
+                re.compile(rows["match"]),
+                compile_text_rules(rows.get("label")),
+                list(rows["keys"]),
+                [(column["index"], column["name"], compile_value(column.get("value", spec.get("value"))))
+                 for column in rows["columns"]],
+            )
+
+    def _row_values(self, row, result):
+        match, label_of, keys, columns = self.row_rule
+        if not match.search(row[0]):
+            return
+        label = label_of(row[0])
+        key = next((key for key in keys if key in label), None)
+        if key is None:
+            return
+        width = len(row)
+        for index, name, convert in columns:
+            idx = index if index >= 0 else width + index
+            result[name.format(key=key)] = convert(row[idx]) if 0 < idx < width else None
+
+    def extract(self, table):
+        cells, convert = self.cells, self.cell_value
+        result = {}
+        for row in table:
+            width = len(row)
+            for i, cell in enumerate(row):
+                for column, texts in cells:
+                    if all(text in cell for text in texts):
+                        result[column] = convert(row[i + 1]) if i + 1 < width else None
+            if self.row_rule is not None and row:
+                self._row_values(row, result)
+        return result
+
+
+LAYOUTS = {
+    "key_value": KeyValueExtractor,
+    "pairs": PairExtractor,
+    "rows": RowExtractor,
+    "lookup": LookupExtractor,
+}
+
+
+def compile_extractor(spec):
+    """编译一个类型的提取规则；handler 规则返回方法名"""
+    if "handler" in spec:
+        return spec["handler"]
+    layout = spec.get("layout")
+    if layout not in LAYOUTS:
+        raise ValueError(f"无法识别的表格布局：{layout!r}")
+    return LAYOUTS[layout](spec)
+
+
+def load_extractors(path=TABLE_TYPES_CONFIG):
+    """读取 TableTypes.yml，返回 {类型名: 提取器或处理方法名}，没有 extract 的类型不在结果中"""
+    import yaml
+
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    return {rule["type"]: compile_extractor(rule["extract"])
+            for rule in config["Types"] if rule.get("extract")}
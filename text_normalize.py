@@ -0,0 +1,65 @@
+"""
+文本规范化：全角括号、空白、单位后缀等的统一处理。
+转换表和正则在导入时生成一次；表格单元格在提取时统一规范化一次（normalize_cell，带缓存），
+之后各类表格的提取规则拿到的都是已清洗的文本。
+"""
+import re
+from functools import lru_cache
+
+# 全角括号 -> 半角
+BRACKETS = str.maketrans({"（": "(", "）": ")"})
+
+# 与 str.isspace() 一致的全部空白字符
+WHITESPACE = ("\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680"
+              "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+              "\u2028\u2029\u202f\u205f\u3000")
+_DELETE_WHITESPACE = str.maketrans("", "", WHITESPACE)
+
+# 单位写法统一
+UNIT_SUFFIXES = {"(sec)": "(s)", "(/hr)": "(/h)"}
+_UNITS = re.compile("|".join(re.escape(suffix) for suffix in UNIT_SUFFIXES))
+
+# 单元格规范化结果的缓存个数：表头、行标签和常见取值在各报告中大量重复
+CELL_CACHE_SIZE = 16384
+
+
+def halfwidth_brackets(text):
+    return text.translate(BRACKETS)
+
+
+def remove_whitespace(text):
+    """去除所有空白（包括换行、制表符和全角空格）"""
+    return text.translate(_DELETE_WHITESPACE)
+
+
+def normalize_units(text):
+    """(sec) -> (s)、(/hr) -> (/h)"""
+    return _UNITS.sub(lambda m: UNIT_SUFFIXES[m.group(0)], text)
+
+
+def translator(mapping):
+    """
+    {原文: 替换} 编译为一个函数：原文都是单个字符时使用 str.translate 一次完成，
+    否则按顺序依次替换。
+    """
+    pairs = [(str(old), str(new)) for old, new in mapping.items()]
+    if all(len(old) == 1 for old, _ in pairs):
+        table = str.maketrans({old: new or None for old, new in pairs})
+        return lambda text: text.translate(table)
+
+    def replace(text):
+        for old, new in pairs:
+            text = text.replace(old, new)
+        return text
+    return replace
+
+
+@lru_cache(maxsize=CELL_CACHE_SIZE)
+def normalize_cell(text):
+    """单元格的统一形式：全角括号转为半角，去除首尾空白"""
+    return text.translate(BRACKETS).strip()
+
+
+def normalize_table(table):
+    return [list(map(normalize_cell, row)) for row in table]
+
@@ -1,4 +1,4 @@
-import re
+from text_normalize import halfwidth_brackets
 
 def convert_brackets(file_path):
     # 读取文件内容
@@ -6,12 +6,12 @@ def convert_brackets(file_path):
         content = file.read()
 
     # 替换全角括号为半角括号
-    content = re.sub(r'（', '(', content)
-    content = re.sub(r'）', ')', content)
+    content = halfwidth_brackets(content)
 
     # 写回文件
     with open(file_path, 'w', encoding='utf-8') as file:
         file.write(content)
 
-# 使用函数
-convert_brackets('MedicalReportParameters.yml')
\ No newline at end of file
+if __name__ == "__main__":
+    # 使用函数
+    convert_brackets('MedicalReportParameters.yml')
@@ -0,0 +1,168 @@
+"""
+生成读取器测试用的 RTF 及对应的 DOCX：python unittest/fixtures/make_reader_fixtures.py
+RTF 覆盖 GBK 的 \\'hh、\\uN 与 \\ucN 替代字符、可忽略/嵌套的分组、横向/纵向合并单元格；
+DOCX 用 python-docx 按 LibreOffice 转换结果的结构（gridSpan、vMerge、单元格内多段落）写出相同内容，
+另有只用于 docx_reader 的 DOCX（gridBefore、嵌套表格）。
+"""
+import os
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def gbk(text):
+    """GBK 字节的 \\'hh 转义"""
+    return "".join(f"\\'{byte:02x}" for byte in text.encode("gbk"))
+
+
+def uni(text, fallback="?"):
+    """\\uN 转义（超过 32767 的为负数），每个字符后跟替代字符"""
+    parts = []
+    for i in range(0, len(text.encode("utf-16-le")), 2):
+        code = int.from_bytes(text.encode("utf-16-le")[i:i + 2], "little")
+        parts.append(f"\\u{code - 65536 if code > 32767 else code}{fallback}")
+    return "".join(parts)
+
+
+# GBK 文档头：f0 为中文字体（字体名也是 GBK 字节），f1 为西文字体
+GBK_HEADER = (r"{\rtf1\ansi\ansicpg936\deff0{\fonttbl{\f0\fnil\fcharset134 " + gbk("宋体")
+              + r";}{\f1\fswiss\fcharset0 Arial;}}" + "\n")
+
+RTF = {
+    "gbk": (
+        GBK_HEADER
+        + r"\pard\plain\f0 " + gbk("睡眠监测报告") + r"\par" + "\n"
+        + r"\pard\plain\f1 AHI=12.5\par" + "\n"
+        + r"\pard\plain\f0 " + gbk("结论：") + r"\f1 OSA\par" + "\n"
+        + r"\trowd\cellx2000\cellx4000\pard\intbl\plain\f0 " + gbk("姓名") + r"\cell " + gbk("张三") + r"\cell\row" + "\n"
+        + r"\pard\par" + "\n"
+        + "}"
+    ),
+    "unicode": (
+        r"{\rtf1\ansi\deff0{\fonttbl{\f0 Arial;}}" + "\n"
+        # \uc1：每个 \uN 后跳过一个替代字符
+        + r"\uc1\pard " + uni("睡眠") + r"\par" + "\n"
+        # 组内 \uc2 跳过两个 \'hh；出组后恢复 \uc1
+        + r"\pard{\uc2\u-30656\'d1\'aa}\u27687?\par" + "\n"
+        # \uc0：没有替代字符，后面的文本照常输出
+        + r"\pard{\uc0\u27687 ok}\par" + "\n"
+        # UTF-16 代理对
+        + r"\pard " + uni("😀") + r"\par" + "\n"
+        + "}"
+    ),
+    "groups": (
+        r"{\rtf1\ansi\deff0{\fonttbl{\f0 Arial;}}{\colortbl;\red0\green0\blue0;}" + "\n"
+        + r"{\*\generator Writer;}{\info{\title Secret}{\author A}}{\stylesheet{\s0 Normal;}}" + "\n"
+        + r"\pard{\*\unknowndest hidden {\b also hidden}}visible {\b bold {\i nested}} end\par" + "\n"
+        + r"\pard{\field{\*\fldinst HYPERLINK " + '"http://example.com"' + r"}{\fldrslt link}}\par" + "\n"
+        + r"\pard A\{b\}\\c\par" + "\n"
+        + "}"
+    ),
+    "merged": (
+        r"{\rtf1\ansi\deff0{\fonttbl{\f0 Arial;}}" + "\n"
+        + r"\pard " + uni("开始") + r"\par" + "\n"
+        # 第1行：第2、3列横向合并
+        + r"\trowd\cellx1000\clmgf\cellx2000\clmrg\cellx3000\cellx4000" + "\n"
+        + r"\pard\intbl " + uni("体位") + r"\cell AHI\cell \cell " + uni("备注") + r"\cell\row" + "\n"
+        # 第2、3行：第1列纵向合并；第4列为两个段落
+        + r"\trowd\clvmgf\cellx1000\cellx2000\cellx3000\cellx4000" + "\n"
+        + r"\pard\intbl " + uni("仰卧") + r"\cell 1\cell 2\cell a\par b\cell\row" + "\n"
+        + r"\trowd\clvmrg\cellx1000\cellx2000\cellx3000\cellx4000" + "\n"
+        + r"\pard\intbl\cell 3\cell 4\cell c\cell\row" + "\n"
+        + r"\pard " + uni("结束") + r"\par" + "\n"
+        + "}"
+    ),
+}
+
+
+def _table(doc, rows):
+    table = doc.add_table(rows=len(rows), cols=len(rows[0]))
+    for r, row in enumerate(rows):
+        for c, text in enumerate(row):
+            table.cell(r, c).text = text
+    return table
+
+
+def _docx_gbk():
+    doc = Document()
+    for text in ["睡眠监测报告", "AHI=12.5", "结论：OSA"]:
+        doc.add_paragraph(text)
+    _table(doc, [["姓名", "张三"]])
+    doc.add_paragraph("")
+    return doc
+
+
+def _docx_unicode():
+    doc = Document()
+    for text in ["睡眠", "血氧", "氧ok", "😀"]:
+        doc.add_paragraph(text)
+    return doc
+
+
+def _docx_groups():
+    doc = Document()
+    for text in ["visible bold nested end", "link", "A{b}\\c"]:
+        doc.add_paragraph(text)
+    return doc
+
+
+def _docx_merged():
+    doc = Document()
+    doc.add_paragraph("开始")
+    table = _table(doc, [["体位", "AHI", "", "备注"], ["", "1", "2", ""], ["", "3", "4", "c"]])
+    table.cell(0, 1).merge(table.cell(0, 2)).text = "AHI"
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "仰卧"
+    cell = table.cell(1, 3)
+    cell.text = "a"
+    cell.add_paragraph("b")
+    doc.add_paragraph("结束")
+    return doc
+
+
+def _docx_layout():
+    """只用于 docx_reader：gridBefore、横向合并、纵向合并、嵌套表格"""
+    doc = Document()
+    doc.add_paragraph("前言")
+    table = _table(doc, [["a", "b", "c"], ["d", "e", "f"], ["g", "h", "i"]])
+    table.cell(0, 0).merge(table.cell(0, 1)).text = "ab"
+    table.cell(1, 2).merge(table.cell(2, 2)).text = "fi"
+    # 第3行前空出一个网格位置：去掉第一个单元格并设置 gridBefore
+    tr = table.rows[2]._tr
+    tr.remove(tr.tc_lst[0])
+    trPr = tr.get_or_add_trPr()
+    grid_before = OxmlElement("w:gridBefore")
+    grid_before.set(qn("w:val"), "1")
+    trPr.insert(0, grid_before)
+    # 嵌套表格：外层单元格的文本只包含单元格自身的段落
+    outer = table.cell(1, 0)
+    outer.text = "外层"
+    inner = outer.add_table(rows=1, cols=2)
+    inner.cell(0, 0).text = "内1"
+    inner.cell(0, 1).text = "内2"
+    doc.add_paragraph("结尾")
+    _table(doc, [["x", "y"]])
+    return doc
+
+
+DOCX = {
+    "gbk": _docx_gbk,
+    "unicode": _docx_unicode,
+    "groups": _docx_groups,
+    "merged": _docx_merged,
+    "layout": _docx_layout,
+}
+
+
+def main():
+    for name, content in RTF.items():
+        with open(os.path.join(HERE, name + ".rtf"), "w", encoding="ascii", newline="\n") as f:
+            f.write(content)
+    for name, build in DOCX.items():
+        build().save(os.path.join(HERE, name + ".docx"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""测试公用：把仓库根目录加入 sys.path，fixtures 目录的位置"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def fixture(*parts):
+    return os.path.join(FIXTURES, *parts)
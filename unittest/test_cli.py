@@ -0,0 +1,88 @@
+"""命令行参数：--perf-report、--output 的检查及与 --format 的冲突、-j 与 --pipeline 的冲突、增量模式的中断退出码"""
+import os
+import signal
+import tempfile
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  仓库根目录加入 sys.path
+
+import cli
+import rtf_parser
+
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = self.tmp.name
+        # main() 会安装信号处理函数，测试结束后恢复
+        handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+        self.addCleanup(lambda: [signal.signal(sig, h) for sig, h in handlers.items()])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_perf_report_does_not_take_folder(self):
+        args = cli.build_arg_parser().parse_args(["--perf-report", self.folder])
+        self.assertTrue(args.perf_report)
+        self.assertIsNone(args.perf_report_path)
+        self.assertEqual(args.folders, [self.folder])
+
+    def test_perf_report_path(self):
+        args = cli.build_arg_parser().parse_args(["--perf-report-path", "p.json", self.folder])
+        self.assertEqual(args.perf_report_path, "p.json")
+        self.assertEqual(args.folders, [self.folder])
+
+    def test_output_extension_conflicts_with_format(self):
+        with mock.patch.object(rtf_parser.RTFParser, "process_files") as process:
+            status = cli.main([self.folder, "-o", os.path.join(self.folder, "out.xlsx"), "-f", "csv"])
+        self.assertEqual(status, cli.EXIT_USAGE)
+        process.assert_not_called()
+
+    def test_unknown_output_extension(self):
+        output = os.path.join(self.folder, "out.xls")
+        with mock.patch.object(rtf_parser.RTFParser, "process_files") as process:
+            status = cli.main([self.folder, "-o", output])
+        self.assertEqual(status, cli.EXIT_USAGE)
+        self.assertFalse(os.path.exists(output))
+        process.assert_not_called()
+
+    def test_output_directory(self):
+        # 不带扩展名的目录自动创建；已存在的目录名可以带点
+        existing = os.path.join(self.folder, "results.v2")
+        os.mkdir(existing)
+        for output in (os.path.join(self.folder, "results"), existing):
+            with self.subTest(output=output), \
+                    mock.patch.object(rtf_parser.RTFParser, "process_files", return_value=None) as process:
+                status = cli.main([self.folder, "-o", output])
+                self.assertEqual(status, cli.EXIT_OK)
+                name = os.path.basename(os.path.normpath(self.folder))
+                process.assert_called_once_with(self.folder, os.path.join(output, f"{name}.xlsx"))
+
+    def test_workers_conflict_with_pipeline(self):
+        with mock.patch.object(rtf_parser.RTFParser, "process_files") as process:
+            status = cli.main([self.folder, "-j", "4", "--pipeline", "2"])
+        self.assertEqual(status, cli.EXIT_USAGE)
+        process.assert_not_called()
+
+    def test_output_extension_matches_format(self):
+        output = os.path.join(self.folder, "out.feather")
+        with mock.patch.object(rtf_parser.RTFParser, "process_files", return_value=None) as process:
+            status = cli.main([self.folder, "-o", output, "-f", "arrow"])
+        self.assertEqual(status, cli.EXIT_OK)
+        process.assert_called_once_with(self.folder, output)
+
+    def test_incremental_interrupted(self):
+        def update_files(parser, folder):
+            parser._stop_event.set()
+            return 0
+
+        with mock.patch.object(rtf_parser.RTFParser, "update_files", autospec=True,
+                               side_effect=update_files):
+            status = cli.main([self.folder, "--incremental"])
+        self.assertEqual(status, cli.EXIT_INTERRUPTED)
+
+
+if __name__ == "__main__":
+    unittest.main()
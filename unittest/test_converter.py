@@ -0,0 +1,78 @@
+"""convert_batch：只返回本次调用实际生成的 docx"""
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+import support  # noqa: F401  仓库根目录加入 sys.path
+
+from converter import convert_batch
+
+# 模拟 soffice：文件名含 skip 的不生成 docx；环境变量 FAKE_SOFFICE_FAIL=1 时什么都不做并返回 1
+FAKE_SOFFICE = """#!{python}
+import os, sys
+if os.environ.get("FAKE_SOFFICE_FAIL"):
+    sys.exit(1)
+args = sys.argv[1:]
+outdir = args[args.index("--outdir") + 1]
+for path in args:
+    if path.endswith(".rtf") and "skip" not in os.path.basename(path):
+        name = os.path.splitext(os.path.basename(path))[0] + ".docx"
+        with open(os.path.join(outdir, name), "w") as f:
+            f.write("new")
+"""
+
+
+@unittest.skipIf(os.name == "nt", "模拟的 soffice 为脚本文件")
+class ConvertBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.soffice = os.path.join(self.dir, "soffice")
+        with open(self.soffice, "w") as f:
+            f.write(FAKE_SOFFICE.format(python=sys.executable))
+        os.chmod(self.soffice, os.stat(self.soffice).st_mode | stat.S_IEXEC)
+        os.environ.pop("FAKE_SOFFICE_FAIL", None)
+
+    def tearDown(self):
+        os.environ.pop("FAKE_SOFFICE_FAIL", None)
+        self.tmp.cleanup()
+
+    def _rtf(self, name, stale_docx=False):
+        path = os.path.join(self.dir, name + ".rtf")
+        with open(path, "w") as f:
+            f.write("{\\rtf1 x}")
+        if stale_docx:
+            with open(os.path.join(self.dir, name + ".docx"), "w") as f:
+                f.write("stale")
+        return path
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_converted_files(self):
+        paths = [self._rtf("a"), self._rtf("b", stale_docx=True)]
+        result = convert_batch(paths, workers=2, chunk_size=1, soffice=self.soffice)
+        self.assertEqual(set(result), set(paths))
+        for docx_path in result.values():
+            self.assertEqual(self._read(docx_path), "new")
+        self.assertEqual(sorted(os.listdir(self.dir)), ["a.docx", "a.rtf", "b.docx", "b.rtf", "soffice"])
+
+    def test_failed_chunk_ignores_stale_docx(self):
+        os.environ["FAKE_SOFFICE_FAIL"] = "1"
+        paths = [self._rtf("a", stale_docx=True), self._rtf("b")]
+        self.assertEqual(convert_batch(paths, soffice=self.soffice), {})
+        self.assertEqual(self._read(os.path.join(self.dir, "a.docx")), "stale")
+        self.assertFalse(any(name.startswith(".rtfparser_out_") for name in os.listdir(self.dir)))
+
+    def test_file_not_converted_ignores_stale_docx(self):
+        paths = [self._rtf("a"), self._rtf("skip", stale_docx=True)]
+        result = convert_batch(paths, soffice=self.soffice)
+        self.assertEqual(list(result), [paths[0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""docx_reader：与 python-docx 的 doc.paragraphs / row.cells 一致（横向合并、纵向合并、gridBefore、嵌套表格）"""
+import unittest
+
+from support import fixture
+
+import docx
+
+from docx_reader import read_docx
+
+FIXTURES = ["layout", "merged", "gbk", "unicode", "groups"]
+
+
+def python_docx(path):
+    """python-docx 读取的段落和表格（单元格文本已strip）"""
+    doc = docx.Document(path)
+    paragraphs = [p.text for p in doc.paragraphs]
+    tables = [[[cell.text.strip() for cell in row.cells] for row in table.rows] for table in doc.tables]
+    return paragraphs, tables
+
+
+class DocxReaderTest(unittest.TestCase):
+
+    def test_layout(self):
+        paragraphs, tables = read_docx(fixture("layout.docx"))
+        self.assertEqual(paragraphs, ["前言", "结尾"])
+        self.assertEqual(tables, [
+            [["ab", "ab", "c"],   # 第1、2列横向合并
+             ["外层", "e", "fi"],  # 嵌套表格的内容不属于外层单元格
+             ["h", "fi"]],        # gridBefore=1；第3列纵向合并
+            [["x", "y"]],
+        ])
+
+    def test_same_as_python_docx(self):
+        for name in FIXTURES:
+            with self.subTest(name):
+                path = fixture(name + ".docx")
+                self.assertEqual(read_docx(path), python_docx(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
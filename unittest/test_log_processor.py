@@ -0,0 +1,73 @@
+"""日志级别：AppLogger 按所选级别过滤，日志文件的处理器保持 DEBUG"""
+import logging
+import os
+import tempfile
+import time
+import unittest
+
+import support  # noqa: F401  仓库根目录加入 sys.path
+
+from log_processor import LogManager
+
+
+class LogLevelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = LogManager()
+        self.logger = self.manager.get_logger()
+        listener = self.manager.listener
+        handlers = listener.handlers
+        self.addCleanup(self._restore, listener, handlers)
+
+    def _restore(self, listener, handlers):
+        for handler in listener.handlers:
+            if handler not in handlers:
+                handler.close()
+        listener.handlers = handlers
+        self.manager.set_log_level("INFO")
+        self.tmp.cleanup()
+
+    def _wait_for(self, path, text, timeout=5.0):
+        """等待监听线程把日志写入文件"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    content = f.read()
+                if text in content:
+                    return content
+            time.sleep(0.02)
+        self.fail(f"{path} 中没有 {text!r}")
+
+    def test_file_handlers_stay_at_debug(self):
+        log_path = os.path.join(self.tmp.name, "run.log")
+        json_path = os.path.join(self.tmp.name, "run.jsonl")
+        file_handler = self.manager.enable_file_log(log_path)
+        json_handler = self.manager.enable_json_log(json_path)
+        self.manager.set_log_level("WARNING")
+
+        self.assertEqual(file_handler.level, logging.DEBUG)
+        self.assertEqual(json_handler.level, logging.DEBUG)
+        self.assertEqual(self.manager.ui_handler.level, logging.WARNING)
+
+        self.manager.set_log_level("DEBUG")
+        self.logger.debug("debug-record")
+        self.logger.warning("warning-record")
+        for path in (log_path, json_path):
+            content = self._wait_for(path, "warning-record")
+            self.assertIn("debug-record", content)
+
+    def test_log_file_does_not_lower_logger_level(self):
+        # 图形界面总是启用日志文件：AppLogger 仍按所选级别跳过调试日志
+        self.manager.enable_file_log(os.path.join(self.tmp.name, "run.log"))
+        self.manager.set_log_level("INFO")
+        self.assertFalse(self.logger.isEnabledFor(logging.DEBUG))
+        self.manager.set_log_level("WARNING")
+        self.assertFalse(self.logger.isEnabledFor(logging.INFO))
+        self.manager.set_log_level("DEBUG")
+        self.assertTrue(self.logger.isEnabledFor(logging.DEBUG))
+
+
+if __name__ == "__main__":
+    unittest.main()
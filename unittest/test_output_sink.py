@@ -0,0 +1,122 @@
+"""列式输出：列类型由字段配置声明，数值列、文本列和时间格式的取值写入 Arrow/Parquet 后不丢失"""
+import os
+import tempfile
+import unittest
+
+import support  # noqa: F401  仓库根目录加入 sys.path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from output_schema import NUMBER, TEXT, parse_fields
+from output_sink import ArrowSink, ParquetSink, open_sink
+from rtf_parser import RTFParser
+
+FIELDS = ["文件名", "鼾声次数", "打鼾时间", "血氧饱和度水平低于90%时间(min)",
+          "仰卧持续时间(min)", "所有呼吸暂停最长时间(s)", "AHI(次/h)"]
+
+# 打鼾时间未声明类型，按文本输出
+TYPES = {"文件名": TEXT, "鼾声次数": NUMBER, "血氧饱和度水平低于90%时间(min)": NUMBER,
+         "仰卧持续时间(min)": NUMBER, "所有呼吸暂停最长时间(s)": NUMBER, "AHI(次/h)": NUMBER}
+
+ROWS = [
+    ["a", "123", "0:35:12", 12.5, "0:12:30", "0:00:35", "/"],
+    ["b", 45, "35.2min", None, "", "1:02:03", 7.5],
+]
+
+EXPECTED = {
+    "文件名": ["a", "b"],
+    "鼾声次数": [123.0, 45.0],
+    "打鼾时间": ["0:35:12", "35.2min"],
+    "血氧饱和度水平低于90%时间(min)": [12.5, None],
+    "仰卧持续时间(min)": [12.5, None],
+    "所有呼吸暂停最长时间(s)": [35.0, 3723.0],
+    "AHI(次/h)": [None, 7.5],
+}
+
+
+class ColumnarSinkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, batch_size=4096):
+        path = os.path.join(self.tmp.name, name)
+        sink = open_sink(path, FIELDS, types=TYPES)
+        sink.batch_size = batch_size
+        with self.assertNoLogs(sink.logger, level="WARNING"):
+            for row in ROWS:
+                sink.write(row)
+            sink.close()
+        return path
+
+    def test_arrow_values_survive(self):
+        path = self._write("out.arrow")
+        with pa.ipc.open_file(path) as reader:
+            table = reader.read_all()
+        self.assertEqual(table.to_pydict(), EXPECTED)
+        self.assertEqual(table.schema.field("打鼾时间").type, pa.dictionary(pa.int32(), pa.string()))
+        self.assertEqual(table.schema.field("仰卧持续时间(min)").type, pa.float64())
+
+    def test_parquet_values_survive(self):
+        # 每行一个批次：跨行组的字典列
+        path = self._write("out.parquet", batch_size=1)
+        table = pq.read_table(path)
+        self.assertEqual(table.to_pydict(), EXPECTED)
+
+    def test_non_numeric_values_reported(self):
+        path = os.path.join(self.tmp.name, "bad.arrow")
+        sink = ArrowSink(path, ["文件名", "仰卧持续时间(min)", "AHI(次/h)"], TYPES)
+        sink.write(["a", "约12分钟", "1:2"])
+        with self.assertLogs(sink.logger, level="WARNING") as logs:
+            sink.close()
+        self.assertIn("仰卧持续时间(min)", logs.output[0])
+        self.assertIn("AHI(次/h)", logs.output[0])
+        with pa.ipc.open_file(path) as reader:
+            self.assertEqual(reader.read_all().column("仰卧持续时间(min)").to_pylist(), [None])
+
+    def test_undeclared_fields_are_text(self):
+        path = os.path.join(self.tmp.name, "text.arrow")
+        sink = ArrowSink(path, ["文件名", "新增指标"])
+        sink.write(["a", "12.5"])
+        sink.close()
+        with pa.ipc.open_file(path) as reader:
+            table = reader.read_all()
+        self.assertEqual(table.schema.field("新增指标").type, pa.dictionary(pa.int32(), pa.string()))
+        self.assertEqual(table.column("新增指标").to_pylist(), ["12.5"])
+
+    def test_parquet_sink_selected_by_extension(self):
+        sink = open_sink(os.path.join(self.tmp.name, "x.parquet"), FIELDS)
+        self.assertIsInstance(sink, ParquetSink)
+        sink.abort()
+
+
+class FieldConfigTest(unittest.TestCase):
+
+    def test_parse_fields(self):
+        fields, types = parse_fields(["姓名", {"name": "年龄", "type": "number"}, {"name": "结论"}])
+        self.assertEqual(fields, ["姓名", "年龄", "结论"])
+        self.assertEqual(types, {"姓名": TEXT, "年龄": NUMBER, "结论": TEXT})
+
+    def test_invalid_field_type(self):
+        with self.assertRaises(ValueError):
+            parse_fields([{"name": "年龄", "type": "float"}])
+        with self.assertRaises(ValueError):
+            parse_fields([{"type": "number"}])
+
+    def test_default_config_types(self):
+        parser = RTFParser(None, None)
+        fields, types = parser.load_field_config(parser.config_path)
+        self.assertEqual(fields, parser.load_config(parser.config_path))
+        self.assertEqual(fields[0], "文件名")
+        for field in ("文件名", "姓名", "出生日期", "打鼾时间", "结论"):
+            self.assertEqual(types[field], TEXT, field)
+        for field in ("年龄", "AHI(次/h)", "仰卧持续时间(min)"):
+            self.assertEqual(types[field], NUMBER, field)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+正文段落提取与原先的逐段提取（RTFParser.extract_data 改为 paragraph_extractor 之前）结果一致。
+fixtures/paragraphs.json 中的期望结果由原先的实现生成：合成报告（benchmarks/synthetic.make_paragraphs）
+以及指标分散、结论段未以空行结束、指标和结论在附录中重复出现等变体。
+唯一有意的差异：监测类型按内容识别，抬头中没有监测类型的文档（header-only、oahi-only）期望为None，
+原先固定取第三个段落的文本。
+"""
+import json
+import unittest
+
+from support import fixture
+
+from output_schema import OutputSchema
+from paragraph_extractor import FIELDS, ParagraphExtractor, extractor_for
+from rtf_parser import RTFParser
+
+
+def load_documents():
+    with open(fixture("paragraphs.json"), encoding="utf-8") as f:
+        return [(doc["name"], [tuple(p) for p in doc["paragraphs"]], doc["expected"])
+                for doc in json.load(f)]
+
+
+class ParagraphExtractorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.documents = load_documents()
+        parser = RTFParser(None, None)
+        cls.schema_fields = OutputSchema(parser.load_config(parser.config_path)).index
+
+    def test_matches_previous_extract_data(self):
+        for fields in (None, self.schema_fields, FIELDS):
+            extractor = extractor_for(fields)
+            for name, paragraphs, expected in self.documents:
+                with self.subTest(document=name, fields=fields is not None):
+                    self.assertEqual(extractor.extract(paragraphs), expected)
+
+    def test_last_occurrence_wins(self):
+        documents = {name: (paragraphs, expected) for name, paragraphs, expected in self.documents}
+        paragraphs, expected = documents["repeated-after-complete"]
+        data = ParagraphExtractor().extract(paragraphs)
+        self.assertEqual(data["AHI(次/h)"], 11.0)
+        self.assertEqual(data["OAI(次/h)"], 4.5)
+        self.assertEqual(data["结论"], "轻度 复核后为中度 补充说明")
+        self.assertEqual(data, expected)
+
+    def test_unrequested_fields_are_none(self):
+        paragraphs = [("", text) for text in ["A", "B", "PSG", "AHI=3.5，OAI=1.0", "结论：x"]]
+        data = ParagraphExtractor(["AHI(次/h)", "结论"]).extract(paragraphs)
+        self.assertEqual(list(data), list(FIELDS))
+        self.assertEqual(data["AHI(次/h)"], 3.5)
+        self.assertIsNone(data["OAI(次/h)"])
+        self.assertEqual(data["结论"], "x")
+
+    def test_short_document(self):
+        data = ParagraphExtractor().extract([("", "A"), ("", "AHI=2")])
+        self.assertEqual(data["AHI(次/h)"], 2.0)
+        self.assertIsNone(data["监测类型"])
+
+    def test_monitor_type_by_content(self):
+        cases = [
+            # 抬头中的位置不固定；报告标题不是监测类型
+            (["睡眠监测报告", "多导睡眠监测(PSG)", "", "AHI=1"], "多导睡眠监测(PSG)"),
+            (["XX医院", "睡眠中心", "报告", "便携式监测 HST", ""], "便携式监测 HST"),
+            # 抬头之后的段落不作为监测类型
+            (["XX医院", "睡眠监测报告", "", "本次监测共记录8小时"], None),
+            # 没有抬头的文档（如 groups.rtf、unicode.rtf）
+            (["visible bold nested end", "link", "A{b}\\c"], None),
+            (["睡眠", "血氧", "氧ok", "😀"], None),
+        ]
+        for texts, expected in cases:
+            with self.subTest(texts=texts):
+                data = ParagraphExtractor().extract([("", text) for text in texts])
+                self.assertEqual(data["监测类型"], expected)
+
+    def test_header_ends_at_first_section(self):
+        paragraphs = [("", "XX医院"), ("总结", "多导睡眠监测(PSG)")]
+        self.assertIsNone(ParagraphExtractor().extract(paragraphs)["监测类型"])
+
+
+if __name__ == "__main__":
+    unittest.main()
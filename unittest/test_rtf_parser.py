@@ -0,0 +1,89 @@
+"""
+解析器：表格内容只为 --dump-tables/--dump-sample 选中的文件输出，与日志级别和日志文件无关；
+不在字段配置中的解析结果在运行结束时以 WARNING 报告。
+"""
+import os
+import tempfile
+import time
+import unittest
+
+import support  # noqa: F401  仓库根目录加入 sys.path
+
+from benchmarks.synthetic import make_paragraphs, make_tables
+from log_processor import LogManager
+from output_schema import OutputSchema
+from rtf_parser import RTFParser
+
+
+class TableDumpTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = LogManager()
+        self.logger = self.manager.get_logger()
+        listener = self.manager.listener
+        handlers = listener.handlers
+        self.addCleanup(self._restore, listener, handlers)
+        self.log_path = os.path.join(self.tmp.name, "rtf_parser.log")
+        # 与图形界面相同：启用日志文件后按所选级别设置
+        self.manager.enable_file_log(self.log_path)
+        self.manager.set_log_level("INFO")
+
+    def _restore(self, listener, handlers):
+        for handler in listener.handlers:
+            if handler not in handlers:
+                handler.close()
+        listener.handlers = handlers
+        self.manager.set_log_level("INFO")
+        self.tmp.cleanup()
+
+    def _parse(self, **kwargs):
+        """按 parse_file 的方式决定是否输出，解析一份合成报告"""
+        parser = RTFParser(None, None, reader="rtf", **kwargs)
+        schema = OutputSchema(parser.load_config(parser.config_path))
+        dump = parser.should_dump("张三.rtf")
+        return parser.extract_document_row(make_paragraphs(), make_tables(), schema, dump=dump)
+
+    def _log_content(self):
+        # 写入一条标记并等待监听线程输出，之前的日志都已写入文件
+        self.logger.warning("end-marker")
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if os.path.exists(self.log_path):
+                with open(self.log_path, encoding="utf-8") as f:
+                    content = f.read()
+                if "end-marker" in content:
+                    return content
+            time.sleep(0.02)
+        self.fail("日志文件中没有标记")
+
+    def test_no_table_dump_with_file_log(self):
+        for level in ("INFO", "DEBUG"):
+            self.manager.set_log_level(level)
+            with self.subTest(level=level), self.assertNoLogs(self.logger, level="DEBUG"):
+                self._parse()
+        self.assertNotIn("table_data", self._log_content())
+
+    def test_selected_file_dumped(self):
+        with self.assertLogs(self.logger, level="INFO") as logs:
+            self._parse(dump_tables=["*张三*"])
+        self.assertTrue(any("table_data" in line for line in logs.output))
+
+
+
+class UnmappedKeysTest(unittest.TestCase):
+
+    def test_unmapped_keys_reported_as_warning(self):
+        parser = RTFParser(None, None)
+        schema = OutputSchema(["文件名", "姓名", "AHI(次/h)"])
+        parser.extract_document_row(make_paragraphs(), make_tables(), schema, parser.unmapped_keys)
+        self.assertIn("OAHI(次/h)", parser.unmapped_keys)
+        self.assertNotIn("姓名", parser.unmapped_keys)
+        with self.assertLogs(parser.logger, level="WARNING") as logs:
+            parser._report_unmapped()
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("OAHI(次/h)", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+rtf_reader：GBK 字节、\\uN/\\ucN、可忽略分组、合并单元格。
+fixtures 中每个 RTF 都有内容相同的 DOCX（make_reader_fixtures.py 生成），直接解析RTF的结果应与 docx_reader 读取 DOCX 一致；
+安装了 soffice 时再与实际转换出的 DOCX 比较。
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from support import fixture
+
+from docx_reader import read_docx
+from rtf_reader import parse_rtf, read_rtf
+
+EXPECTED = {
+    "gbk": (["睡眠监测报告", "AHI=12.5", "结论：OSA", ""], [[["姓名", "张三"]]]),
+    "unicode": (["睡眠", "血氧", "氧ok", "😀"], []),
+    "groups": (["visible bold nested end", "link", "A{b}\\c"], []),
+    "merged": (["开始", "结束"], [[["体位", "AHI", "AHI", "备注"],
+                                   ["仰卧", "1", "2", "a\nb"],
+                                   ["仰卧", "3", "4", "c"]]]),
+}
+
+
+class RtfReaderTest(unittest.TestCase):
+
+    def test_fixtures(self):
+        for name, expected in EXPECTED.items():
+            with self.subTest(name):
+                self.assertEqual(read_rtf(fixture(name + ".rtf")), expected)
+
+    def test_same_as_docx_reader(self):
+        for name in EXPECTED:
+            with self.subTest(name):
+                self.assertEqual(read_rtf(fixture(name + ".rtf")), read_docx(fixture(name + ".docx")))
+
+    def test_unicode_fallback_in_text_run(self):
+        # 替代字符与后面的普通文本在同一个文本片段中
+        self.assertEqual(parse_rtf(rb"{\rtf1\uc1\u30561?abc\par}")[0], ["睡abc"])
+
+    def test_binary_data_skipped(self):
+        self.assertEqual(parse_rtf(rb"{\rtf1 a{\*\blipuid x}\bin3 {}xb\par}")[0], ["ab"])
+
+    def test_trailing_paragraph_without_par(self):
+        self.assertEqual(parse_rtf(rb"{\rtf1 first\par last}")[0], ["first", "last"])
+
+
+@unittest.skipUnless(shutil.which("soffice"), "需要 LibreOffice")
+class RtfReaderSofficeTest(unittest.TestCase):
+
+    def test_same_as_converted_docx(self):
+        with tempfile.TemporaryDirectory() as outdir:
+            paths = [fixture(name + ".rtf") for name in EXPECTED]
+            subprocess.run(["soffice", "--headless", "--convert-to", "docx", "--outdir", outdir, *paths],
+                           check=True, capture_output=True, timeout=300)
+            for name in EXPECTED:
+                with self.subTest(name):
+                    converted = os.path.join(outdir, name + ".docx")
+                    self.assertEqual(read_rtf(fixture(name + ".rtf")), read_docx(converted))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+各类型表格按 TableTypes.yml 编译的提取器与原先的 process_*_table 方法结果一致。
+fixtures/tables.json 按类型存放原始表格（读取器的输出）及原先的方法在该表格上的结果：
+报告中的表格、合成表格（benchmarks/synthetic.make_table）和血氧表的边界情况。
+提取器的输入与解析时一样先经过 text_normalize.normalize_table。
+"""
+import json
+import unittest
+
+from support import fixture
+
+from table_extractor import LookupExtractor, load_extractors
+from text_normalize import normalize_table
+
+
+def load_cases():
+    with open(fixture("tables.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TableExtractorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.extractors = load_extractors()
+        cls.cases = load_cases()
+
+    def test_every_type_is_declarative(self):
+        self.assertEqual(set(self.extractors), set(self.cases))
+        for name, extractor in self.extractors.items():
+            with self.subTest(type=name):
+                self.assertNotIsInstance(extractor, str)
+
+    def test_matches_previous_handlers(self):
+        for name, cases in self.cases.items():
+            extract = self.extractors[name].extract
+            for case in cases:
+                with self.subTest(type=name, table=case["name"]):
+                    self.assertEqual(extract(normalize_table(case["table"])), case["expected"])
+
+    def test_lookup_layout(self):
+        extractor = LookupExtractor({
+            "cells": {"A": "甲", "B": ["乙", "丙"]},
+            "value": "percent",
+            "rows": {
+                "match": "^低于",
+                "label": [{"sub": ["(?s) .*", ""]}],
+                "keys": ["9", "8"],
+                "columns": [{"index": 1, "name": "{key}时间", "value": "duration_minutes"},
+                            {"index": -1, "name": "{key}占比"}],
+            },
+        })
+        table = [["甲", "5%", "丙乙", "7"],
+                 ["乙", "1", "甲"],
+                 ["低于98 x", "0:1:30", "2%"],
+                 ["低于7"],
+                 ["低于8"]]
+        self.assertEqual(extractor.extract(table), {
+            "A": None, "B": 7.0, "9时间": 1.5, "9占比": 2.0, "8时间": None, "8占比": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""增量模式：结果表的列追加、状态记录与结果表的一致性、刚修改的文件"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  仓库根目录加入 sys.path
+
+from openpyxl import Workbook, load_workbook
+
+from watcher import FileStateStore, IncrementalWorkbook, scan_folder
+
+
+class IncrementalWorkbookTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "out.xlsx")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_new_field_after_blank_header_column(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["文件名", None, "AHI"])
+        ws.append(["a", "备注", 1.0])
+        wb.save(self.path)
+
+        book = IncrementalWorkbook(self.path, ["文件名", "AHI", "OAI"])
+        self.assertEqual(book.columns["OAI"], 4)
+        book.upsert(["a", 2.0, 3.0])
+        book.save()
+
+        ws = load_workbook(self.path).active
+        self.assertEqual([cell.value for cell in ws[1]], ["文件名", None, "AHI", "OAI"])
+        self.assertEqual([cell.value for cell in ws[2]], ["a", "备注", 2.0, 3.0])
+
+    def test_new_workbook(self):
+        book = IncrementalWorkbook(self.path, ["文件名", "AHI"])
+        self.assertEqual(book.columns, {"文件名": 1, "AHI": 2})
+
+
+class FileStateStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = self.tmp.name
+        self.rtf = os.path.join(self.folder, "a.rtf")
+        with open(self.rtf, "w") as f:
+            f.write("{\\rtf1 a}")
+        os.utime(self.rtf, (1_000_000, 1_000_000))
+        self.state_path = os.path.join(self.folder, "out.state.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _recorded_state(self):
+        state = FileStateStore(self.state_path)
+        for name, file_state in state.changed(self.folder, scan_folder(self.folder)):
+            state.update(name, file_state)
+        state.save()
+        return FileStateStore(self.state_path)
+
+    def test_unchanged_file(self):
+        state = self._recorded_state()
+        self.assertEqual(state.changed(self.folder, scan_folder(self.folder), written={"a"}), [])
+
+    def test_file_missing_from_output_is_changed(self):
+        # 结果表被删除或回退：状态中记录过的文件也要重新写入
+        state = self._recorded_state()
+        changed = state.changed(self.folder, scan_folder(self.folder), written={})
+        self.assertEqual([name for name, _ in changed], ["a.rtf"])
+
+    def test_mtime_only_change_is_saved(self):
+        state = self._recorded_state()
+        os.utime(self.rtf, (2_000_000, 2_000_000))
+        self.assertEqual(state.changed(self.folder, scan_folder(self.folder), written={"a"}), [])
+        self.assertTrue(state.dirty)
+        state.save()
+        self.assertEqual(FileStateStore(self.state_path).files["a.rtf"]["mtime"], 2_000_000)
+
+    def test_recent_file_is_pending(self):
+        state = self._recorded_state()
+        os.utime(self.rtf)  # 刚刚修改
+        self.assertEqual(state.changed(self.folder, scan_folder(self.folder), written={"a"}), [])
+        self.assertEqual(list(state.pending), ["a.rtf"])
+        self.assertLessEqual(state.pending["a.rtf"], 1.0)
+
+
+class UpdateFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, "reports")
+        os.mkdir(self.folder)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_one_shot_run_waits_for_recent_files(self):
+        from rtf_parser import RTFParser
+
+        # 刚写入的文件：单次运行等它写完后处理，而不是留到下一次运行
+        with open(os.path.join(self.folder, "new.rtf"), "w") as f:
+            f.write("{\\rtf1 a}")
+        parser = RTFParser(None, None, reader="rtf")
+        with mock.patch.object(RTFParser, "parse_file", side_effect=lambda path, schema: schema.new_row()):
+            updated = parser.update_files(self.folder)
+        self.assertEqual(updated, 1)
+        self.assertEqual(parser.unprocessed_files, [])
+        ws = load_workbook(parser.output_path(self.folder)).active
+        self.assertEqual(ws.cell(row=2, column=1).value, "new")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import json
+import os
+import time
+
+from log_processor import LogManager
+from result_cache import file_digest
+
+
+def scan_folder(folder_path):
+    """列出文件夹中的RTF文件及其 (mtime, size)"""
+    entries = {}
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.lower().endswith('.rtf'):
+                st = entry.stat()
+                entries[entry.name] = (st.st_mtime, st.st_size)
+    return entries
+
+
+class FileStateStore:
+    """记录已写入输出的文件（文件名、修改时间、大小、内容摘要）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        # 有未保存的修改（包括只有修改时间变化的文件）
+        self.dirty = False
+        # 上一次 changed() 中因可能仍在写入而推迟的文件：文件名 -> 还需等待的秒数
+        self.pending = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f)
+
+    def changed(self, folder_path, entries, settle=1.0, written=None):
+        """
+        返回新增或内容有变化的文件，及其新状态。
+        修改时间在 settle 秒以内的文件可能仍在写入，留到下一轮处理，记入 self.pending。
+        written 为结果表中已有行的文件名（不含扩展名）：结果表被删除、替换或回退时，
+        不在其中的文件无论记录的状态如何都重新处理。
+        """
+        now = time.time()
+        changed = []
+        self.pending = {}
+        for name in sorted(entries):
+            mtime, size = entries[name]
+            old = self.files.get(name)
+            if written is not None and os.path.splitext(name)[0] not in written:
+                old = None
+            if old and old["mtime"] == mtime and old["size"] == size:
+                continue
+            if now - mtime < settle:
+                self.pending[name] = settle - (now - mtime)
+                continue
+            digest = file_digest(os.path.join(folder_path, name))
+            state = {"mtime": mtime, "size": size, "sha256": digest}
+            if old and old["sha256"] == digest:
+                # 仅修改时间变化，内容相同：记录新的修改时间，下一轮不再计算摘要
+                self.files[name] = state
+                self.dirty = True
+                continue
+            changed.append((name, state))
+        return changed
+
+    def update(self, name, state):
+        self.files[name] = state
+        self.dirty = True
+
+    def forget_missing(self, entries):
+        """移除已删除的文件，返回被移除的文件名"""
+        missing = [name for name in self.files if name not in entries]
+        for name in missing:
+            del self.files[name]
+        if missing:
+            self.dirty = True
+        return missing
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.files, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+class IncrementalWorkbook:
+    """
+    在已有的结果工作簿上按"文件名"列更新或追加行。
+    只修改变化的单元格，不重新生成整张表；
+    配置中新增的字段追加为新列。
+    """
+
+    def __init__(self, path, fields, title="合并数据"):
+        from openpyxl import Workbook, load_workbook
+
+        self.path = path
+        self.fields = fields
+        if os.path.exists(path):
+            self.wb = load_workbook(path)
+            self.ws = self.wb.active
+        else:
+            self.wb = Workbook()
+            self.ws = self.wb.active
+            self.ws.title = title
+
+        header = [cell.value for cell in self.ws[1]] if self.ws.max_row >= 1 else []
+        self.columns = {name: idx for idx, name in enumerate(header, 1) if name}
+        # 新字段追加在已使用的最后一列之后：表头为空的列中可能仍有数据
+        used = self.ws.max_row > 1 or any(value is not None for value in header)
+        col_idx = self.ws.max_column if used else 0
+        for field in fields:
+            if field not in self.columns:
+                col_idx += 1
+                self.ws.cell(row=1, column=col_idx, value=field)
+                self.columns[field] = col_idx
+
+        key_col = self.columns[fields[0]]
+        self.rows = {}
+        for row_idx in range(2, self.ws.max_row + 1):
+            key = self.ws.cell(row=row_idx, column=key_col).value
+            if key is not None:
+                self.rows[key] = row_idx
+
+    def upsert(self, row):
+        """按文件名更新已有行，不存在时追加到末尾；row 按字段配置的顺序排列"""
+        key = row[0]
+        row_idx = self.rows.get(key)
+        if row_idx is None:
+            row_idx = max(self.ws.max_row, 1) + 1
+            self.rows[key] = row_idx
+        for field, value in zip(self.fields, row):
+            self.ws.cell(row=row_idx, column=self.columns[field], value=value)
+        return row_idx
+
+    def save(self):
+        self.wb.save(self.path)
+
+
+class FolderWatcher:
+    """
+    等待文件夹中的变化。
+    安装了 inotify_simple 时使用 inotify，否则按 interval 轮询。
+    """
+
+    def __init__(self, folder_path, interval=2.0, stop_event=None):
+        self.folder_path = folder_path
+        self.interval = interval
+        self.stop_event = stop_event
+        self.logger = LogManager().get_logger()
+        self._inotify = None
+        try:
+            from inotify_simple import INotify, flags
+            self._inotify = INotify()
+            self._inotify.add_watch(
+                folder_path, flags.CLOSE_WRITE | flags.MOVED_TO | flags.DELETE | flags.MOVED_FROM)
+            self.logger.debug("使用 inotify 监视文件夹")
+        except (ImportError, OSError):
+            self._inotify = None
+            self.logger.debug(f"使用轮询方式监视文件夹（间隔 {interval}s）")
+
+    def wait(self):
+        """阻塞直到可能有变化或超时；收到停止请求时返回False"""
+        if self.stop_event is not None and self.stop_event.is_set():
+            return False
+        if self._inotify is not None:
+            # 超时后也返回，用于处理上一轮尚未写完的文件
+            self._inotify.read(timeout=int(self.interval * 1000))
+        elif self.stop_event is not None:
+            self.stop_event.wait(self.interval)
+        else:
+            time.sleep(self.interval)
+        return not (self.stop_event is not None and self.stop_event.is_set())
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None